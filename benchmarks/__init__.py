@@ -0,0 +1 @@
+"""Performance benchmarks for Spark SQL MCP Server."""
@@ -0,0 +1,160 @@
+"""Standalone benchmark runner for the query hot paths.
+
+Runs against the in-process fake backend in ``fake_hive`` and reports
+throughput, p50/p99 latency and peak traced memory for each scenario::
+
+    python -m benchmarks.bench --rows 50000 --columns 20
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+import tracemalloc
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+from mcp.server.fastmcp import FastMCP
+
+from spark_sql_mcp.columnar import arrow_available
+from spark_sql_mcp.config import SparkConfig
+from spark_sql_mcp.formats import FORMATS
+from spark_sql_mcp.router import ClusterRouter
+from spark_sql_mcp.tools import format_as_table, register_tools
+
+from .fake_hive import FakeBackend, FakeSparkSQLClient
+
+
+@dataclass(frozen=True)
+class Measurement:
+    name: str
+    iterations: int
+    items: int
+    p50_ms: float
+    p99_ms: float
+    throughput: float
+    peak_kib: float
+
+
+def _percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def measure(name: str, fn: Callable[[], Any], iterations: int, items: int) -> Measurement:
+    """Time ``fn`` over ``iterations`` runs; ``items`` is the work done per run."""
+    fn()  # warm up caches and connections
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    # Measure memory separately: tracing slows the timed runs down considerably.
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return Measurement(
+        name=name,
+        iterations=iterations,
+        items=items,
+        p50_ms=_percentile(samples, 50) * 1000,
+        p99_ms=_percentile(samples, 99) * 1000,
+        throughput=items / statistics.fmean(samples),
+        peak_kib=peak / 1024,
+    )
+
+
+async def _fan_out(server: FastMCP, calls: int, limit: int) -> None:
+    await asyncio.gather(*(
+        server.call_tool("execute_query", {"sql": "SELECT * FROM t", "limit": limit})
+        for _ in range(calls)
+    ))
+
+
+def _measure_fetch_backends(backend: FakeBackend, iterations: int) -> list[Measurement]:
+    """Fetch through the columnar decoder, and into Arrow when pyarrow is installed."""
+    results = []
+    columnar = FakeSparkSQLClient(backend, SparkConfig(host="fake", fetch_backend="columnar"))
+    try:
+        results.append(measure(
+            "fetch_columnar", lambda: columnar.query("SELECT * FROM t"), iterations, backend.rows
+        ))
+        if arrow_available():
+            results.append(measure(
+                "fetch_arrow",
+                lambda: list(columnar.iter_record_batches("SELECT * FROM t")),
+                iterations,
+                backend.rows,
+            ))
+    finally:
+        columnar.close()
+    return results
+
+
+def run(backend: FakeBackend, iterations: int, concurrency: int) -> list[Measurement]:
+    client = FakeSparkSQLClient(backend)
+    client.connect()
+    try:
+        result = client.query("SELECT * FROM t")
+        results = [
+            measure("fetch", lambda: client.query("SELECT * FROM t"), iterations, backend.rows),
+            *_measure_fetch_backends(backend, iterations),
+            *(
+                measure(f"format_{fmt}", lambda fmt=fmt: format_as_table(result, fmt),
+                        iterations, backend.rows)
+                for fmt in FORMATS
+            ),
+        ]
+
+        server = FastMCP("bench")
+        register_tools(server, lambda: ClusterRouter({"default": client}))
+        limit = min(backend.rows, 1000)
+        results.append(measure(
+            f"tool_calls_x{concurrency}",
+            lambda: asyncio.run(_fan_out(server, concurrency, limit)),
+            iterations,
+            concurrency,
+        ))
+        return results
+    finally:
+        client.close()
+
+
+def report(measurements: list[Measurement]) -> str:
+    header = (
+        f"{'scenario':<20} {'iter':>5} {'p50 ms':>10} {'p99 ms':>10} "
+        f"{'items/s':>12} {'peak KiB':>10}"
+    )
+    lines = [header, "-" * len(header)]
+    for m in measurements:
+        lines.append(
+            f"{m.name:<20} {m.iterations:>5} {m.p50_ms:>10.2f} {m.p99_ms:>10.2f} "
+            f"{m.throughput:>12,.0f} {m.peak_kib:>10,.0f}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--columns", type=int, default=10)
+    parser.add_argument("--value-width", type=int, default=16)
+    parser.add_argument("--batch-latency-ms", type=float, default=0.0)
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args(argv)
+
+    backend = FakeBackend(
+        rows=args.rows,
+        columns=args.columns,
+        value_width=args.value_width,
+        batch_latency=args.batch_latency_ms / 1000,
+    )
+    print(report(run(backend, args.iterations, args.concurrency)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Startup-time benchmark for the MCP server.
+
+Measures, in fresh interpreters:
+
+* import time of ``spark_sql_mcp.server``, split into the MCP SDK's share and
+  this package's own share, and whether PyHive/Thrift were loaded;
+* time from process start to the reply to the MCP ``initialize`` request, with
+  ``SPARK_HOST`` pointing at an unroutable address so any eager connection
+  attempt would show up as a stall.
+
+    python -m benchmarks.bench_startup --runs 5
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+_IMPORT_PROBE = """
+import sys, time
+start = time.perf_counter()
+import mcp.server.fastmcp
+sdk = time.perf_counter()
+import spark_sql_mcp.server
+end = time.perf_counter()
+heavy = sorted(m for m in ("pyhive", "thrift", "TCLIService", "sasl") if m in sys.modules)
+print(f"{(sdk - start) * 1000:.3f} {(end - sdk) * 1000:.3f} {','.join(heavy) or '-'}")
+"""
+
+_INITIALIZE = {
+    "jsonrpc": "2.0",
+    "id": 1,
+    "method": "initialize",
+    "params": {
+        "protocolVersion": "2024-11-05",
+        "capabilities": {},
+        "clientInfo": {"name": "bench", "version": "0"},
+    },
+}
+
+
+def measure_imports(runs: int) -> tuple[list[float], list[float], set[str]]:
+    sdk_ms, own_ms, heavy = [], [], set()
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", _IMPORT_PROBE], check=True, capture_output=True, text=True
+        ).stdout.split()
+        sdk_ms.append(float(out[0]))
+        own_ms.append(float(out[1]))
+        heavy.update(m for m in out[2].split(",") if m != "-")
+    return sdk_ms, own_ms, heavy
+
+
+def measure_handshake(runs: int, timeout: float = 30.0) -> list[float]:
+    env = dict(os.environ, SPARK_HOST="192.0.2.1", SPARK_PREWARM="false")
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        proc = subprocess.Popen(
+            [sys.executable, "-m", "spark_sql_mcp.server"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            env=env,
+            text=True,
+        )
+        try:
+            proc.stdin.write(json.dumps(_INITIALIZE) + "\n")
+            proc.stdin.flush()
+            line = proc.stdout.readline()
+            elapsed = (time.perf_counter() - start) * 1000
+            if '"result"' not in line:
+                raise RuntimeError(f"Unexpected initialize response: {line!r}")
+            samples.append(elapsed)
+        finally:
+            proc.kill()
+            proc.wait(timeout)
+    return samples
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    sdk_ms, own_ms, heavy = measure_imports(args.runs)
+    handshake_ms = measure_handshake(args.runs)
+    print(f"MCP SDK import           median {statistics.median(sdk_ms):8.1f} ms")
+    print(f"spark_sql_mcp import     median {statistics.median(own_ms):8.1f} ms")
+    print(f"initialize round trip    median {statistics.median(handshake_ms):8.1f} ms")
+    print(f"heavy modules at startup {', '.join(sorted(heavy)) or 'none'}")
+
+
+if __name__ == "__main__":
+    main()
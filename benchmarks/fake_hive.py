@@ -0,0 +1,127 @@
+"""In-process stand-in for a HiveServer2 connection, for benchmarking.
+
+The fake cursor is a real PyHive cursor whose Thrift client is answered in
+process, so fetches go through the same row set decoding as in production.
+Result size, row width and per-fetch latency are configurable so the hot paths
+can be measured without a Spark cluster.
+"""
+
+import time
+from dataclasses import dataclass
+from types import SimpleNamespace
+from typing import Any
+
+from pyhive import hive
+from TCLIService.ttypes import (
+    TColumn,
+    TFetchResultsReq,
+    TFetchResultsResp,
+    TI64Column,
+    TOperationHandle,
+    TOperationState,
+    TOperationType,
+    TRowSet,
+    TStatus,
+    TStatusCode,
+    TStringColumn,
+)
+
+from spark_sql_mcp.config import SparkConfig
+from spark_sql_mcp.spark_client import SparkSQLClient
+
+
+@dataclass(frozen=True)
+class FakeBackend:
+    rows: int = 10_000
+    columns: int = 10
+    value_width: int = 16
+    execute_latency: float = 0.0
+    batch_latency: float = 0.0
+
+    def column_names(self) -> list[str]:
+        return [f"col_{i}" for i in range(self.columns)]
+
+    def make_row(self, index: int) -> tuple[Any, ...]:
+        text = f"{index:0{self.value_width}d}"[: self.value_width]
+        return (index,) + tuple(text for _ in range(self.columns - 1))
+
+
+class FakeThriftClient:
+    """Answers ``FetchResults`` with columnar row sets, as HiveServer2 does."""
+
+    def __init__(self, backend: FakeBackend):
+        self._backend = backend
+        self.position = 0
+
+    def FetchResults(self, request: TFetchResultsReq) -> TFetchResultsResp:  # noqa: N802
+        if self._backend.batch_latency:
+            time.sleep(self._backend.batch_latency)
+        end = min(self.position + request.maxRows, self._backend.rows)
+        rows = [self._backend.make_row(i) for i in range(self.position, end)]
+        self.position = end
+        values = list(zip(*rows)) or [()] * self._backend.columns
+        columns = [TColumn(i64Val=TI64Column(values=list(values[0]), nulls=b""))] + [
+            TColumn(stringVal=TStringColumn(values=list(v), nulls=b"")) for v in values[1:]
+        ]
+        return TFetchResultsResp(
+            status=TStatus(statusCode=TStatusCode.SUCCESS_STATUS),
+            results=TRowSet(startRowOffset=0, rows=[], columns=columns),
+        )
+
+
+class FakeCursor(hive.Cursor):
+    """A real PyHive cursor, so ``fetchmany`` decodes row sets as it would in production."""
+
+    def __init__(self, backend: FakeBackend):
+        super().__init__(SimpleNamespace(client=FakeThriftClient(backend)))
+        self._backend = backend
+        self._started = 0.0
+        self.cancelled = False
+
+    def execute(self, sql: str, async_: bool = False) -> None:
+        self._reset_state()
+        self._connection.client.position = 0
+        self._started = time.monotonic()
+        self._state = self._STATE_RUNNING
+        self._operationHandle = TOperationHandle(
+            operationId=None, operationType=TOperationType.EXECUTE_STATEMENT, hasResultSet=True
+        )
+        self._description = [
+            (name, "BIGINT_TYPE" if i == 0 else "STRING_TYPE", None, None, None, None, True)
+            for i, name in enumerate(self._backend.column_names())
+        ]
+        if not async_:
+            time.sleep(self._backend.execute_latency)
+
+    def poll(self, get_progress_update: bool = True) -> SimpleNamespace:
+        done = time.monotonic() - self._started >= self._backend.execute_latency
+        state = TOperationState.FINISHED_STATE if done else TOperationState.RUNNING_STATE
+        return SimpleNamespace(operationState=state, errorMessage=None)
+
+    def cancel(self) -> None:
+        self.cancelled = True
+
+    def close(self) -> None:
+        self._operationHandle = None
+
+
+class FakeConnection:
+    def __init__(self, backend: FakeBackend):
+        self._backend = backend
+
+    def cursor(self) -> FakeCursor:
+        return FakeCursor(self._backend)
+
+    def close(self) -> None:
+        pass
+
+
+class FakeSparkSQLClient(SparkSQLClient):
+    """``SparkSQLClient`` whose connections are served by a ``FakeBackend``."""
+
+    def __init__(self, backend: FakeBackend, config: SparkConfig | None = None):
+        super().__init__(config or SparkConfig(host="fake"))
+        self.backend = backend
+
+    def _connect_once(self) -> FakeConnection:
+        return FakeConnection(self.backend)
@@ -0,0 +1,64 @@
+"""Hot-path benchmarks, run with ``pytest benchmarks`` (requires pytest-benchmark)."""
+
+import asyncio
+
+import pytest
+from mcp.server.fastmcp import FastMCP
+
+from spark_sql_mcp.config import SparkConfig
+from spark_sql_mcp.router import ClusterRouter
+from spark_sql_mcp.tools import format_as_table, register_tools
+
+from .bench import _fan_out
+from .fake_hive import FakeBackend, FakeSparkSQLClient
+
+pytest.importorskip("pytest_benchmark")
+
+
+@pytest.fixture(params=[10, 200], ids=["narrow", "wide"])
+def client(request):
+    client = FakeSparkSQLClient(FakeBackend(rows=5_000, columns=request.param))
+    client.connect()
+    yield client
+    client.close()
+
+
+def test_fetch(benchmark, client):
+    result = benchmark(client.query, "SELECT * FROM t")
+    assert len(result) == client.backend.rows
+
+
+def test_fetch_columnar(benchmark):
+    client = FakeSparkSQLClient(
+        FakeBackend(rows=5_000), SparkConfig(host="fake", fetch_backend="columnar")
+    )
+    result = benchmark(client.query, "SELECT * FROM t")
+    assert len(result) == client.backend.rows
+    client.close()
+
+
+def test_fetch_with_limit(benchmark, client):
+    result = benchmark(client.query, "SELECT * FROM t", 100)
+    assert len(result) == 100
+
+
+def test_format_markdown(benchmark, client):
+    result = client.query("SELECT * FROM t")
+    output = benchmark(format_as_table, result)
+    assert output.count("\n") == len(result) + 1
+
+
+def test_format_csv(benchmark, client):
+    result = client.query("SELECT * FROM t")
+    output = benchmark(format_as_table, result, "csv")
+    assert output.count("\n") == len(result) + 1
+
+
+def test_concurrent_tool_calls(benchmark):
+    backend = FakeBackend(rows=1_000, columns=10, batch_latency=0.005)
+    client = FakeSparkSQLClient(backend)
+    client.connect()
+    server = FastMCP("bench")
+    register_tools(server, lambda: ClusterRouter({"default": client}))
+    benchmark(lambda: asyncio.run(_fan_out(server, 8, 100)))
+    client.close()
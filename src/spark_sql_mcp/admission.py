@@ -0,0 +1,182 @@
+"""Admission control: cap concurrent tool calls before they reach a cluster."""
+
+import asyncio
+from collections import deque
+from collections.abc import AsyncIterator, Hashable
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+
+from .config import AdmissionConfig
+
+
+class ServerBusyError(Exception):
+    """Raised when a request is rejected because too many are running or queued."""
+
+
+@dataclass(frozen=True)
+class AdmissionStats:
+    running: int
+    queued: int
+    metadata_running: int
+    metadata_queued: int
+    admitted: int
+    rejected: int
+    timed_out: int
+
+
+class _Waiter:
+    __slots__ = ("session", "future")
+
+    def __init__(self, session: Hashable, future: asyncio.Future):
+        self.session = session
+        self.future = future
+
+
+class _Lane:
+    __slots__ = ("name", "limit", "per_session", "running", "sessions", "waiters")
+
+    def __init__(self, name: str, limit: int, per_session: int):
+        self.name = name
+        self.limit = limit
+        self.per_session = per_session
+        self.running = 0
+        self.sessions: dict[Hashable, int] = {}
+        self.waiters: deque[_Waiter] = deque()
+
+    def has_room(self, session: Hashable) -> bool:
+        if self.limit and self.running >= self.limit:
+            return False
+        return not self.per_session or self.sessions.get(session, 0) < self.per_session
+
+    def start(self, session: Hashable) -> None:
+        self.running += 1
+        self.sessions[session] = self.sessions.get(session, 0) + 1
+
+    def finish(self, session: Hashable) -> None:
+        self.running -= 1
+        count = self.sessions[session] - 1
+        if count:
+            self.sessions[session] = count
+        else:
+            del self.sessions[session]
+
+
+class AdmissionController:
+    """Limits how many queries run at once, overall and per client session.
+
+    Requests over the limits wait in a bounded FIFO queue for up to
+    ``queue_timeout`` seconds; beyond that, or when the queue is full, they are
+    rejected with ``ServerBusyError``. A waiter whose session is at its own cap
+    does not hold up waiters from other sessions. Metadata calls use a separate
+    lane with its own cap so they never queue behind long scans. Concurrency
+    limits of 0 mean unlimited; ``max_queue=None`` means an unbounded queue.
+
+    All methods must be called from the event loop thread.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int = 0,
+        *,
+        max_per_session: int = 0,
+        max_queue: int | None = None,
+        queue_timeout: float = 30.0,
+        max_metadata_concurrent: int = 0,
+    ):
+        self._queries = _Lane("query", max_concurrent, max_per_session)
+        self._metadata = _Lane("metadata", max_metadata_concurrent, 0)
+        self._max_queue = max_queue
+        self._queue_timeout = queue_timeout
+        self._admitted = 0
+        self._rejected = 0
+        self._timed_out = 0
+
+    @classmethod
+    def from_config(cls, config: AdmissionConfig) -> "AdmissionController":
+        return cls(
+            config.max_concurrent_queries,
+            max_per_session=config.max_session_queries,
+            max_queue=config.queue_size,
+            queue_timeout=config.queue_timeout,
+            max_metadata_concurrent=config.max_concurrent_metadata,
+        )
+
+    @asynccontextmanager
+    async def admit(
+        self, session: Hashable = None, *, metadata: bool = False
+    ) -> AsyncIterator[None]:
+        """Hold a slot in the query (or metadata) lane for the enclosed block."""
+        lane = self._metadata if metadata else self._queries
+        await self._acquire(lane, session)
+        try:
+            yield
+        finally:
+            lane.finish(session)
+            self._dispatch(lane)
+
+    def stats(self) -> AdmissionStats:
+        return AdmissionStats(
+            running=self._queries.running,
+            queued=len(self._queries.waiters),
+            metadata_running=self._metadata.running,
+            metadata_queued=len(self._metadata.waiters),
+            admitted=self._admitted,
+            rejected=self._rejected,
+            timed_out=self._timed_out,
+        )
+
+    async def _acquire(self, lane: _Lane, session: Hashable) -> None:
+        if not lane.waiters and lane.has_room(session):
+            lane.start(session)
+            self._admitted += 1
+            return
+        if self._max_queue is not None and len(lane.waiters) >= self._max_queue:
+            self._rejected += 1
+            raise ServerBusyError(
+                f"Server busy: {lane.running} {lane.name} calls running and "
+                f"{len(lane.waiters)} queued. Try again shortly."
+            )
+        waiter = _Waiter(session, asyncio.get_running_loop().create_future())
+        lane.waiters.append(waiter)
+        # Everyone queued may be blocked on their own session cap.
+        self._dispatch(lane)
+        if waiter.future.done():
+            return
+        try:
+            # shield() keeps a timeout from cancelling the grant itself, so a
+            # slot granted at the last moment is not lost.
+            await asyncio.wait_for(asyncio.shield(waiter.future), self._queue_timeout)
+        except asyncio.TimeoutError:
+            if waiter.future.done():
+                return
+            self._withdraw(lane, waiter)
+            self._timed_out += 1
+            raise ServerBusyError(
+                f"Server busy: no {lane.name} slot became free within "
+                f"{self._queue_timeout:g}s. Try again shortly."
+            ) from None
+        except asyncio.CancelledError:
+            if waiter.future.done():
+                lane.finish(session)
+                self._dispatch(lane)
+            else:
+                self._withdraw(lane, waiter)
+            raise
+
+    @staticmethod
+    def _withdraw(lane: _Lane, waiter: _Waiter) -> None:
+        lane.waiters.remove(waiter)
+        waiter.future.cancel()
+
+    def _dispatch(self, lane: _Lane) -> None:
+        """Grant free slots to queued waiters, oldest first."""
+        for waiter in list(lane.waiters):
+            if lane.limit and lane.running >= lane.limit:
+                return
+            if waiter.future.done() or not lane.has_room(waiter.session):
+                continue
+            lane.waiters.remove(waiter)
+            lane.start(waiter.session)
+            self._admitted += 1
+            waiter.future.set_result(None)
+
@@ -0,0 +1,140 @@
+"""Response size budget: keep a tool's output within a byte (or token) allowance.
+
+The budget is applied while rows are fetched, so reading stops as soon as the
+allowance is used up instead of after the whole result has been transferred.
+Sizes are estimated from the rendered length of each value plus the
+separators, quotes and keys the output format adds around it; the formatted
+response may differ from the estimate by a few bytes per cell.
+"""
+
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import Any
+
+from .formats import truncate_text
+
+# Rough average for English text and SQL results with common tokenizers.
+BYTES_PER_TOKEN = 4
+
+# Without an explicit cell limit, no single value may take more than this share
+# of the budget.
+_DEFAULT_CELL_SHARE = 8
+_MIN_CELL_CHARS = 64
+
+
+@dataclass(frozen=True)
+class Truncation:
+    """What a budget cut from a result."""
+
+    max_bytes: int
+    # Rows were left unread because the budget was used up.
+    rows_cut: bool
+    cells_cut: int
+    max_cell_chars: int
+
+    def note(self, rows: int) -> str:
+        parts = []
+        if self.rows_cut:
+            parts.append(f"showing the first {rows} rows")
+        if self.cells_cut:
+            parts.append(f"{self.cells_cut} values cut to {self.max_cell_chars} characters")
+        return (
+            f"Output truncated to fit the {self.max_bytes:,}-byte response budget "
+            f"({'; '.join(parts)})."
+        )
+
+
+def tokens_to_bytes(tokens: int) -> int:
+    return tokens * BYTES_PER_TOKEN
+
+
+def cell_limit(max_bytes: int, max_cell_chars: int = 0) -> int:
+    """Longest value kept under ``max_bytes``: ``max_cell_chars`` if set, else a share of it."""
+    if max_cell_chars:
+        return max_cell_chars
+    return max(_MIN_CELL_CHARS, max_bytes // _DEFAULT_CELL_SHARE)
+
+
+def _cap(value: Any, max_chars: int) -> tuple[Any, bool]:
+    if isinstance(value, str) and len(value) > max_chars:
+        return truncate_text(value, max_chars), True
+    if isinstance(value, bytes) and len(value) > max_chars:
+        return value[:max_chars], True
+    return value, False
+
+
+def _size(value: Any) -> int:
+    if isinstance(value, (str, bytes)):
+        return len(value)
+    return len(str(value))
+
+
+def _overheads(columns: Sequence[str], fmt: str) -> tuple[int, int]:
+    """Bytes ``fmt`` adds for the header, and for each row's separators and keys."""
+    names = sum(len(c) for c in columns)
+    count = len(columns)
+    if fmt == "markdown":
+        # "| a | b |" twice (names and dashes), then "| 1 | 2 |" per row.
+        return (names + 3 * count) * 2 + 2, 3 * count + 2
+    if fmt in ("csv", "tsv"):
+        return names + count, count
+    if fmt == "jsonl":
+        # Every row repeats the keys: {"a":1,"b":2} and a newline.
+        return 0, names + 4 * count + 2
+    # {"columns":["a","b"],"rows":[[1,2],...]}
+    return names + 3 * count + 24, count + 2
+
+
+def _quoted(value: Any) -> bool:
+    """Whether a JSON encoder writes ``value`` as a string."""
+    return not (value is None or isinstance(value, (bool, int, float)))
+
+
+class BudgetTracker:
+    """Caps cells and admits rows until their estimated rendered size reaches ``max_bytes``.
+
+    Sizes are estimated for the output format ``fmt``. The first row is always
+    admitted so a result is never empty just because one row is large.
+    """
+
+    def __init__(
+        self,
+        columns: Sequence[str],
+        max_bytes: int,
+        max_cell_chars: int = 0,
+        fmt: str = "markdown",
+    ):
+        self.max_bytes = max_bytes
+        self.max_cell_chars = cell_limit(max_bytes, max_cell_chars)
+        self.used, self._row_overhead = _overheads(columns, fmt)
+        self._json = fmt in ("jsonl", "json")
+        self.rows = 0
+        self.cells_cut = 0
+        self.exhausted = False
+
+    def admit(self, row: tuple[Any, ...]) -> tuple[Any, ...] | None:
+        """The row with long values cut, or None once the budget is used up."""
+        if self.exhausted:
+            return None
+        capped = []
+        cells_cut = 0
+        size = self._row_overhead
+        for value in row:
+            value, cut = _cap(value, self.max_cell_chars)
+            cells_cut += cut
+            size += _size(value)
+            if self._json and _quoted(value):
+                size += 2
+            capped.append(value)
+        if self.rows and self.used + size > self.max_bytes:
+            self.exhausted = True
+            return None
+        self.used += size
+        self.rows += 1
+        self.cells_cut += cells_cut
+        return tuple(capped)
+
+    def truncation(self) -> Truncation | None:
+        if not (self.exhausted or self.cells_cut):
+            return None
+        return Truncation(self.max_bytes, self.exhausted, self.cells_cut, self.max_cell_chars)
@@ -0,0 +1,216 @@
+"""In-process TTL/LRU cache with single-flight loading."""
+
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from dataclasses import dataclass
+from typing import Any, Generic, TypeVar
+
+from .executor import CancelToken, cancel_scope, current_token
+
+V = TypeVar("V")
+
+_WAIT_SLICE = 0.05
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    entries: int
+    hits: int
+    misses: int
+    coalesced: int
+    evictions: int
+    bytes: int
+
+
+class _Flight:
+    """One in-flight load and the callers waiting for it.
+
+    The loader runs under the flight's own cancel token, which is cancelled
+    only once every caller has been cancelled.
+    """
+
+    __slots__ = ("done", "value", "error", "token", "callers")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: BaseException | None = None
+        self.token = CancelToken()
+        self.callers = 0
+
+
+class TTLCache(Generic[V]):
+    """Thread-safe LRU cache bounded by entry count, with a per-entry time to live.
+
+    If ``max_bytes`` is set, ``sizeof`` estimates each value's size and least
+    recently used entries are evicted to keep the total within budget; values
+    larger than the whole budget are not cached.
+
+    ``get_or_load`` coalesces concurrent misses for the same key so only one
+    caller runs the loader; the others wait for its result. Cancelling one
+    caller, even the one running the loader, leaves the load running for the
+    rest; it is cancelled when the last caller is. A ``ttl`` of zero disables
+    caching but keeps the coalescing.
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        ttl: float,
+        *,
+        max_bytes: int | None = None,
+        sizeof: Callable[[V], int] | None = None,
+    ):
+        if max_bytes is not None and sizeof is None:
+            raise ValueError("sizeof is required when max_bytes is set")
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._max_bytes = max_bytes
+        self._sizeof = sizeof
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[Hashable, tuple[float, V, int]] = OrderedDict()
+        self._bytes = 0
+        self._inflight: dict[Hashable, _Flight] = {}
+        self._generation = 0
+        self._hits = 0
+        self._misses = 0
+        self._coalesced = 0
+        self._evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self._ttl > 0 and self._maxsize > 0
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], V]) -> V:
+        token = current_token()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    return entry[1]
+                self._remove_locked(key)
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if flight is None:
+                self._misses += 1
+                flight = self._inflight[key] = _Flight()
+                generation = self._generation
+            else:
+                self._coalesced += 1
+            flight.callers += 1
+        release = token.on_cancel(lambda: self._leave(key, flight))
+        try:
+            if leader:
+                return self._load(key, loader, flight, generation)
+            return self._wait(flight, token)
+        finally:
+            release()
+
+    def _load(self, key: Hashable, loader: Callable[[], V], flight: _Flight, generation: int) -> V:
+        try:
+            with cancel_scope(flight.token):
+                value = loader()
+        except BaseException as exc:
+            flight.error = exc
+            raise
+        else:
+            flight.value = value
+            if self.enabled:
+                size = self._sizeof(value) if self._sizeof else 0
+                with self._lock:
+                    if generation == self._generation:
+                        self._store_locked(key, value, size)
+            return value
+        finally:
+            with self._lock:
+                if self._inflight.get(key) is flight:
+                    del self._inflight[key]
+            flight.done.set()
+
+    def _leave(self, key: Hashable, flight: _Flight) -> None:
+        """A caller was cancelled; cancel the load if nobody else is waiting for it."""
+        with self._lock:
+            if flight.done.is_set():
+                return
+            flight.callers -= 1
+            if flight.callers:
+                return
+            # Later callers start a fresh load instead of joining a cancelled one.
+            if self._inflight.get(key) is flight:
+                del self._inflight[key]
+        flight.token.cancel()
+
+    def get(self, key: Hashable) -> V | None:
+        """The cached value for ``key``, or None if absent or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                self._remove_locked(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key: Hashable, value: V) -> None:
+        if not self.enabled:
+            return
+        size = self._sizeof(value) if self._sizeof else 0
+        with self._lock:
+            self._store_locked(key, value, size)
+
+    def invalidate(self, predicate: Callable[[Any], bool] | None = None) -> int:
+        """Drop every entry whose key matches ``predicate`` (all entries if omitted)."""
+        with self._lock:
+            # Results of loads already in flight may predate the invalidation.
+            self._generation += 1
+            if predicate is None:
+                removed = len(self._entries)
+                self._entries.clear()
+                self._bytes = 0
+                return removed
+            keys = [k for k in self._entries if predicate(k)]
+            for k in keys:
+                self._remove_locked(k)
+            return len(keys)
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(
+                entries=len(self._entries),
+                hits=self._hits,
+                misses=self._misses,
+                coalesced=self._coalesced,
+                evictions=self._evictions,
+                bytes=self._bytes,
+            )
+
+    def _store_locked(self, key: Hashable, value: V, size: int) -> None:
+        if key in self._entries:
+            self._remove_locked(key)
+        if self._max_bytes is not None and size > self._max_bytes:
+            return
+        self._entries[key] = (time.monotonic() + self._ttl, value, size)
+        self._bytes += size
+        while len(self._entries) > self._maxsize or (
+            self._max_bytes is not None and self._bytes > self._max_bytes
+        ):
+            _, (_, _, evicted_size) = self._entries.popitem(last=False)
+            self._bytes -= evicted_size
+            self._evictions += 1
+
+    def _remove_locked(self, key: Hashable) -> None:
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
+
+    @staticmethod
+    def _wait(flight: _Flight, token: CancelToken) -> Any:
+        while not flight.done.wait(_WAIT_SLICE):
+            token.raise_if_cancelled()
+        if flight.error is not None:
+            raise flight.error
+        return flight.value
@@ -0,0 +1,133 @@
+"""On-disk snapshot of cluster metadata, so a restarted server starts warm.
+
+Database and table listings and ``DESCRIBE`` results are written to a SQLite
+file as they are fetched, and loaded back into the metadata cache at startup.
+Each schema is stored with a fingerprint of the table's ``SHOW TABLE
+EXTENDED`` information; revalidation compares fingerprints per database and
+re-describes only the tables that changed.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections.abc import Callable
+from typing import Any
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    version TEXT,
+    fetched_at REAL NOT NULL
+)
+"""
+
+# Lines of the SHOW TABLE EXTENDED information block that change without the
+# schema changing.
+_VOLATILE_PREFIXES = ("Last Access", "Statistics")
+
+_UNSAFE_CHARS_RE = re.compile(r"[^A-Za-z0-9._-]")
+
+
+def snapshot_path(directory: str, host: str, port: int) -> str:
+    """Snapshot file for one cluster endpoint inside ``directory``."""
+    return os.path.join(directory, f"{_UNSAFE_CHARS_RE.sub('_', host)}_{port}.sqlite")
+
+
+def table_fingerprint(information: str) -> str:
+    """Digest of a table's ``SHOW TABLE EXTENDED`` information, minus volatile lines."""
+    lines = [
+        line for line in information.splitlines()
+        if line.strip() and not line.startswith(_VOLATILE_PREFIXES)
+    ]
+    return hashlib.sha1("\n".join(lines).encode(), usedforsecurity=False).hexdigest()
+
+
+def _encode_key(key: tuple[Any, ...]) -> str:
+    return json.dumps(list(key))
+
+
+def _decode_value(kind: str, value: str) -> tuple[Any, ...]:
+    items = json.loads(value)
+    if kind == "columns":
+        return tuple(dict(row) for row in items)
+    return tuple(items)
+
+
+class CatalogSnapshot:
+    """SQLite file holding metadata cache entries keyed like the in-memory cache.
+
+    Only ``databases``, ``tables`` and ``columns`` entries are persisted. The
+    connection is shared between threads and guarded by a lock; writes are
+    small and infrequent, so this is not a bottleneck.
+    """
+
+    PERSISTED_KINDS = ("databases", "tables", "columns")
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(_SCHEMA)
+
+    def load(self) -> list[tuple[tuple[str, ...], tuple[Any, ...]]]:
+        """Every stored entry as ``(cache key, value)``."""
+        with self._lock:
+            rows = self._conn.execute("SELECT key, value FROM entries").fetchall()
+        entries = []
+        for key, value in rows:
+            parts = tuple(json.loads(key))
+            entries.append((parts, _decode_value(parts[0], value)))
+        return entries
+
+    def store(
+        self, key: tuple[Any, ...], value: tuple[Any, ...], version: str | None = None
+    ) -> None:
+        """Write an entry; without ``version``, an already stored fingerprint is kept."""
+        if key[0] not in self.PERSISTED_KINDS:
+            return
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO entries (key, value, version, fetched_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value, "
+                "version = COALESCE(excluded.version, version), "
+                "fetched_at = excluded.fetched_at",
+                (_encode_key(key), json.dumps(list(value), default=str), version, time.time()),
+            )
+
+    def versions(self, database: str) -> dict[str, str | None]:
+        """Stored schema fingerprint per table of ``database`` (lower-cased names)."""
+        with self._lock:
+            rows = self._conn.execute("SELECT key, version FROM entries").fetchall()
+        versions = {}
+        for key, version in rows:
+            parts = json.loads(key)
+            if parts[0] == "columns" and parts[1] == database:
+                versions[parts[2]] = version
+        return versions
+
+    def delete(self, predicate: Callable[[tuple[Any, ...]], bool] | None = None) -> int:
+        """Remove entries whose key matches ``predicate`` (all entries if omitted)."""
+        with self._lock:
+            if predicate is None:
+                return self._conn.execute("DELETE FROM entries").rowcount
+            keys = [
+                key for (key,) in self._conn.execute("SELECT key FROM entries")
+                if predicate(tuple(json.loads(key)))
+            ]
+            self._conn.executemany("DELETE FROM entries WHERE key = ?", [(k,) for k in keys])
+            return len(keys)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
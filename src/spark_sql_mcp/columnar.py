@@ -0,0 +1,182 @@
+"""Column-wise decoding of HiveServer2 row sets, with an optional Arrow variant.
+
+PyHive's ``fetchmany`` hands out rows one ``fetchone`` call at a time, and
+clears null slots with a Python loop over every bit of each column's null
+bitmap. The decoders here send ``FetchResults`` themselves and work a column
+at a time instead. Only the bits that are actually set are visited, and rows
+are built with one ``zip`` per batch.
+
+With pyarrow installed (``pip install 'spark-sql-mcp-server[arrow]'``), a row
+set can also be decoded straight into an Arrow record batch, with the null
+bitmap becoming the validity buffer. That only pays off when the data stays in
+Arrow, so it is used for background query results, which are kept as Arrow
+tables and turned into rows a page at a time.
+"""
+
+from __future__ import annotations
+
+import importlib.util
+from typing import TYPE_CHECKING, Any
+
+from .results import QueryResult
+
+if TYPE_CHECKING:
+    import pyarrow
+    from pyhive import hive
+    from TCLIService.ttypes import TColumn
+
+# TColumn value fields, and the Arrow type each one decodes to.
+_COLUMN_TYPES = (
+    ("boolVal", "bool_"),
+    ("byteVal", "int8"),
+    ("i16Val", "int16"),
+    ("i32Val", "int32"),
+    ("i64Val", "int64"),
+    ("doubleVal", "float64"),
+    ("stringVal", "string"),
+    ("binaryVal", "binary"),
+)
+
+# Field metadata key recording the HiveServer2 type of an Arrow column.
+_HIVE_TYPE = b"hive_type"
+
+
+def arrow_available() -> bool:
+    """Whether pyarrow can be imported, checked without importing it."""
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+def _unwrap(column: TColumn) -> tuple[str, Any]:
+    for field, type_name in _COLUMN_TYPES:
+        values = getattr(column, field, None)
+        if values is not None:
+            return type_name, values
+    raise ValueError("Result set column holds no values")
+
+
+def _null_bits(nulls: bytes, length: int) -> int:
+    """The null bitmap as an integer: bit i set means row i is null.
+
+    Servers drop trailing zero bytes, and may pad the last byte.
+    """
+    return int.from_bytes(nulls[: (length + 7) // 8], "little") & ((1 << length) - 1)
+
+
+def _converted(values: list[Any], type_name: str) -> list[Any]:
+    """Parse decimals and timestamps, which arrive as strings, the way PyHive does."""
+    from pyhive.hive import TYPES_CONVERTER
+
+    converter = TYPES_CONVERTER.get(type_name)
+    if converter is None:
+        return values
+    return [converter(value) if value else value for value in values]
+
+
+def decode_values(column: TColumn, type_name: str) -> list[Any]:
+    """One column of a ``TRowSet`` as a list of Python values, nulls as None."""
+    values = _unwrap(column)[1]
+    result = values.values
+    bits = _null_bits(values.nulls, len(result))
+    while bits:
+        lowest = bits & -bits
+        result[lowest.bit_length() - 1] = None
+        bits ^= lowest
+    return _converted(result, type_name)
+
+
+def _fetch_columns(cursor: hive.Cursor, size: int) -> list[TColumn] | None:
+    from pyhive.hive import _check_status
+    from TCLIService.ttypes import TFetchOrientation, TFetchResultsReq
+
+    request = TFetchResultsReq(
+        operationHandle=cursor._operationHandle,
+        orientation=TFetchOrientation.FETCH_NEXT,
+        maxRows=size,
+    )
+    response = cursor._connection.client.FetchResults(request)
+    _check_status(response)
+    columns = response.results.columns
+    if not columns or not len(_unwrap(columns[0])[1].values):
+        return None
+    return columns
+
+
+def fetchmany(cursor: hive.Cursor, size: int) -> list[tuple[Any, ...]]:
+    """Drop-in for ``cursor.fetchmany(size)`` that decodes column by column."""
+    columns = _fetch_columns(cursor, size)
+    if columns is None:
+        return []
+    return list(zip(*(
+        decode_values(column, desc[1]) for column, desc in zip(columns, cursor.description)
+    )))
+
+
+def decode_array(column: TColumn) -> pyarrow.Array:
+    """One column of a ``TRowSet`` as an Arrow array, with its nulls applied."""
+    import pyarrow as pa
+
+    type_name, values = _unwrap(column)
+    array = pa.array(values.values, type=getattr(pa, type_name)())
+    length = len(array)
+    bits = _null_bits(values.nulls, length)
+    if not bits:
+        return array
+    # Arrow's validity bitmap uses the same bit order, with set meaning valid.
+    validity = (~bits & ((1 << length) - 1)).to_bytes((length + 7) // 8, "little")
+    return pa.Array.from_buffers(
+        array.type, length, [pa.py_buffer(validity), *array.buffers()[1:]]
+    )
+
+
+def fetch_record_batch(cursor: hive.Cursor, size: int) -> pyarrow.RecordBatch | None:
+    """Fetch up to ``size`` rows of ``cursor``'s result set; None once it is exhausted."""
+    import pyarrow as pa
+
+    columns = _fetch_columns(cursor, size)
+    if columns is None:
+        return None
+    arrays = [decode_array(column) for column in columns]
+    schema = pa.schema([
+        pa.field(desc[0], array.type, metadata={_HIVE_TYPE: desc[1]})
+        for array, desc in zip(arrays, cursor.description)
+    ])
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+class ArrowResult:
+    """A query result held as an Arrow table rather than Python row tuples.
+
+    Values are stored in Arrow buffers instead of one Python object each, which
+    makes large results several times smaller. ``nbytes`` is known without
+    walking the rows. ``page`` turns a slice into a ``QueryResult``.
+    """
+
+    def __init__(self, table: pyarrow.Table):
+        self.table = table
+
+    @classmethod
+    def from_batches(cls, batches: list[pyarrow.RecordBatch]) -> ArrowResult:
+        import pyarrow as pa
+
+        return cls(pa.Table.from_batches(batches))
+
+    @property
+    def columns(self) -> tuple[str, ...]:
+        return tuple(self.table.column_names)
+
+    @property
+    def nbytes(self) -> int:
+        return self.table.nbytes
+
+    def __len__(self) -> int:
+        return self.table.num_rows
+
+    def page(self, offset: int, limit: int) -> QueryResult:
+        sliced = self.table.slice(offset, limit)
+        types = [
+            (field.metadata or {}).get(_HIVE_TYPE, b"").decode() for field in sliced.schema
+        ]
+        return QueryResult(self.columns, tuple(zip(*(
+            _converted(column.to_pylist(), type_name)
+            for column, type_name in zip(sliced.columns, types)
+        ))))
@@ -1,9 +1,66 @@
 """Configuration management for Spark SQL MCP Server."""
 
 import os
-from dataclasses import dataclass
+import re
+from collections.abc import Mapping
+from dataclasses import dataclass, fields
+
+from .formats import FORMATS
 
 _VALID_AUTH_MODES = frozenset({"NONE", "LDAP", "KERBEROS", "CUSTOM", "NOSASL"})
+_VALID_METRICS_SINKS = frozenset({"logging", "otel", "none"})
+_VALID_COST_GUARD_MODES = frozenset({"off", "warn", "reject"})
+_VALID_FETCH_BACKENDS = frozenset({"pyhive", "columnar", "arrow"})
+_CLUSTER_NAME_RE = re.compile(r"^[a-z][a-z0-9_]*$")
+
+
+def _env(name: str, cluster: str | None = None) -> tuple[str, str | None]:
+    """Look up ``SPARK_<KEY>``, preferring ``SPARK_<CLUSTER>_<KEY>`` for a named cluster.
+
+    Returns the variable that was found (for error messages) and its value.
+    """
+    if cluster is not None:
+        scoped = f"SPARK_{cluster.upper()}_{name.removeprefix('SPARK_')}"
+        value = os.environ.get(scoped)
+        if value is not None and value != "":
+            return scoped, value
+    return name, os.environ.get(name)
+
+
+def _env_str(name: str, default: str, cluster: str | None = None) -> str:
+    _, value = _env(name, cluster)
+    return value if value else default
+
+
+def _env_int(name: str, default: int, cluster: str | None = None) -> int:
+    name, value = _env(name, cluster)
+    if value is None or value == "":
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"Invalid {name} value: {value!r}. Must be an integer.") from None
+
+
+def _env_bool(name: str, default: bool, cluster: str | None = None) -> bool:
+    name, value = _env(name, cluster)
+    if value is None or value == "":
+        return default
+    if value.lower() in ("1", "true", "yes", "on"):
+        return True
+    if value.lower() in ("0", "false", "no", "off"):
+        return False
+    raise ValueError(f"Invalid {name} value: {value!r}. Must be true or false.")
+
+
+def _env_float(name: str, default: float, cluster: str | None = None) -> float:
+    name, value = _env(name, cluster)
+    if value is None or value == "":
+        return default
+    try:
+        return float(value)
+    except ValueError:
+        raise ValueError(f"Invalid {name} value: {value!r}. Must be a number.") from None
 
 
 @dataclass(frozen=True)
@@ -15,35 +72,277 @@ class SparkConfig:
     username: str | None = None
     password: str | None = None
     kerberos_service_name: str = "hive"
+    pool_min_size: int = 1
+    pool_max_size: int = 4
+    pool_timeout: float = 30.0
+    pool_idle_timeout: float = 300.0
+    pool_metadata_reserved: int = 1
+    prewarm: bool = False
+    fetch_size: int = 1000
+    fetch_backend: str = "pyhive"
+    reconnect_attempts: int = 3
+    reconnect_backoff: float = 0.5
+    reconnect_backoff_max: float = 10.0
+    liveness_interval: float = 30.0
+    metadata_cache_ttl: float = 300.0
+    metadata_cache_size: int = 1024
+    result_cache_ttl: float = 0.0
+    result_cache_max_bytes: int = 64 * 1024 * 1024
+    metrics_sink: str = "logging"
+    slow_query_ms: float = 5000.0
+    cost_guard: str = "off"
+    cost_max_scan_bytes: int = 0
+    cost_max_scan_rows: int = 0
+    cost_require_partition_filter: bool = False
+    output_format: str = "markdown"
+    max_cell_chars: int = 0
+    max_response_bytes: int = 256 * 1024
+    catalog_dir: str | None = None
+    catalog_refresh_interval: float = 3600.0
+    search_index_interval: float = 0.0
+    batch_parallelism: int = 4
+
+    def __post_init__(self) -> None:
+        if self.pool_max_size < 1:
+            raise ValueError("pool_max_size must be at least 1")
+        if not 0 <= self.pool_min_size <= self.pool_max_size:
+            raise ValueError("pool_min_size must be between 0 and pool_max_size")
+        if self.pool_metadata_reserved < 0:
+            raise ValueError("pool_metadata_reserved must not be negative")
+        if self.fetch_size < 1:
+            raise ValueError("fetch_size must be at least 1")
+        if self.batch_parallelism < 1:
+            raise ValueError("batch_parallelism must be at least 1")
+        if self.fetch_backend not in _VALID_FETCH_BACKENDS:
+            raise ValueError(
+                f"Invalid fetch backend: {self.fetch_backend!r}. "
+                f"Must be one of: {', '.join(sorted(_VALID_FETCH_BACKENDS))}"
+            )
+        if self.reconnect_attempts < 1:
+            raise ValueError("reconnect_attempts must be at least 1")
+        if self.metrics_sink not in _VALID_METRICS_SINKS:
+            raise ValueError(
+                f"Invalid metrics sink: {self.metrics_sink!r}. "
+                f"Must be one of: {', '.join(sorted(_VALID_METRICS_SINKS))}"
+            )
+        if self.cost_guard not in _VALID_COST_GUARD_MODES:
+            raise ValueError(
+                f"Invalid cost guard mode: {self.cost_guard!r}. "
+                f"Must be one of: {', '.join(sorted(_VALID_COST_GUARD_MODES))}"
+            )
+        if self.output_format not in FORMATS:
+            raise ValueError(
+                f"Invalid output format: {self.output_format!r}. "
+                f"Must be one of: {', '.join(FORMATS)}"
+            )
+        if self.max_cell_chars < 0:
+            raise ValueError("max_cell_chars must not be negative")
+        if self.max_response_bytes < 0:
+            raise ValueError("max_response_bytes must not be negative")
 
     def __repr__(self) -> str:
-        return (
-            f"SparkConfig(host={self.host!r}, port={self.port!r}, "
-            f"database={self.database!r}, auth={self.auth!r}, "
-            f"username={self.username!r}, "
-            f"password={'****' if self.password else None!r}, "
-            f"kerberos_service_name={self.kerberos_service_name!r})"
-        )
+        parts = []
+        for f in fields(self):
+            value = getattr(self, f.name)
+            if f.name == "password" and value:
+                value = "****"
+            parts.append(f"{f.name}={value!r}")
+        return f"SparkConfig({', '.join(parts)})"
+
+    @property
+    def pool_query_size(self) -> int:
+        """Pool connections left for queries after the metadata reservation (at least 1)."""
+        return max(1, self.pool_max_size - self.pool_metadata_reserved)
 
     @classmethod
-    def from_env(cls) -> "SparkConfig":
-        host = os.environ.get("SPARK_HOST")
-        if not host:
-            raise ValueError("SPARK_HOST environment variable is required")
+    def from_env(cls, cluster: str | None = None) -> "SparkConfig":
+        """Read settings from ``SPARK_*`` environment variables.
 
-        auth = os.environ.get("SPARK_AUTH", "NONE").upper()
+        For a named ``cluster``, ``SPARK_<CLUSTER>_<KEY>`` overrides ``SPARK_<KEY>``
+        for every setting; the host must be given per cluster.
+        """
+        if cluster is None:
+            host = os.environ.get("SPARK_HOST")
+            if not host:
+                raise ValueError("SPARK_HOST environment variable is required")
+        else:
+            host = os.environ.get(f"SPARK_{cluster.upper()}_HOST")
+            if not host:
+                raise ValueError(
+                    f"SPARK_{cluster.upper()}_HOST environment variable is required"
+                )
+
+        auth_var, auth = _env("SPARK_AUTH", cluster)
+        auth = (auth or "NONE").upper()
         if auth not in _VALID_AUTH_MODES:
             raise ValueError(
-                f"Invalid SPARK_AUTH value: {auth!r}. "
+                f"Invalid {auth_var} value: {auth!r}. "
                 f"Must be one of: {', '.join(sorted(_VALID_AUTH_MODES))}"
             )
 
         return cls(
             host=host,
-            port=int(os.environ.get("SPARK_PORT", "10000")),
-            database=os.environ.get("SPARK_DATABASE", "default"),
+            port=_env_int("SPARK_PORT", 10000, cluster),
+            database=_env_str("SPARK_DATABASE", "default", cluster),
             auth=auth,
-            username=os.environ.get("SPARK_USERNAME"),
-            password=os.environ.get("SPARK_PASSWORD"),
-            kerberos_service_name=os.environ.get("SPARK_KERBEROS_SERVICE_NAME", "hive"),
+            username=_env("SPARK_USERNAME", cluster)[1],
+            password=_env("SPARK_PASSWORD", cluster)[1],
+            kerberos_service_name=_env_str("SPARK_KERBEROS_SERVICE_NAME", "hive", cluster),
+            pool_min_size=_env_int("SPARK_POOL_MIN_SIZE", 1, cluster),
+            pool_max_size=_env_int("SPARK_POOL_MAX_SIZE", 4, cluster),
+            pool_timeout=_env_float("SPARK_POOL_TIMEOUT", 30.0, cluster),
+            pool_idle_timeout=_env_float("SPARK_POOL_IDLE_TIMEOUT", 300.0, cluster),
+            pool_metadata_reserved=_env_int("SPARK_POOL_METADATA_RESERVED", 1, cluster),
+            prewarm=_env_bool("SPARK_PREWARM", False, cluster),
+            fetch_size=_env_int("SPARK_FETCH_SIZE", 1000, cluster),
+            fetch_backend=_env_str("SPARK_FETCH_BACKEND", "pyhive", cluster).lower(),
+            reconnect_attempts=_env_int("SPARK_RECONNECT_ATTEMPTS", 3, cluster),
+            reconnect_backoff=_env_float("SPARK_RECONNECT_BACKOFF", 0.5, cluster),
+            reconnect_backoff_max=_env_float("SPARK_RECONNECT_BACKOFF_MAX", 10.0, cluster),
+            liveness_interval=_env_float("SPARK_LIVENESS_INTERVAL", 30.0, cluster),
+            metadata_cache_ttl=_env_float("SPARK_METADATA_CACHE_TTL", 300.0, cluster),
+            metadata_cache_size=_env_int("SPARK_METADATA_CACHE_SIZE", 1024, cluster),
+            result_cache_ttl=_env_float("SPARK_RESULT_CACHE_TTL", 0.0, cluster),
+            result_cache_max_bytes=_env_int(
+                "SPARK_RESULT_CACHE_MAX_BYTES", 64 * 1024 * 1024, cluster
+            ),
+            metrics_sink=_env_str("SPARK_METRICS_SINK", "logging", cluster).lower(),
+            slow_query_ms=_env_float("SPARK_SLOW_QUERY_MS", 5000.0, cluster),
+            cost_guard=_env_str("SPARK_COST_GUARD", "off", cluster).lower(),
+            cost_max_scan_bytes=_env_int("SPARK_COST_MAX_SCAN_BYTES", 0, cluster),
+            cost_max_scan_rows=_env_int("SPARK_COST_MAX_SCAN_ROWS", 0, cluster),
+            cost_require_partition_filter=_env_bool(
+                "SPARK_COST_REQUIRE_PARTITION_FILTER", False, cluster
+            ),
+            output_format=_env_str("SPARK_OUTPUT_FORMAT", "markdown", cluster).lower(),
+            max_cell_chars=_env_int("SPARK_MAX_CELL_CHARS", 0, cluster),
+            max_response_bytes=_env_int("SPARK_MAX_RESPONSE_BYTES", 256 * 1024, cluster),
+            catalog_dir=_env("SPARK_CATALOG_DIR", cluster)[1] or None,
+            catalog_refresh_interval=_env_float(
+                "SPARK_CATALOG_REFRESH_INTERVAL", 3600.0, cluster
+            ),
+            search_index_interval=_env_float("SPARK_SEARCH_INDEX_INTERVAL", 0.0, cluster),
+            batch_parallelism=_env_int("SPARK_BATCH_PARALLELISM", 4, cluster),
+        )
+
+
+@dataclass(frozen=True)
+class RoutingConfig:
+    """Named cluster targets and the rules that pick one for each request.
+
+    ``routes`` maps database name patterns (shell-style globs, first match wins)
+    to cluster names. Metadata lookups go to ``metadata_cluster`` when set. With
+    ``failover`` enabled, requests routed by rule may move to another cluster
+    when theirs is unreachable or its connection pool is saturated.
+    """
+
+    clusters: Mapping[str, SparkConfig]
+    default_cluster: str
+    routes: tuple[tuple[str, str], ...] = ()
+    metadata_cluster: str | None = None
+    failover: bool = False
+
+    def __post_init__(self) -> None:
+        if not self.clusters:
+            raise ValueError("At least one cluster must be configured")
+        targets = [self.default_cluster, *(c for _, c in self.routes)]
+        if self.metadata_cluster is not None:
+            targets.append(self.metadata_cluster)
+        for name in targets:
+            if name not in self.clusters:
+                raise ValueError(
+                    f"Unknown cluster: {name!r}. Must be one of: {', '.join(self.clusters)}"
+                )
+
+    @classmethod
+    def from_env(cls) -> "RoutingConfig":
+        """Read ``SPARK_CLUSTERS`` and the routing variables.
+
+        Without ``SPARK_CLUSTERS`` there is a single cluster named ``default``
+        configured by the plain ``SPARK_*`` variables.
+        """
+        names = [n.strip().lower() for n in os.environ.get("SPARK_CLUSTERS", "").split(",")]
+        names = [n for n in names if n]
+        if not names:
+            return cls(clusters={"default": SparkConfig.from_env()}, default_cluster="default")
+        for name in names:
+            if not _CLUSTER_NAME_RE.match(name):
+                raise ValueError(
+                    f"Invalid cluster name in SPARK_CLUSTERS: {name!r}. "
+                    "Use letters, digits and underscores."
+                )
+        if len(set(names)) != len(names):
+            raise ValueError("SPARK_CLUSTERS contains duplicate names")
+
+        routes = []
+        for rule in os.environ.get("SPARK_ROUTES", "").split(","):
+            if not rule.strip():
+                continue
+            pattern, sep, cluster = rule.partition("=")
+            if not sep or not pattern.strip() or not cluster.strip():
+                raise ValueError(
+                    f"Invalid SPARK_ROUTES rule: {rule.strip()!r}. Expected <database>=<cluster>."
+                )
+            routes.append((pattern.strip().lower(), cluster.strip().lower()))
+
+        metadata_cluster = os.environ.get("SPARK_METADATA_CLUSTER", "").strip().lower()
+        return cls(
+            clusters={name: SparkConfig.from_env(name) for name in names},
+            default_cluster=os.environ.get("SPARK_DEFAULT_CLUSTER", names[0]).strip().lower(),
+            routes=tuple(routes),
+            metadata_cluster=metadata_cluster or None,
+            failover=_env_bool("SPARK_FAILOVER", False),
+        )
+
+
+@dataclass(frozen=True)
+class AdmissionConfig:
+    """Server-wide limits on concurrent tool calls (0 means unlimited)."""
+
+    max_concurrent_queries: int = 3
+    max_session_queries: int = 0
+    queue_size: int = 32
+    queue_timeout: float = 30.0
+    max_concurrent_metadata: int = 4
+
+    def __post_init__(self) -> None:
+        for f in fields(self):
+            if getattr(self, f.name) < 0:
+                raise ValueError(f"{f.name} must not be negative")
+
+    @classmethod
+    def from_env(cls) -> "AdmissionConfig":
+        return cls(
+            max_concurrent_queries=_env_int("SPARK_MAX_CONCURRENT_QUERIES", 3),
+            max_session_queries=_env_int("SPARK_MAX_SESSION_QUERIES", 0),
+            queue_size=_env_int("SPARK_ADMISSION_QUEUE_SIZE", 32),
+            queue_timeout=_env_float("SPARK_ADMISSION_TIMEOUT", 30.0),
+            max_concurrent_metadata=_env_int("SPARK_MAX_CONCURRENT_METADATA", 4),
+        )
+
+
+@dataclass(frozen=True)
+class JobConfig:
+    """Limits for queries submitted to run in the background."""
+
+    max_running: int = 2
+    max_jobs: int = 100
+    result_ttl: float = 3600.0
+    result_max_bytes: int = 256 * 1024 * 1024
+
+    def __post_init__(self) -> None:
+        if self.max_running < 1:
+            raise ValueError("max_running must be at least 1")
+        if self.max_jobs < 1:
+            raise ValueError("max_jobs must be at least 1")
+        if self.result_ttl <= 0 or self.result_max_bytes <= 0:
+            raise ValueError("result_ttl and result_max_bytes must be positive")
+
+    @classmethod
+    def from_env(cls) -> "JobConfig":
+        return cls(
+            max_running=_env_int("SPARK_JOB_MAX_RUNNING", 2),
+            max_jobs=_env_int("SPARK_JOB_HISTORY", 100),
+            result_ttl=_env_float("SPARK_JOB_RESULT_TTL", 3600.0),
+            result_max_bytes=_env_int("SPARK_JOB_RESULT_MAX_BYTES", 256 * 1024 * 1024),
         )
@@ -0,0 +1,108 @@
+"""Run blocking Thrift work off the event loop, with cooperative cancellation."""
+
+import asyncio
+import threading
+from collections.abc import Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, TypeVar
+
+T = TypeVar("T")
+
+
+class QueryCancelledError(Exception):
+    """Raised in a worker thread when its request was cancelled by the client."""
+
+
+class CancelToken:
+    """Cancellation flag shared between an async caller and its worker thread.
+
+    Thrift transports are not thread-safe, so the caller never touches the cursor
+    itself. It only sets the flag; the worker notices it between polls and fetch
+    batches and cancels the HiveServer2 operation from its own thread.
+    """
+
+    def __init__(self) -> None:
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks: list[Callable[[], None]] = []
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self) -> None:
+        with self._lock:
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            callback()
+
+    def on_cancel(self, callback: Callable[[], None]) -> Callable[[], None]:
+        """Call ``callback`` once when the token is cancelled, or now if it already is.
+
+        Returns a function that unregisters the callback.
+        """
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return lambda: self._discard(callback)
+        callback()
+        return lambda: None
+
+    def _discard(self, callback: Callable[[], None]) -> None:
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+    def wait(self, timeout: float) -> bool:
+        """Sleep for up to ``timeout`` seconds, returning early if cancelled."""
+        return self._event.wait(timeout)
+
+    def raise_if_cancelled(self) -> None:
+        if self._event.is_set():
+            raise QueryCancelledError("Query was cancelled")
+
+
+_NEVER_CANCELLED = CancelToken()
+_current_token: ContextVar[CancelToken] = ContextVar("spark_sql_cancel_token")
+
+
+def current_token() -> CancelToken:
+    """Return the cancel token of the request running on this thread."""
+    return _current_token.get(_NEVER_CANCELLED)
+
+
+@contextmanager
+def cancel_scope(token: CancelToken) -> Iterator[None]:
+    """Make ``token`` the current token for blocking work run in the block."""
+    reset = _current_token.set(token)
+    try:
+        yield
+    finally:
+        _current_token.reset(reset)
+
+
+class BlockingExecutor:
+    """Bounded thread pool that runs blocking calls on behalf of async tools."""
+
+    def __init__(self, max_workers: int):
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="spark-sql")
+
+    async def run(self, fn: Callable[..., T], *args: Any) -> T:
+        token = CancelToken()
+
+        def _call() -> T:
+            with cancel_scope(token):
+                return fn(*args)
+
+        future = asyncio.get_running_loop().run_in_executor(self._pool, _call)
+        try:
+            return await future
+        except asyncio.CancelledError:
+            token.cancel()
+            raise
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,133 @@
+"""Result encoders: markdown, CSV, TSV, JSON lines and column-oriented JSON.
+
+Each encoder writes straight into a text buffer as it walks the rows, rather
+than building one string per row and joining them at the end.
+"""
+
+import csv
+import io
+import json
+from collections.abc import Callable, Iterable
+from typing import Any, TextIO
+
+from .results import QueryResult
+
+FORMATS = ("markdown", "csv", "tsv", "jsonl", "json")
+
+_ELLIPSIS = "..."
+
+
+def validate_format(fmt: str) -> str:
+    fmt = fmt.lower()
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format: {fmt!r}. Must be one of: {', '.join(FORMATS)}")
+    return fmt
+
+
+def truncate_text(text: str, max_chars: int) -> str:
+    """Cut ``text`` to ``max_chars`` characters, ending in ``...``; 0 means no limit."""
+    if not max_chars or len(text) <= max_chars:
+        return text
+    if max_chars <= len(_ELLIPSIS):
+        return text[:max_chars]
+    return text[: max_chars - len(_ELLIPSIS)] + _ELLIPSIS
+
+
+def _text_cell(max_chars: int) -> Callable[[Any], str]:
+    def _cell(value: Any) -> str:
+        if isinstance(value, (int, float)):
+            return str(value)
+        return truncate_text(str(value), max_chars)
+    return _cell
+
+
+def _json_cell(max_chars: int) -> Callable[[Any], Any]:
+    # Numbers, booleans and nulls keep their types; only text is cut.
+    def _cell(value: Any) -> Any:
+        if value is None or isinstance(value, (bool, int, float)):
+            return value
+        return truncate_text(str(value), max_chars)
+    return _cell
+
+
+def _encoder() -> Callable[[Any], str]:
+    # Decimals, dates and other non-JSON values are sent as their string form.
+    return json.JSONEncoder(separators=(",", ":"), ensure_ascii=False, default=str).encode
+
+
+def _write_markdown(out: TextIO, result: QueryResult, max_chars: int) -> None:
+    cell = _text_cell(max_chars) if max_chars else str
+    out.write("| ")
+    out.write(" | ".join(result.columns))
+    out.write(" |\n| ")
+    out.write(" | ".join("---" for _ in result.columns))
+    out.write(" |")
+    for row in result.rows:
+        out.write("\n| ")
+        out.write(" | ".join(map(cell, row)))
+        out.write(" |")
+
+
+def _write_delimited(out: TextIO, result: QueryResult, max_chars: int, delimiter: str) -> None:
+    writer = csv.writer(out, delimiter=delimiter, lineterminator="\n")
+    writer.writerow(result.columns)
+    # csv writes None as an empty field.
+    if not max_chars:
+        writer.writerows(result.rows)
+        return
+    cell = _json_cell(max_chars)
+    for row in result.rows:
+        writer.writerow(map(cell, row))
+
+
+def _write_jsonl(out: TextIO, result: QueryResult, max_chars: int) -> None:
+    columns = result.columns
+    encode = _encoder()
+    rows: Iterable[tuple[Any, ...]] = result.rows
+    if max_chars:
+        cell = _json_cell(max_chars)
+        rows = (tuple(map(cell, row)) for row in rows)
+    for i, row in enumerate(rows):
+        if i:
+            out.write("\n")
+        out.write(encode(dict(zip(columns, row))))
+
+
+def _write_json(out: TextIO, result: QueryResult, max_chars: int) -> None:
+    """``{"columns": [...], "rows": [[...], ...]}``: column names are sent once."""
+    encode = _encoder()
+    rows: Iterable[tuple[Any, ...]] = result.rows
+    if max_chars:
+        cell = _json_cell(max_chars)
+        rows = (tuple(map(cell, row)) for row in rows)
+    out.write('{"columns":')
+    out.write(encode(result.columns))
+    out.write(',"rows":[')
+    for i, row in enumerate(rows):
+        if i:
+            out.write(",")
+        out.write(encode(row))
+    out.write("]}")
+
+
+def write_result(
+    out: TextIO, result: QueryResult, fmt: str = "markdown", *, max_cell_chars: int = 0
+) -> None:
+    """Encode ``result`` into ``out``; strings longer than ``max_cell_chars`` are cut."""
+    fmt = validate_format(fmt)
+    if fmt == "markdown":
+        _write_markdown(out, result, max_cell_chars)
+    elif fmt == "csv":
+        _write_delimited(out, result, max_cell_chars, ",")
+    elif fmt == "tsv":
+        _write_delimited(out, result, max_cell_chars, "\t")
+    elif fmt == "jsonl":
+        _write_jsonl(out, result, max_cell_chars)
+    else:
+        _write_json(out, result, max_cell_chars)
+
+
+def format_result(result: QueryResult, fmt: str = "markdown", *, max_cell_chars: int = 0) -> str:
+    out = io.StringIO()
+    write_result(out, result, fmt, max_cell_chars=max_cell_chars)
+    return out.getvalue()
@@ -0,0 +1,197 @@
+"""Pre-flight cost check for queries, based on Spark's ``EXPLAIN COST`` output.
+
+Spark prints plan statistics as ``Statistics(sizeInBytes=1.2 TiB, rowCount=3.00E+9)``
+on each node of the optimized logical plan. The leaf relations carry the size
+of the data each table scan reads; ``rowCount`` is only present for tables
+with computed statistics (``ANALYZE TABLE ... COMPUTE STATISTICS``).
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+from .sql import table_references
+
+if TYPE_CHECKING:
+    from .spark_client import SparkSQLClient
+
+logger = logging.getLogger(__name__)
+
+_UNITS = {
+    "B": 1, "KiB": 1 << 10, "MiB": 1 << 20, "GiB": 1 << 30,
+    "TiB": 1 << 40, "PiB": 1 << 50, "EiB": 1 << 60,
+}
+# Spark reports Long.MaxValue ("8.0 EiB") when it has no estimate at all.
+_UNKNOWN_SIZE = 8 << 60
+
+_STATS_RE = re.compile(
+    r"Statistics\(sizeInBytes=(?P<size>[\d.]+)\s*(?P<unit>[KMGTPE]?i?B)"
+    r"(?:,\s*rowCount=(?P<rows>[\d.E+]+))?"
+)
+_RELATION_RE = re.compile(r"\b(?:Relation|HiveTableRelation)\b")
+_FILE_SCAN_RE = re.compile(
+    r"FileScan \w+ (?P<table>[\w.`]+)\[.*?PartitionFilters: \[(?P<filters>[^\]]*)\]"
+)
+_SECTION_RE = re.compile(r"^== (.+) ==$", re.MULTILINE)
+
+
+class QueryTooExpensiveError(ValueError):
+    """Raised in ``reject`` mode when a query's estimated cost exceeds the limits."""
+
+
+@dataclass(frozen=True)
+class PlanEstimate:
+    """Cost figures parsed from ``EXPLAIN COST``; ``None`` where Spark had no estimate."""
+
+    scan_bytes: int | None
+    scan_rows: int | None
+    # Tables (as printed in the plan) scanned with an empty PartitionFilters list.
+    unfiltered_scans: tuple[str, ...]
+    # A bare LIMIT over a scan, which Spark runs by reading partitions incrementally.
+    incremental: bool
+
+
+def _sections(plan: str) -> dict[str, str]:
+    parts = _SECTION_RE.split(plan)
+    return {parts[i].strip(): parts[i + 1] for i in range(1, len(parts) - 1, 2)}
+
+
+def _to_bytes(size: str, unit: str) -> int:
+    return int(float(size) * _UNITS.get(unit, 1))
+
+
+def parse_plan(plan: str) -> PlanEstimate:
+    sections = _sections(plan)
+    logical = sections.get("Optimized Logical Plan", "")
+    physical = sections.get("Physical Plan", "")
+
+    scan_bytes: int | None = 0
+    scan_rows: int | None = 0
+    relations = 0
+    for line in logical.splitlines():
+        if not _RELATION_RE.search(line):
+            continue
+        match = _STATS_RE.search(line)
+        if match is None:
+            continue
+        relations += 1
+        size = _to_bytes(match["size"], match["unit"])
+        scan_bytes = None if scan_bytes is None or size >= _UNKNOWN_SIZE else scan_bytes + size
+        rows = match["rows"]
+        scan_rows = None if scan_rows is None or rows is None else scan_rows + int(float(rows))
+    if not relations:
+        scan_bytes = scan_rows = None
+
+    unfiltered = tuple(
+        m["table"].replace("`", "").lower()
+        for m in _FILE_SCAN_RE.finditer(physical)
+        if not m["filters"].strip()
+    )
+    operators = [line.strip(" +-:*()0123456789") for line in physical.splitlines() if line.strip()]
+    if operators and operators[0].startswith("AdaptiveSparkPlan"):
+        operators = operators[1:]
+    incremental = bool(operators) and operators[0].startswith("CollectLimit") and not any(
+        op.startswith(("Exchange", "Filter", "Sort", "HashAggregate", "SortAggregate"))
+        for op in operators
+    )
+    return PlanEstimate(scan_bytes, scan_rows, unfiltered, incremental)
+
+
+def partition_columns(describe_rows: list[dict[str, Any]]) -> list[str]:
+    """Partition columns listed by ``DESCRIBE`` under ``# Partition Information``."""
+    columns: list[str] = []
+    in_partitions = False
+    for row in describe_rows:
+        name = (row.get("col_name") or "").strip()
+        if name == "# Partition Information":
+            in_partitions = True
+        elif in_partitions:
+            if not name or (name.startswith("#") and columns):
+                break
+            if not name.startswith("#"):
+                columns.append(name)
+    return columns
+
+
+def _format_bytes(n: int) -> str:
+    for unit in ("EiB", "PiB", "TiB", "GiB", "MiB", "KiB"):
+        if n >= _UNITS[unit]:
+            return f"{n / _UNITS[unit]:.1f} {unit}"
+    return f"{n} B"
+
+
+def _scans_table(scan: str, database: str, table: str) -> bool:
+    parts = scan.split(".")
+    return parts[-1] == table and (len(parts) < 2 or parts[-2] == database)
+
+
+def check_cost(client: SparkSQLClient, sql: str) -> str | None:
+    """Apply the client's cost limits to ``sql`` before it runs.
+
+    Returns a warning to show alongside the results in ``warn`` mode, raises
+    ``QueryTooExpensiveError`` in ``reject`` mode, and returns None when the
+    query is within limits. If the plan, or the schema of a scanned table,
+    cannot be obtained, that check is skipped; the query will fail on its own if
+    the statement is invalid.
+    """
+    config = client.config
+    if config.cost_guard == "off":
+        return None
+    try:
+        estimate = client.explain(sql)
+    except Exception:
+        logger.warning("EXPLAIN COST failed; running the query without a cost check")
+        return None
+
+    problems = []
+    if not estimate.incremental:
+        if (
+            config.cost_max_scan_bytes
+            and estimate.scan_bytes is not None
+            and estimate.scan_bytes > config.cost_max_scan_bytes
+        ):
+            problems.append(
+                f"it would scan about {_format_bytes(estimate.scan_bytes)} "
+                f"(limit {_format_bytes(config.cost_max_scan_bytes)})"
+            )
+        if (
+            config.cost_max_scan_rows
+            and estimate.scan_rows is not None
+            and estimate.scan_rows > config.cost_max_scan_rows
+        ):
+            problems.append(
+                f"it would scan about {estimate.scan_rows:,} rows "
+                f"(limit {config.cost_max_scan_rows:,})"
+            )
+    if config.cost_require_partition_filter and estimate.unfiltered_scans:
+        for ref in table_references(sql):
+            database = (ref.database or config.database).lower()
+            table = ref.table.lower()
+            if not any(_scans_table(s, database, table) for s in estimate.unfiltered_scans):
+                continue
+            try:
+                columns = partition_columns(client.describe_table(table, database))
+            except Exception:
+                # E.g. a quoted name DESCRIBE cannot take; Spark may still run the query.
+                logger.warning(
+                    "Could not describe %s.%s; skipping its partition filter check",
+                    database, table,
+                )
+                continue
+            if columns:
+                problems.append(
+                    f"{database}.{table} is read without a filter on its partition "
+                    f"columns ({', '.join(columns)})"
+                )
+
+    if not problems:
+        return None
+    message = f"Query cost check: {'; '.join(problems)}."
+    if config.cost_guard == "reject":
+        raise QueryTooExpensiveError(
+            f"{message} Add filters or a narrower projection, or ask for the limit to be raised."
+        )
+    return f"Warning: {message}"
@@ -0,0 +1,229 @@
+"""Background queries: submit now, poll for status, fetch the results later.
+
+A job runs on the registry's own worker threads, not the per-cluster tool
+executor, so a long query never holds an MCP request open. It still borrows a
+connection from its cluster's pool while it runs, but never the last one
+interactive queries can use; ``max_running`` caps how many run at once.
+Finished results are kept in a cache bounded by bytes and age, and the job
+records themselves are trimmed to ``max_jobs``.
+"""
+
+from __future__ import annotations
+
+import logging
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+from .admission import ServerBusyError
+from .cache import TTLCache
+from .columnar import ArrowResult
+from .config import JobConfig
+from .executor import CancelToken, QueryCancelledError, cancel_scope
+from .pool import PoolTimeoutError, background_checkouts
+from .results import QueryResult, result_size
+
+if TYPE_CHECKING:
+    from .spark_client import SparkSQLClient
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+FINISHED = "finished"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+_ACTIVE_STATES = (QUEUED, RUNNING)
+
+
+@dataclass
+class Job:
+    """One submitted query. Fields are updated by the worker while it runs."""
+
+    id: str
+    sql: str
+    cluster: str
+    client: SparkSQLClient = field(repr=False)
+    limit: int | None = None
+    warning: str | None = None
+    state: str = QUEUED
+    submitted_at: float = field(default_factory=time.time)
+    started_at: float | None = None
+    finished_at: float | None = None
+    rows_fetched: int = 0
+    error: str | None = None
+    token: CancelToken = field(default_factory=CancelToken, repr=False)
+
+    @property
+    def active(self) -> bool:
+        return self.state in _ACTIVE_STATES
+
+    def elapsed(self) -> float:
+        """Seconds spent running so far (or in total, once finished)."""
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.time()) - self.started_at
+
+
+def _result_size(result: QueryResult | ArrowResult) -> int:
+    return result.nbytes if isinstance(result, ArrowResult) else result_size(result)
+
+
+def _fetch(job: Job) -> QueryResult | ArrowResult:
+    """Run the job's query, counting rows as they arrive."""
+    if job.client.arrow_results:
+        batches = []
+        for batch in job.client.iter_record_batches(job.sql, job.limit):
+            batches.append(batch)
+            job.rows_fetched += len(batch)
+        if batches:
+            return ArrowResult.from_batches(batches)
+        return QueryResult((), ())
+    columns: tuple[str, ...] = ()
+    rows: list[tuple] = []
+    for batch in job.client.iter_batches(job.sql, job.limit):
+        columns = batch.columns
+        rows.extend(batch.rows)
+        job.rows_fetched = len(rows)
+    return QueryResult(columns, tuple(rows))
+
+
+class JobRegistry:
+    """Runs submitted queries in the background and keeps their results for a while."""
+
+    def __init__(
+        self,
+        max_running: int = 2,
+        *,
+        max_jobs: int = 100,
+        result_ttl: float = 3600.0,
+        result_max_bytes: int = 256 * 1024 * 1024,
+    ):
+        self._pool = ThreadPoolExecutor(max_running, thread_name_prefix="spark-sql-job")
+        self._max_jobs = max_jobs
+        self._jobs: OrderedDict[str, Job] = OrderedDict()
+        self._lock = threading.Lock()
+        self._results: TTLCache[QueryResult | ArrowResult] = TTLCache(
+            max_jobs, result_ttl, max_bytes=result_max_bytes, sizeof=_result_size
+        )
+
+    @classmethod
+    def from_config(cls, config: JobConfig) -> JobRegistry:
+        return cls(
+            config.max_running,
+            max_jobs=config.max_jobs,
+            result_ttl=config.result_ttl,
+            result_max_bytes=config.result_max_bytes,
+        )
+
+    def submit(
+        self,
+        client: SparkSQLClient,
+        sql: str,
+        *,
+        cluster: str,
+        limit: int | None = None,
+        warning: str | None = None,
+    ) -> Job:
+        with self._lock:
+            self._trim_locked()
+            if len(self._jobs) >= self._max_jobs:
+                raise ServerBusyError(
+                    f"Server busy: {len(self._jobs)} jobs are queued or running. "
+                    "Wait for one to finish or cancel one."
+                )
+            # Unguessable ids: any MCP session that knows one can read the results.
+            job = Job(f"job-{secrets.token_hex(6)}", sql, cluster, client, limit, warning)
+            self._jobs[job.id] = job
+        self._pool.submit(self._run, job)
+        return job
+
+    def get(self, job_id: str) -> Job:
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None:
+            raise ValueError(f"Unknown job: {job_id!r}")
+        return job
+
+    def jobs(self) -> list[Job]:
+        """All known jobs, most recently submitted first."""
+        with self._lock:
+            return list(reversed(self._jobs.values()))
+
+    def cancel(self, job_id: str) -> Job:
+        """Cancel a queued or running job; finished jobs are left as they are."""
+        job = self.get(job_id)
+        with self._lock:
+            if job.state == QUEUED:
+                job.state = CANCELLED
+                job.finished_at = time.time()
+        # A running job notices the token between polls and fetch batches and
+        # cancels the HiveServer2 operation from its own thread.
+        job.token.cancel()
+        return job
+
+    def results(self, job_id: str) -> QueryResult | ArrowResult:
+        job = self.get(job_id)
+        if job.state != FINISHED:
+            raise ValueError(
+                f"Job {job_id} is {job.state}; results are available once it has finished"
+            )
+        result = self._results.get(job_id)
+        if result is None:
+            raise ValueError(
+                f"Results of {job_id} are no longer available (expired or evicted "
+                "to stay within the memory budget). Submit the query again."
+            )
+        return result
+
+    def has_results(self, job_id: str) -> bool:
+        return self._results.get(job_id) is not None
+
+    def shutdown(self) -> None:
+        with self._lock:
+            jobs = list(self._jobs.values())
+        for job in jobs:
+            job.token.cancel()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self, job: Job) -> None:
+        with self._lock:
+            if job.state != QUEUED:
+                return
+            job.state = RUNNING
+            job.started_at = time.time()
+        try:
+            with cancel_scope(job.token), background_checkouts():
+                result = _fetch(job)
+            self._results.put(job.id, result)
+            state, error = FINISHED, None
+        except QueryCancelledError:
+            state, error = CANCELLED, None
+        except PoolTimeoutError:
+            state, error = FAILED, (
+                "Server busy: no Spark connection became free in time. Submit the query again."
+            )
+        except ValueError as exc:
+            state, error = FAILED, str(exc)
+        except Exception:
+            logger.exception("Job %s failed", job.id)
+            state, error = FAILED, "query execution failed. Check the server logs for details."
+        with self._lock:
+            job.state = state
+            job.error = error
+            job.finished_at = time.time()
+
+    def _trim_locked(self) -> None:
+        """Forget the oldest finished jobs beyond ``max_jobs - 1``."""
+        excess = len(self._jobs) - self._max_jobs + 1
+        if excess <= 0:
+            return
+        dropped = set([j.id for j in self._jobs.values() if not j.active][:excess])
+        for job_id in dropped:
+            del self._jobs[job_id]
+        self._results.invalidate(lambda key: key in dropped)
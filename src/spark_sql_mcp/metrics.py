@@ -0,0 +1,174 @@
+"""Per-query instrumentation: timing spans, counters and pluggable export sinks."""
+
+import logging
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any
+
+logger = logging.getLogger("spark_sql_mcp.metrics")
+slow_query_logger = logging.getLogger("spark_sql_mcp.slow_query")
+
+QUERY_SPAN = "spark.query"
+
+
+class Span:
+    """A timed unit of work with free-form attributes (rows, bytes, sql, ...)."""
+
+    __slots__ = ("name", "attributes", "parent", "start", "end", "sink_state")
+
+    def __init__(self, name: str, attributes: dict[str, Any], parent: "Span | None"):
+        self.name = name
+        self.attributes = attributes
+        self.parent = parent
+        self.start = time.perf_counter()
+        self.end: float | None = None
+        self.sink_state: Any = None
+
+    def set(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.end if self.end is not None else time.perf_counter()
+        return (end - self.start) * 1000
+
+
+class MetricsSink:
+    """Receives spans as they start and finish. The base class discards them."""
+
+    def on_start(self, span: Span) -> None:
+        pass
+
+    def on_end(self, span: Span) -> None:
+        pass
+
+
+class LoggingSink(MetricsSink):
+    """Logs every finished span at DEBUG level on the ``spark_sql_mcp.metrics`` logger."""
+
+    def on_end(self, span: Span) -> None:
+        if logger.isEnabledFor(logging.DEBUG):
+            attrs = " ".join(f"{k}={v}" for k, v in span.attributes.items() if k != "sql")
+            logger.debug("%s %.1fms %s", span.name, span.duration_ms, attrs)
+
+
+class OpenTelemetrySink(MetricsSink):
+    """Exports spans through the OpenTelemetry API (``pip install opentelemetry-api``).
+
+    Exporters and processors are configured by the host application or the
+    ``opentelemetry-instrument`` launcher as usual.
+    """
+
+    def __init__(self) -> None:
+        try:
+            from opentelemetry import trace
+        except ImportError:
+            raise ImportError(
+                "SPARK_METRICS_SINK=otel requires the opentelemetry-api package. "
+                "Install it with: pip install 'spark-sql-mcp-server[otel]'"
+            ) from None
+        self._trace = trace
+        self._tracer = trace.get_tracer("spark_sql_mcp")
+
+    def on_start(self, span: Span) -> None:
+        parent = span.parent.sink_state if span.parent is not None else None
+        context = self._trace.set_span_in_context(parent) if parent is not None else None
+        span.sink_state = self._tracer.start_span(span.name, context=context)
+
+    def on_end(self, span: Span) -> None:
+        otel_span = span.sink_state
+        if otel_span is None:
+            return
+        otel_span.set_attributes({
+            k: v for k, v in span.attributes.items() if isinstance(v, (str, bool, int, float))
+        })
+        if "error" in span.attributes:
+            otel_span.set_status(self._trace.Status(self._trace.StatusCode.ERROR))
+        otel_span.end()
+
+
+def create_sink(name: str) -> MetricsSink:
+    name = name.lower()
+    if name == "logging":
+        return LoggingSink()
+    if name == "otel":
+        return OpenTelemetrySink()
+    if name == "none":
+        return MetricsSink()
+    raise ValueError(f"Unknown metrics sink: {name!r}. Must be one of: logging, none, otel")
+
+
+_current_span: ContextVar[Span | None] = ContextVar("spark_sql_span", default=None)
+
+
+class Instrumentation:
+    """Creates spans, forwards them to a sink and keeps per-name timing totals.
+
+    Queries slower than ``slow_query_ms`` are logged at WARNING level on the
+    ``spark_sql_mcp.slow_query`` logger regardless of the sink.
+    """
+
+    def __init__(self, sink: MetricsSink | None = None, slow_query_ms: float = 0.0):
+        self._sink = sink or MetricsSink()
+        self._slow_query_ms = slow_query_ms
+        self._lock = threading.Lock()
+        self._totals: dict[str, list[float]] = {}
+
+    @contextmanager
+    def span(self, name: str, *, activate: bool = True, **attributes: Any) -> Iterator[Span]:
+        """Time the enclosed block.
+
+        Active spans become the parent of spans opened inside them. Generators
+        should pass ``activate=False`` because their body interleaves with the
+        consumer's code.
+        """
+        span = Span(name, attributes, _current_span.get())
+        reset = _current_span.set(span) if activate else None
+        try:
+            self._sink.on_start(span)
+        except Exception:
+            logger.exception("Metrics sink failed")
+        try:
+            yield span
+        except BaseException as exc:
+            span.set("error", type(exc).__name__)
+            raise
+        finally:
+            span.end = time.perf_counter()
+            if reset is not None:
+                _current_span.reset(reset)
+            self._finish(span)
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        """Count, mean and max duration per span name."""
+        with self._lock:
+            return {
+                name: {
+                    "count": int(count),
+                    "avg_ms": round(total / count, 3),
+                    "max_ms": round(peak, 3),
+                }
+                for name, (count, total, peak) in sorted(self._totals.items())
+            }
+
+    def _finish(self, span: Span) -> None:
+        duration = span.duration_ms
+        with self._lock:
+            totals = self._totals.setdefault(span.name, [0, 0.0, 0.0])
+            totals[0] += 1
+            totals[1] += duration
+            totals[2] = max(totals[2], duration)
+        try:
+            self._sink.on_end(span)
+        except Exception:
+            logger.exception("Metrics sink failed")
+        if span.name == QUERY_SPAN and self._slow_query_ms and duration >= self._slow_query_ms:
+            slow_query_logger.warning(
+                "Slow query (%.0fms, %s rows): %s",
+                duration,
+                span.attributes.get("rows", "?"),
+                span.attributes.get("sql", ""),
+            )
@@ -0,0 +1,354 @@
+"""Bounded, thread-safe connection pool for HiveServer2 connections."""
+
+import threading
+import time
+import weakref
+from collections import deque
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any
+
+
+class PoolTimeoutError(TimeoutError):
+    """Raised when no connection becomes available within the checkout timeout."""
+
+
+@dataclass(frozen=True)
+class PoolStats:
+    size: int
+    idle: int
+    in_use: int
+    waiters: int
+    max_size: int
+    checkouts: int
+    timeouts: int
+    avg_checkout_ms: float
+    max_checkout_ms: float
+
+
+class _Idle:
+    __slots__ = ("conn", "since")
+
+    def __init__(self, conn: Any, since: float):
+        self.conn = conn
+        self.since = since
+
+
+def _close_quietly(conn: Any) -> None:
+    try:
+        conn.close()
+    except Exception:
+        pass
+
+
+# Shortest pause between idle sweeps, whatever the idle timeout.
+_MIN_REAP_INTERVAL = 0.05
+
+
+def _reap(pool_ref: "weakref.ref[ConnectionPool]", stop: threading.Event, interval: float) -> None:
+    """Close a pool's expired idle connections every ``interval`` seconds until stopped.
+
+    Holds only a weak reference, so a pool that is dropped without ``close()``
+    is still garbage collected, and the thread then exits.
+    """
+    while not stop.wait(interval):
+        pool = pool_ref()
+        if pool is None:
+            return
+        pool.evict_idle()
+        del pool
+
+
+_use_reserved: ContextVar[bool] = ContextVar("spark_sql_use_reserved", default=False)
+
+
+@contextmanager
+def reserved_checkouts() -> Iterator[None]:
+    """Let checkouts made in the block use a pool's reserved connections."""
+    reset = _use_reserved.set(True)
+    try:
+        yield
+    finally:
+        _use_reserved.reset(reset)
+
+
+_background: ContextVar[bool] = ContextVar("spark_sql_background", default=False)
+
+
+@contextmanager
+def background_checkouts() -> Iterator[None]:
+    """Keep checkouts made in the block from taking a pool's last unreserved connection."""
+    reset = _background.set(True)
+    try:
+        yield
+    finally:
+        _background.reset(reset)
+
+
+class ConnectionPool:
+    """Hands out connections created by ``factory``, at most ``max_size`` at a time.
+
+    Idle connections above ``min_size`` are closed once they have been unused for
+    ``idle_timeout`` seconds, by a background sweep that runs every half timeout
+    even when no connections are being checked out. ``health_check`` is called
+    with the connection and the seconds it sat idle on every checkout of an idle
+    connection; connections that fail it are closed and replaced. Connections
+    whose use raised an error matching ``is_disconnect`` are closed instead of
+    being returned to the pool.
+
+    ``reserved`` of the ``max_size`` connections are held back for checkouts made
+    inside ``reserved_checkouts()``, so those never wait behind the rest.
+    Checkouts inside ``background_checkouts()`` leave one of the others free,
+    so long background work cannot starve interactive calls.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], Any],
+        *,
+        min_size: int = 1,
+        max_size: int = 4,
+        timeout: float = 30.0,
+        idle_timeout: float = 300.0,
+        health_check: Callable[[Any, float], bool] | None = None,
+        is_disconnect: Callable[[BaseException], bool] | None = None,
+        reserved: int = 0,
+    ):
+        if not 0 <= reserved < max_size:
+            raise ValueError("reserved must be between 0 and max_size - 1")
+        self._factory = factory
+        self._min_size = min_size
+        self._max_size = max_size
+        self._reserved = reserved
+        self._timeout = timeout
+        self._idle_timeout = idle_timeout
+        self._health_check = health_check
+        self._is_disconnect = is_disconnect
+        self._cond = threading.Condition()
+        self._idle: deque[_Idle] = deque()
+        self._size = 0
+        self._in_use = 0
+        self._waiters = 0
+        self._background_waiters = 0
+        self._closed = False
+        self._checkouts = 0
+        self._timeouts = 0
+        self._checkout_total = 0.0
+        self._checkout_max = 0.0
+        self._stop_reaper = threading.Event()
+        self._reaper: threading.Thread | None = None
+
+    @property
+    def max_size(self) -> int:
+        return self._max_size
+
+    def fill(self) -> None:
+        """Open connections until the pool holds at least ``min_size``."""
+        while True:
+            with self._cond:
+                if self._closed or self._size >= self._min_size:
+                    return
+                self._size += 1
+            try:
+                conn = self._factory()
+            except BaseException:
+                with self._cond:
+                    self._size -= 1
+                    self._cond.notify()
+                raise
+            with self._cond:
+                self._idle.append(_Idle(conn, time.monotonic()))
+                self._cond.notify()
+
+    @contextmanager
+    def connection(self) -> Iterator[Any]:
+        conn = self.acquire()
+        try:
+            yield conn
+        except BaseException as exc:
+            if self._is_disconnect is not None and self._is_disconnect(exc):
+                self.discard(conn)
+            else:
+                self.release(conn)
+            raise
+        self.release(conn)
+
+    def acquire(self) -> Any:
+        start = time.monotonic()
+        deadline = start + self._timeout
+        limit = self._max_size if _use_reserved.get() else self._max_size - self._reserved
+        if _background.get():
+            limit = max(1, limit - 1)
+        while True:
+            entry, stale = self._reserve(deadline, limit)
+            for conn in stale:
+                _close_quietly(conn)
+            if entry is None:
+                try:
+                    conn = self._factory()
+                except BaseException:
+                    self._forget()
+                    raise
+            else:
+                conn = entry.conn
+                idle = time.monotonic() - entry.since
+                if not self._is_healthy(conn, idle):
+                    _close_quietly(conn)
+                    self._forget()
+                    continue
+            self._record_checkout(time.monotonic() - start)
+            return conn
+
+    def release(self, conn: Any) -> None:
+        with self._cond:
+            self._in_use -= 1
+            if self._closed:
+                self._size -= 1
+                close = True
+            else:
+                self._idle.append(_Idle(conn, time.monotonic()))
+                close = False
+                if self._size > self._min_size:
+                    self._start_reaper_locked()
+            self._notify_locked()
+        if close:
+            _close_quietly(conn)
+
+    def discard(self, conn: Any) -> None:
+        """Close a checked-out connection instead of returning it to the pool."""
+        _close_quietly(conn)
+        self._forget()
+
+    def evict_idle(self) -> int:
+        """Close idle connections above ``min_size`` unused for ``idle_timeout`` seconds.
+
+        Returns how many were closed.
+        """
+        with self._cond:
+            stale = self._evict_idle_locked()
+        for conn in stale:
+            _close_quietly(conn)
+        return len(stale)
+
+    def close(self) -> None:
+        self._stop_reaper.set()
+        with self._cond:
+            self._closed = True
+            idle = [entry.conn for entry in self._idle]
+            self._idle.clear()
+            self._size -= len(idle)
+            self._cond.notify_all()
+        for conn in idle:
+            _close_quietly(conn)
+
+    def stats(self) -> PoolStats:
+        with self._cond:
+            return PoolStats(
+                size=self._size,
+                idle=len(self._idle),
+                in_use=self._in_use,
+                waiters=self._waiters,
+                max_size=self._max_size,
+                checkouts=self._checkouts,
+                timeouts=self._timeouts,
+                avg_checkout_ms=(
+                    self._checkout_total / self._checkouts * 1000 if self._checkouts else 0.0
+                ),
+                max_checkout_ms=self._checkout_max * 1000,
+            )
+
+    def _reserve(self, deadline: float, limit: int) -> tuple[_Idle | None, list[Any]]:
+        """Claim an idle connection or a slot for a new one, waiting up to ``deadline``.
+
+        Returns the idle connection, or None when the caller should open one,
+        together with expired connections to close. The claim only succeeds
+        while fewer than ``limit`` connections are in use.
+        """
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Connection pool is closed")
+            stale = self._evict_idle_locked()
+            background = limit < self._max_size - self._reserved
+            self._waiters += 1
+            self._background_waiters += background
+            try:
+                while True:
+                    if self._closed:
+                        raise RuntimeError("Connection pool is closed")
+                    if self._in_use < limit:
+                        if self._idle:
+                            # LIFO keeps a warm working set and lets surplus connections
+                            # idle out.
+                            self._in_use += 1
+                            return self._idle.pop(), stale
+                        if self._size < self._max_size:
+                            self._size += 1
+                            self._in_use += 1
+                            return None, stale
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._timeouts += 1
+                        raise PoolTimeoutError(
+                            f"Timed out after {self._timeout:g}s waiting for a Spark connection"
+                        )
+                    self._cond.wait(remaining)
+            finally:
+                self._waiters -= 1
+                self._background_waiters -= background
+
+    def _start_reaper_locked(self) -> None:
+        if self._reaper is not None:
+            return
+        self._reaper = threading.Thread(
+            target=_reap,
+            args=(
+                weakref.ref(self),
+                self._stop_reaper,
+                max(self._idle_timeout / 2, _MIN_REAP_INTERVAL),
+            ),
+            name="spark-sql-pool-reaper",
+            daemon=True,
+        )
+        self._reaper.start()
+
+    def _evict_idle_locked(self) -> list[Any]:
+        cutoff = time.monotonic() - self._idle_timeout
+        stale = []
+        # The oldest idle connections sit at the left end of the deque.
+        while self._idle and self._size > self._min_size and self._idle[0].since < cutoff:
+            stale.append(self._idle.popleft().conn)
+            self._size -= 1
+        return stale
+
+    def _forget(self) -> None:
+        with self._cond:
+            self._size -= 1
+            self._in_use -= 1
+            self._notify_locked()
+
+    def _notify_locked(self) -> None:
+        """Wake waiters after a connection was freed.
+
+        With reserved connections or background waiters, the first waiter may not
+        be allowed to take the freed one, so all of them are woken to recheck.
+        """
+        if self._reserved or self._background_waiters:
+            self._cond.notify_all()
+        else:
+            self._cond.notify()
+
+    def _is_healthy(self, conn: Any, idle: float) -> bool:
+        if self._health_check is None:
+            return True
+        try:
+            return bool(self._health_check(conn, idle))
+        except Exception:
+            return False
+
+    def _record_checkout(self, elapsed: float) -> None:
+        with self._cond:
+            self._checkouts += 1
+            self._checkout_total += elapsed
+            self._checkout_max = max(self._checkout_max, elapsed)
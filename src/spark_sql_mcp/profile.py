@@ -0,0 +1,98 @@
+"""Single-pass table profiling: one aggregate query covers every column."""
+
+from dataclasses import dataclass
+from typing import Any
+
+from .results import QueryResult
+
+PERCENTILES = (0.25, 0.5, 0.75)
+
+PROFILE_COLUMNS = (
+    "column", "data_type", "nulls", "null_pct", "distinct_approx", "min", "max",
+    *(f"p{int(p * 100)}" for p in PERCENTILES),
+)
+
+_NUMERIC_TYPES = frozenset({
+    "tinyint", "smallint", "int", "integer", "bigint", "long", "float", "real", "double",
+    "byte", "short",
+})
+_ORDERED_TYPES = _NUMERIC_TYPES | {
+    "string", "boolean", "date", "timestamp", "timestamp_ntz", "timestamp_ltz",
+}
+_ORDERED_PREFIXES = ("decimal", "varchar", "char")
+
+
+@dataclass(frozen=True)
+class TableProfile:
+    row_count: int
+    columns: QueryResult
+
+
+def table_columns(describe_rows: list[dict[str, Any]]) -> list[tuple[str, str]]:
+    """(name, type) pairs from ``DESCRIBE`` output, without the partition section."""
+    columns = []
+    for row in describe_rows:
+        name = (row.get("col_name") or "").strip()
+        if not name or name.startswith("#"):
+            break
+        columns.append((name, (row.get("data_type") or "").strip().lower()))
+    return columns
+
+
+def _quote(name: str) -> str:
+    return "`" + name.replace("`", "``") + "`"
+
+
+def _stats_for(data_type: str) -> tuple[str, ...]:
+    """Aggregates that are valid and meaningful for a column of ``data_type``."""
+    numeric = data_type in _NUMERIC_TYPES or data_type.startswith("decimal")
+    if numeric:
+        return ("non_null", "distinct", "min", "max", *(f"p{i}" for i in range(len(PERCENTILES))))
+    if data_type in _ORDERED_TYPES or data_type.startswith(_ORDERED_PREFIXES):
+        return ("non_null", "distinct", "min", "max")
+    # Complex and binary types: approx_count_distinct and min/max do not apply.
+    return ("non_null",)
+
+
+def _aggregate(stat: str, column: str) -> str:
+    if stat == "non_null":
+        return f"count({column})"
+    if stat == "distinct":
+        return f"approx_count_distinct({column})"
+    if stat in ("min", "max"):
+        return f"{stat}({column})"
+    return f"percentile_approx({column}, {PERCENTILES[int(stat[1:])]})"
+
+
+def profile_query(source: str, columns: list[tuple[str, str]]) -> str:
+    """One SELECT computing the profile of every column of ``source``.
+
+    ``source`` is the FROM clause target, e.g. ``db.tbl TABLESAMPLE (1 PERCENT)``.
+    Result columns are named ``c<index>_<stat>`` after the position in ``columns``.
+    """
+    if not columns:
+        raise ValueError("Table has no columns to profile")
+    aggregates = ["count(1) AS row_count"]
+    for i, (name, data_type) in enumerate(columns):
+        quoted = _quote(name)
+        aggregates.extend(
+            f"{_aggregate(stat, quoted)} AS c{i}_{stat}" for stat in _stats_for(data_type)
+        )
+    return f"SELECT {', '.join(aggregates)} FROM {source}"
+
+
+def build_profile(result: QueryResult, columns: list[tuple[str, str]]) -> TableProfile:
+    """Turn the single row returned by ``profile_query`` into one row per column."""
+    values = dict(zip(result.columns, result.rows[0])) if result.rows else {}
+    row_count = int(values.get("row_count") or 0)
+    rows = []
+    for i, (name, data_type) in enumerate(columns):
+        non_null = values.get(f"c{i}_non_null")
+        nulls = row_count - int(non_null) if non_null is not None else None
+        null_pct = round(100 * nulls / row_count, 2) if nulls is not None and row_count else None
+        rows.append((
+            name, data_type, nulls, null_pct,
+            values.get(f"c{i}_distinct"), values.get(f"c{i}_min"), values.get(f"c{i}_max"),
+            *(values.get(f"c{i}_p{j}") for j in range(len(PERCENTILES))),
+        ))
+    return TableProfile(row_count, QueryResult(PROFILE_COLUMNS, tuple(rows)))
@@ -0,0 +1,58 @@
+"""Compact query result representation."""
+
+from __future__ import annotations
+
+import sys
+from collections.abc import Iterator
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .budget import Truncation
+
+
+@dataclass(frozen=True)
+class QueryResult:
+    """Column names stored once, with rows kept as tuples in column order.
+
+    This avoids building a dict per row; ``to_dicts`` gives the ``list[dict]``
+    view for callers that want it. ``truncation`` is set when a response budget
+    cut rows or values while the result was fetched.
+    """
+
+    columns: tuple[str, ...]
+    rows: tuple[tuple[Any, ...], ...]
+    truncation: Truncation | None = None
+
+    @classmethod
+    def from_dicts(cls, rows: list[dict[str, Any]]) -> QueryResult:
+        if not rows:
+            return cls((), ())
+        columns = tuple(rows[0].keys())
+        return cls(columns, tuple(tuple(row.get(c, "") for c in columns) for row in rows))
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __iter__(self) -> Iterator[tuple[Any, ...]]:
+        return iter(self.rows)
+
+    def page(self, offset: int, limit: int) -> QueryResult:
+        """Rows ``offset`` to ``offset + limit``."""
+        return QueryResult(self.columns, self.rows[offset:offset + limit])
+
+    def column(self, name: str) -> list[Any]:
+        index = self.columns.index(name)
+        return [row[index] for row in self.rows]
+
+    def to_dicts(self) -> list[dict[str, Any]]:
+        columns = self.columns
+        return [dict(zip(columns, row)) for row in self.rows]
+
+
+def result_size(result: QueryResult) -> int:
+    """Approximate in-memory size of a result, in bytes."""
+    size = sys.getsizeof(result.columns) + sys.getsizeof(result.rows)
+    for row in result.rows:
+        size += sys.getsizeof(row) + sum(sys.getsizeof(v) for v in row)
+    return size
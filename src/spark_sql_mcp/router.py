@@ -0,0 +1,133 @@
+"""Route requests across several named Spark clusters, with optional failover."""
+
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass
+from fnmatch import fnmatchcase
+
+from .config import RoutingConfig
+from .spark_client import SparkSQLClient
+
+
+@dataclass(frozen=True)
+class ClusterHealth:
+    name: str
+    reachable: bool
+    in_use: int
+    max_size: int
+    queue_depth: int
+
+    @property
+    def saturated(self) -> bool:
+        return self.in_use >= self.max_size
+
+
+class ClusterRouter:
+    """Holds one ``SparkSQLClient`` per cluster and picks which ones serve a request.
+
+    An explicit cluster name always wins and never fails over. Otherwise
+    metadata requests go to ``metadata_cluster`` if set, and everything else to
+    the first route whose database pattern matches one of the databases the
+    request touches, falling back to ``default``. With ``failover`` enabled the
+    other clusters are returned as fallbacks, and a reachable, unsaturated
+    cluster is preferred over one that is unreachable or has callers queued for
+    a connection.
+    """
+
+    def __init__(
+        self,
+        clients: Mapping[str, SparkSQLClient],
+        *,
+        default: str | None = None,
+        routes: Iterable[tuple[str, str]] = (),
+        metadata_cluster: str | None = None,
+        failover: bool = False,
+    ):
+        if not clients:
+            raise ValueError("At least one cluster must be configured")
+        self._clients = dict(clients)
+        self._default = default or next(iter(self._clients))
+        self._routes = tuple(routes)
+        self._metadata_cluster = metadata_cluster
+        self._failover = failover
+
+    @classmethod
+    def from_config(cls, config: RoutingConfig) -> "ClusterRouter":
+        return cls(
+            {name: SparkSQLClient(cfg) for name, cfg in config.clusters.items()},
+            default=config.default_cluster,
+            routes=config.routes,
+            metadata_cluster=config.metadata_cluster,
+            failover=config.failover,
+        )
+
+    @property
+    def clients(self) -> Mapping[str, SparkSQLClient]:
+        return self._clients
+
+    def client(self, cluster: str | None = None) -> SparkSQLClient:
+        name = self._default if cluster is None else cluster.lower()
+        try:
+            return self._clients[name]
+        except KeyError:
+            raise ValueError(
+                f"Unknown cluster: {cluster!r}. Must be one of: {', '.join(self._clients)}"
+            ) from None
+
+    def route(
+        self,
+        cluster: str | None = None,
+        databases: Iterable[str | None] = (),
+        *,
+        metadata: bool = False,
+    ) -> str:
+        """Name of the cluster a request should go to, before failover."""
+        if cluster is not None:
+            self.client(cluster)
+            return cluster.lower()
+        if metadata and self._metadata_cluster is not None:
+            return self._metadata_cluster
+        names = [db.lower() for db in databases if db]
+        for pattern, target in self._routes:
+            if any(fnmatchcase(db, pattern) for db in names):
+                return target
+        return self._default
+
+    def candidates(
+        self,
+        cluster: str | None = None,
+        databases: Iterable[str | None] = (),
+        *,
+        metadata: bool = False,
+    ) -> list[SparkSQLClient]:
+        """Clients to try in order: the routed cluster, then failover targets."""
+        name = self.route(cluster, databases, metadata=metadata)
+        if cluster is not None or not self._failover or len(self._clients) == 1:
+            return [self._clients[name]]
+        order = [name, *(n for n in self._clients if n != name)]
+        health = {h.name: h for h in self.health()}
+
+        def _rank(n: str) -> int:
+            h = health[n]
+            if not h.reachable:
+                return 2
+            return 1 if h.saturated and h.queue_depth else 0
+
+        # sorted() is stable, so the routed cluster stays first among equals.
+        return [self._clients[n] for n in sorted(order, key=_rank)]
+
+    def health(self) -> list[ClusterHealth]:
+        report = []
+        for name, client in self._clients.items():
+            stats = client.pool_stats()
+            report.append(ClusterHealth(
+                name=name,
+                reachable=client.reachable,
+                in_use=stats.in_use if stats else 0,
+                max_size=stats.max_size if stats else client.config.pool_max_size,
+                queue_depth=stats.waiters if stats else 0,
+            ))
+        return report
+
+    def close(self) -> None:
+        for client in self._clients.values():
+            client.close()
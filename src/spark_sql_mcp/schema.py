@@ -0,0 +1,93 @@
+"""Bulk schema export: parse ``SHOW TABLE EXTENDED`` and render many schemas compactly.
+
+``SHOW TABLE EXTENDED IN db LIKE '*'`` returns one row per table whose
+``information`` column is a text block ending in the table's schema tree::
+
+    Partition Columns: [`dt`]
+    Schema: root
+     |-- id: integer (nullable = true)
+     |-- dt: string (nullable = true)
+
+That is one catalog call for the whole database instead of one ``DESCRIBE``
+per table. The tree has no column comments, and nested types span several
+lines, so tables with struct, array or map columns are left to ``DESCRIBE``.
+"""
+
+import re
+from typing import Any
+
+from .guard import partition_columns
+from .profile import table_columns
+
+_FIELD_RE = re.compile(r"^ \|-- (?P<name>.+?): (?P<type>.+?) \(nullable = (?:true|false)\)$")
+_PARTITIONS_RE = re.compile(r"^Partition Columns: \[(?P<columns>.*)\]$")
+_COMPLEX_TYPES = ("struct", "array", "map")
+# The schema tree prints Catalyst type names; DESCRIBE prints the SQL ones.
+_TYPE_NAMES = {"integer": "int", "long": "bigint", "short": "smallint", "byte": "tinyint"}
+
+
+def parse_table_information(information: str) -> list[dict[str, Any]] | None:
+    """``DESCRIBE``-shaped rows from one ``information`` block.
+
+    Returns None when the block has no schema or a column has a nested type.
+    """
+    columns: list[dict[str, Any]] = []
+    partitions: list[str] = []
+    in_schema = False
+    for line in information.splitlines():
+        if in_schema:
+            if line.startswith(" |    "):
+                continue
+            match = _FIELD_RE.match(line)
+            if match is None:
+                break
+            data_type = match["type"]
+            if data_type in _COMPLEX_TYPES:
+                return None
+            columns.append({
+                "col_name": match["name"],
+                "data_type": _TYPE_NAMES.get(data_type, data_type),
+                "comment": None,
+            })
+        elif line.strip() == "Schema: root":
+            in_schema = True
+        else:
+            match = _PARTITIONS_RE.match(line.strip())
+            if match is not None:
+                partitions = [
+                    c.strip().strip("`") for c in match["columns"].split(",") if c.strip()
+                ]
+    if not columns:
+        return None
+    if partitions:
+        by_name = {c["col_name"]: c for c in columns}
+        columns.append({"col_name": "# Partition Information", "data_type": "", "comment": ""})
+        columns.append({"col_name": "# col_name", "data_type": "data_type", "comment": "comment"})
+        columns.extend(dict(by_name[p]) for p in partitions if p in by_name)
+    return columns
+
+
+def _plural(count: int, noun: str) -> str:
+    return f"{count} {noun}" if count == 1 else f"{count} {noun}s"
+
+
+def format_schemas(database: str, schemas: dict[str, list[dict[str, Any]]]) -> str:
+    """Render ``{table: DESCRIBE rows}`` with tables of identical schema grouped together."""
+    if not schemas:
+        return f"No tables found in {database}."
+    groups: dict[tuple, list[str]] = {}
+    for table, rows in schemas.items():
+        signature = (tuple(table_columns(rows)), tuple(partition_columns(rows)))
+        groups.setdefault(signature, []).append(table)
+
+    lines = [
+        f"{_plural(len(schemas), 'table')} in {database}, "
+        f"{_plural(len(groups), 'distinct schema')}."
+    ]
+    for (columns, partitions), tables in groups.items():
+        lines.append("")
+        lines.append(", ".join(tables))
+        lines.append("  " + ", ".join(f"{name} {data_type}" for name, data_type in columns))
+        if partitions:
+            lines.append(f"  partitioned by {', '.join(partitions)}")
+    return "\n".join(lines)
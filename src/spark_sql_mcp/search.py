@@ -0,0 +1,278 @@
+"""In-memory inverted index over database, table and column names, types and comments.
+
+Names are split into tokens on underscores, punctuation and camelCase, and the
+whole name is indexed as well, so ``customer_id`` is found by ``customer_id``,
+``customer`` and ``id``. Query terms match tokens exactly, by prefix (a bisect
+over the sorted vocabulary) or, when neither finds anything, fuzzily with
+``difflib``. Fuzzy matching only compares the term with the tokens sharing the
+most trigrams with it, not the whole vocabulary. A query term made of several
+words, like ``customer_id``, also matches names containing all of them, like
+``customerId``. Lookups touch only the postings of matching tokens.
+"""
+
+import bisect
+import difflib
+import heapq
+import re
+import threading
+from collections import Counter
+from collections.abc import Callable, Iterable, Mapping
+from dataclasses import dataclass
+from typing import Any
+
+from .profile import table_columns
+
+_WORD_RE = re.compile(r"[A-Za-z0-9]+")
+_CAMEL_RE = re.compile(r"[A-Z]?[a-z0-9]+|[A-Z]+(?![a-z])")
+
+# Field weights: a hit in a name counts more than one in a type or comment.
+_NAME = 3.0
+_TYPE = 1.0
+_COMMENT = 1.0
+# Match-kind multipliers.
+_EXACT = 1.0
+_PREFIX = 0.6
+_FUZZY = 0.4
+_FULL_NAME_BONUS = 2.0
+
+_MAX_PREFIX_TOKENS = 64
+_FUZZY_CUTOFF = 0.75
+# Tokens compared with difflib, picked by the number of trigrams shared with the term.
+_MAX_FUZZY_CANDIDATES = 100
+
+
+@dataclass(frozen=True)
+class SchemaMatch:
+    database: str
+    table: str
+    column: str | None
+    data_type: str | None
+    comment: str | None
+    score: float
+
+
+@dataclass(frozen=True)
+class _Doc:
+    database: str
+    table: str
+    column: str | None
+    data_type: str | None
+    comment: str | None
+
+    @property
+    def name(self) -> str:
+        return self.column if self.column is not None else self.table
+
+
+def name_tokens(name: str) -> set[str]:
+    """The whole name plus its underscore and camelCase parts, lower-cased."""
+    tokens = {name.lower()}
+    for word in _WORD_RE.findall(name):
+        tokens.add(word.lower())
+        tokens.update(part.lower() for part in _CAMEL_RE.findall(word))
+    return tokens
+
+
+def _trigrams(token: str) -> set[str]:
+    """Three-character slices of ``token``, with its start and end marked."""
+    padded = f"^{token}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def text_tokens(text: str) -> set[str]:
+    return {word.lower() for word in _WORD_RE.findall(text) if len(word) > 1}
+
+
+class SchemaIndex:
+    """Thread-safe index, updated one table at a time as schemas are loaded."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._docs: dict[int, _Doc] = {}
+        self._doc_tokens: dict[int, tuple[str, ...]] = {}
+        self._tables: dict[tuple[str, str], list[int]] = {}
+        self._postings: dict[str, dict[int, float]] = {}
+        # Vocabulary tokens by trigram, to pick fuzzy match candidates.
+        self._grams: dict[str, set[str]] = {}
+        self._vocab: list[str] = []
+        self._vocab_stale = False
+        self._next_id = 0
+
+    def __len__(self) -> int:
+        """Number of indexed tables."""
+        with self._lock:
+            return len(self._tables)
+
+    def add_table(
+        self, database: str, table: str, describe_rows: Iterable[dict[str, Any]]
+    ) -> None:
+        """Index (or re-index) one table from its ``DESCRIBE`` output."""
+        rows = list(describe_rows)
+        comments = {
+            (row.get("col_name") or "").strip(): row.get("comment") or None for row in rows
+        }
+        key = (database.lower(), table.lower())
+        with self._lock:
+            self._remove_locked(key)
+            ids = [self._add_locked(_Doc(key[0], key[1], None, None, None))]
+            ids.extend(
+                self._add_locked(_Doc(key[0], key[1], name, data_type, comments.get(name)))
+                for name, data_type in table_columns(rows)
+            )
+            self._tables[key] = ids
+
+    def invalidate(self, predicate: Callable[[str, str], bool] | None = None) -> int:
+        """Drop tables whose ``(database, table)`` matches ``predicate`` (all if omitted)."""
+        with self._lock:
+            keys = [key for key in self._tables if predicate is None or predicate(*key)]
+            for key in keys:
+                self._remove_locked(key)
+            return len(keys)
+
+    def replace_database(
+        self, database: str, schemas: Mapping[str, Iterable[dict[str, Any]]]
+    ) -> None:
+        """Re-index every table of ``database``, dropping tables no longer present."""
+        db = database.lower()
+        names = {table.lower() for table in schemas}
+        with self._lock:
+            stale = [key for key in self._tables if key[0] == db and key[1] not in names]
+            for key in stale:
+                self._remove_locked(key)
+        for table, rows in schemas.items():
+            self.add_table(db, table, rows)
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "tables": len(self._tables),
+                "columns": len(self._docs) - len(self._tables),
+                "tokens": len(self._postings),
+            }
+
+    def search(
+        self, query: str, *, database: str | None = None, limit: int = 20
+    ) -> list[SchemaMatch]:
+        """Best matches for the whitespace-separated terms of ``query``.
+
+        Results matching more terms rank first, then by score.
+        """
+        terms = [t.lower() for t in query.split() if t.strip()]
+        if not terms:
+            return []
+        db = database.lower() if database else None
+        with self._lock:
+            if self._vocab_stale:
+                self._vocab = sorted(self._postings)
+                self._vocab_stale = False
+            scores: dict[int, float] = {}
+            matched: dict[int, int] = {}
+            for term in terms:
+                for doc_id, score in self._match_compound_locked(term).items():
+                    if db is not None and self._docs[doc_id].database != db:
+                        continue
+                    scores[doc_id] = scores.get(doc_id, 0.0) + score
+                    matched[doc_id] = matched.get(doc_id, 0) + 1
+            ranked = heapq.nsmallest(
+                limit, scores, key=lambda d: (-matched[d], -scores[d], self._sort_key(d))
+            )
+            return [self._match(doc_id, scores[doc_id]) for doc_id in ranked]
+
+    def _match_compound_locked(self, term: str) -> dict[int, float]:
+        """Match ``term``, and for ``customer_id`` also names containing every part."""
+        hits = self._match_term_locked(term)
+        words = _WORD_RE.findall(term)
+        if len(words) > 1:
+            parts = [self._match_term_locked(word) for word in words]
+            for doc_id in set(parts[0]).intersection(*parts[1:]):
+                score = sum(part[doc_id] for part in parts) / len(parts)
+                hits[doc_id] = max(hits.get(doc_id, 0.0), score)
+        return hits
+
+    def _match_term_locked(self, term: str) -> dict[int, float]:
+        hits: dict[int, float] = {}
+
+        def _add(token: str, factor: float) -> None:
+            for doc_id, weight in self._postings[token].items():
+                score = weight * factor
+                if self._docs[doc_id].name.lower() == token and factor == _EXACT:
+                    score += _FULL_NAME_BONUS
+                hits[doc_id] = max(hits.get(doc_id, 0.0), score)
+
+        if term in self._postings:
+            _add(term, _EXACT)
+        start = bisect.bisect_left(self._vocab, term)
+        for token in self._vocab[start:start + _MAX_PREFIX_TOKENS]:
+            if not token.startswith(term):
+                break
+            if token != term:
+                _add(token, _PREFIX * len(term) / len(token))
+        if not hits:
+            candidates = self._fuzzy_candidates_locked(term)
+            for token in difflib.get_close_matches(term, candidates, n=3, cutoff=_FUZZY_CUTOFF):
+                _add(token, _FUZZY * difflib.SequenceMatcher(None, term, token).ratio())
+        return hits
+
+    def _fuzzy_candidates_locked(self, term: str) -> list[str]:
+        """The tokens sharing the most trigrams with ``term``, of a length that can
+        still reach the fuzzy cutoff."""
+        # A similarity ratio of c needs the shorter string to be at least
+        # c / (2 - c) times as long as the longer one.
+        shortest = len(term) * _FUZZY_CUTOFF / (2 - _FUZZY_CUTOFF)
+        longest = len(term) * (2 - _FUZZY_CUTOFF) / _FUZZY_CUTOFF
+        shared: Counter[str] = Counter()
+        for gram in _trigrams(term):
+            shared.update(self._grams.get(gram, ()))
+        return [
+            token for token, _ in shared.most_common()
+            if shortest <= len(token) <= longest
+        ][:_MAX_FUZZY_CANDIDATES]
+
+    def _sort_key(self, doc_id: int) -> tuple[str, str, str]:
+        doc = self._docs[doc_id]
+        return doc.database, doc.table, doc.column or ""
+
+    def _match(self, doc_id: int, score: float) -> SchemaMatch:
+        doc = self._docs[doc_id]
+        return SchemaMatch(
+            doc.database, doc.table, doc.column, doc.data_type, doc.comment, round(score, 2)
+        )
+
+    def _add_locked(self, doc: _Doc) -> int:
+        doc_id = self._next_id
+        self._next_id += 1
+        self._docs[doc_id] = doc
+        weights: dict[str, float] = {}
+        for token in name_tokens(doc.name):
+            weights[token] = _NAME
+        if doc.data_type:
+            for token in text_tokens(doc.data_type):
+                weights.setdefault(token, _TYPE)
+        if doc.comment:
+            for token in text_tokens(doc.comment):
+                weights.setdefault(token, _COMMENT)
+        for token, weight in weights.items():
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = {}
+                self._vocab_stale = True
+                for gram in _trigrams(token):
+                    self._grams.setdefault(gram, set()).add(token)
+            postings[doc_id] = weight
+        self._doc_tokens[doc_id] = tuple(weights)
+        return doc_id
+
+    def _remove_locked(self, key: tuple[str, str]) -> None:
+        for doc_id in self._tables.pop(key, ()):
+            del self._docs[doc_id]
+            for token in self._doc_tokens.pop(doc_id):
+                postings = self._postings[token]
+                del postings[doc_id]
+                if not postings:
+                    del self._postings[token]
+                    self._vocab_stale = True
+                    for gram in _trigrams(token):
+                        tokens = self._grams[gram]
+                        tokens.discard(token)
+                        if not tokens:
+                            del self._grams[gram]
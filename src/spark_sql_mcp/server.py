@@ -1,34 +1,111 @@
 """Spark SQL MCP Server entry point."""
 
+import logging
+import threading
+
 from mcp.server.fastmcp import FastMCP
 
-from .config import SparkConfig
+from .admission import AdmissionController
+from .config import AdmissionConfig, JobConfig, RoutingConfig
+from .jobs import JobRegistry
+from .router import ClusterRouter
 from .spark_client import SparkSQLClient
 from .tools import register_tools
 
+logger = logging.getLogger(__name__)
+
 mcp = FastMCP("spark-sql-mcp-server")
 
-_client: SparkSQLClient | None = None
+_router: ClusterRouter | None = None
+_admission: AdmissionController | None = None
+_jobs: JobRegistry | None = None
+_stopping = threading.Event()
+
+
+def get_router() -> ClusterRouter:
+    if _router is None:
+        raise RuntimeError("Spark client not initialized")
+    return _router
+
+
+def get_admission() -> AdmissionController:
+    if _admission is None:
+        raise RuntimeError("Spark client not initialized")
+    return _admission
 
 
-def get_client() -> SparkSQLClient:
-    if _client is None:
+def get_jobs() -> JobRegistry:
+    if _jobs is None:
         raise RuntimeError("Spark client not initialized")
-    return _client
+    return _jobs
+
+
+register_tools(mcp, get_router, get_admission, get_jobs)
+
+
+def _prewarm(client: SparkSQLClient) -> None:
+    try:
+        client.connect()
+    except Exception:
+        logger.warning("Pre-warming Spark connections failed; connecting on first use instead")
+
+
+def _refresh_catalog(client: SparkSQLClient) -> None:
+    """Revalidate the catalog snapshot now and then every refresh interval."""
+    interval = client.config.catalog_refresh_interval
+    while True:
+        try:
+            described = client.revalidate_catalog()
+            logger.info("Catalog snapshot revalidated; %d tables re-described", described)
+        except Exception:
+            logger.warning("Revalidating the catalog snapshot failed; keeping the cached copy")
+        if interval <= 0 or _stopping.wait(interval):
+            return
 
 
-register_tools(mcp, get_client)
+def _refresh_schema_index(client: SparkSQLClient) -> None:
+    """Crawl every database into the schema search index, then again every interval."""
+    interval = client.config.search_index_interval
+    while True:
+        try:
+            indexed = client.refresh_schema_index()
+            logger.info("Schema search index refreshed; %d tables indexed", indexed)
+        except Exception:
+            logger.warning("Refreshing the schema search index failed; keeping the current index")
+        if _stopping.wait(interval):
+            return
 
 
 def main() -> None:
-    global _client
-    config = SparkConfig.from_env()
-    _client = SparkSQLClient(config)
-    _client.connect()
+    global _router, _admission, _jobs
+    _stopping.clear()
+    _admission = AdmissionController.from_config(AdmissionConfig.from_env())
+    _jobs = JobRegistry.from_config(JobConfig.from_env())
+    _router = ClusterRouter.from_config(RoutingConfig.from_env())
+    # Connect lazily so the MCP handshake never waits on a cluster.
+    for name, client in _router.clients.items():
+        if client.config.prewarm:
+            threading.Thread(
+                target=_prewarm, args=(client,), name=f"spark-sql-prewarm-{name}", daemon=True
+            ).start()
+        if client.config.catalog_dir:
+            # Reading the local snapshot is fast; revalidating it needs the cluster.
+            client.load_catalog()
+            threading.Thread(
+                target=_refresh_catalog, args=(client,),
+                name=f"spark-sql-catalog-{name}", daemon=True,
+            ).start()
+        if client.config.search_index_interval > 0:
+            threading.Thread(
+                target=_refresh_schema_index, args=(client,),
+                name=f"spark-sql-search-index-{name}", daemon=True,
+            ).start()
     try:
         mcp.run()
     finally:
-        _client.close()
+        _stopping.set()
+        _jobs.shutdown()
+        _router.close()
 
 
 if __name__ == "__main__":
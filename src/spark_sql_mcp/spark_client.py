@@ -1,13 +1,48 @@
-"""Spark SQL client using Thrift/HiveServer2 protocol."""
+"""Spark SQL client using Thrift/HiveServer2 protocol.
 
-import re
-from typing import Any
+PyHive, Thrift and SASL are imported on first use rather than at module import,
+so the MCP server can start and answer the handshake without loading them.
+"""
+
+from __future__ import annotations
 
-from pyhive import hive
+import contextvars
+import logging
+import re
+import sys
+import threading
+import time
+from collections.abc import Callable, Generator, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from dataclasses import asdict
+from fnmatch import fnmatchcase
+from typing import TYPE_CHECKING, Any
 
+from .budget import BudgetTracker
+from .cache import TTLCache
 from .config import SparkConfig
+from .executor import BlockingExecutor, CancelToken, QueryCancelledError, current_token
+from .guard import PlanEstimate, parse_plan
+from .metrics import QUERY_SPAN, Instrumentation, Span, create_sink
+from .pool import ConnectionPool, PoolStats
+from .profile import TableProfile, build_profile, profile_query, table_columns
+from .results import QueryResult, result_size
+from .schema import parse_table_information
+from .search import SchemaIndex
+from .sql import is_read_only, normalize
+
+if TYPE_CHECKING:
+    import pyarrow
+    from pyhive import hive
+
+    from .catalog import CatalogSnapshot
+
+logger = logging.getLogger(__name__)
 
 _IDENTIFIER_RE = re.compile(r"^[a-zA-Z_]\w*(\.[a-zA-Z_]\w*)*$")
+# Table name patterns that SHOW TABLE EXTENDED ... LIKE understands as-is.
+_LIKE_PATTERN_RE = re.compile(r"^[\w*]+$")
 
 
 def _validate_identifier(name: str) -> str:
@@ -16,18 +51,281 @@ def _validate_identifier(name: str) -> str:
     return name
 
 
+def _transport_open(conn: hive.Connection) -> bool:
+    transport = getattr(conn, "_transport", None)
+    return transport is None or bool(transport.isOpen())
+
+
+def _session_alive(conn: hive.Connection) -> bool:
+    """Cheap liveness probe: a GetInfo round trip that does not start a Spark job."""
+    from TCLIService.ttypes import TGetInfoReq, TGetInfoType, TStatusCode
+
+    response = conn.client.GetInfo(
+        TGetInfoReq(sessionHandle=conn.sessionHandle, infoType=TGetInfoType.CLI_SERVER_NAME)
+    )
+    return response.status.statusCode == TStatusCode.SUCCESS_STATUS
+
+
+_SESSION_ERRORS = ("Invalid SessionHandle", "Invalid OperationHandle")
+
+
+_SQL_ATTRIBUTE_CHARS = 1000
+
+
+def _sql_attr(sql: str) -> str:
+    sql = normalize(sql)
+    return sql if len(sql) <= _SQL_ATTRIBUTE_CHARS else sql[:_SQL_ATTRIBUTE_CHARS] + "..."
+
+
+def _estimate_batch_bytes(batch: list[tuple] | pyarrow.RecordBatch) -> int:
+    """Rough wire size of a fetched batch, extrapolated from its first row."""
+    if not isinstance(batch, list):
+        return batch.nbytes
+    if not batch:
+        return 0
+    sample = batch[0]
+    row_bytes = sum(len(v) if isinstance(v, (str, bytes)) else 8 for v in sample)
+    return row_bytes * len(batch)
+
+
+# Threads for metadata calls, matching the default metadata admission lane.
+_METADATA_WORKERS = 4
+
+# How long a cluster whose connection attempts all failed is reported unreachable.
+_UNREACHABLE_COOLDOWN = 30.0
+
+
+class _ConnectFailedError(ConnectionError):
+    """Opening a new connection failed (after backoff), as opposed to losing one."""
+
+
+def _is_disconnect(exc: BaseException) -> bool:
+    """Whether ``exc`` means the connection or its HiveServer2 session is unusable.
+
+    Only errors from the connection itself count. Timeouts, including a pool
+    checkout that ran out of time, say nothing about the connection's health.
+    """
+    from pyhive import hive
+    from thrift.transport.TTransport import TTransportException
+
+    if isinstance(exc, (TTransportException, EOFError, ConnectionError)):
+        return True
+    return isinstance(exc, hive.OperationalError) and any(
+        marker in str(exc) for marker in _SESSION_ERRORS
+    )
+
+
+def _close_quietly(cursor: hive.Cursor) -> None:
+    try:
+        cursor.close()
+    except Exception:
+        pass
+
+
+_POLL_INTERVAL_MIN = 0.01
+_POLL_INTERVAL_MAX = 0.5
+
+
+def _wait_for_completion(cursor: hive.Cursor, token: CancelToken) -> None:
+    """Poll an async HiveServer2 operation until it finishes or ``token`` is cancelled."""
+    from pyhive import hive
+    from TCLIService.ttypes import TOperationState
+
+    terminal_error_states = (
+        TOperationState.CANCELED_STATE,
+        TOperationState.CLOSED_STATE,
+        TOperationState.ERROR_STATE,
+        TOperationState.UKNOWN_STATE,
+        TOperationState.TIMEDOUT_STATE,
+    )
+    interval = _POLL_INTERVAL_MIN
+    while True:
+        if token.cancelled:
+            cursor.cancel()
+            token.raise_if_cancelled()
+        status = cursor.poll(get_progress_update=False)
+        state = status.operationState
+        if state == TOperationState.FINISHED_STATE:
+            return
+        if state in terminal_error_states:
+            raise hive.OperationalError(
+                status.errorMessage
+                or f"Operation ended in state {TOperationState._VALUES_TO_NAMES.get(state)}"
+            )
+        token.wait(interval)
+        interval = min(interval * 2, _POLL_INTERVAL_MAX)
+
+
+def _iter_batches(
+    cursor: hive.Cursor,
+    token: CancelToken,
+    batch_size: int,
+    limit: int | None,
+    fetchmany: Callable[[hive.Cursor, int], list[tuple]] | None = None,
+) -> Iterator[list[tuple]]:
+    """Yield row batches from ``cursor``, fetching no more than ``limit`` rows in total.
+
+    Batches come from ``fetchmany(cursor, size)`` if given, else ``cursor.fetchmany``.
+    """
+    remaining = limit
+    while remaining is None or remaining > 0:
+        if token.cancelled:
+            cursor.cancel()
+            token.raise_if_cancelled()
+        size = batch_size if remaining is None else min(batch_size, remaining)
+        # PyHive requests ``arraysize`` rows per FetchResults round trip.
+        cursor.arraysize = size
+        batch = fetchmany(cursor, size) if fetchmany else cursor.fetchmany(size)
+        if not batch:
+            return
+        if remaining is not None:
+            remaining -= len(batch)
+        yield batch
+    # The limit was reached; stop the Spark job instead of letting it keep producing rows.
+    try:
+        cursor.cancel()
+    except Exception:
+        pass
+
+
 class SparkSQLClient:
     def __init__(self, config: SparkConfig):
         self._config = config
-        self._connection: hive.Connection | None = None
+        self._pool: ConnectionPool | None = None
+        self._pool_lock = threading.Lock()
+        self._executor: BlockingExecutor | None = None
+        self._metadata_executor: BlockingExecutor | None = None
+        self._metadata: TTLCache[Any] = TTLCache(
+            config.metadata_cache_size, config.metadata_cache_ttl
+        )
+        self.instrumentation = Instrumentation(
+            create_sink(config.metrics_sink), config.slow_query_ms
+        )
+        self._reconnect_lock = threading.Lock()
+        self._reconnect_stats = {
+            "connects": 0,
+            "connect_failures": 0,
+            "disconnects": 0,
+            "retried_queries": 0,
+            "last_connect_ms": 0.0,
+            "max_connect_ms": 0.0,
+        }
+        self._unreachable_until = 0.0
+        # Filled as schemas are loaded; see refresh_schema_index for a full crawl.
+        self.schema_index = SchemaIndex()
+        self._catalog: CatalogSnapshot | None = None
+        if config.catalog_dir:
+            # Imported here so sqlite3 is only loaded when the snapshot is enabled.
+            from .catalog import CatalogSnapshot, snapshot_path
+
+            self._catalog = CatalogSnapshot(
+                snapshot_path(config.catalog_dir, config.host, config.port)
+            )
+        self._fetchmany: Callable[[hive.Cursor, int], list[tuple]] | None = None
+        # Whether background query results are kept as Arrow tables.
+        self.arrow_results = False
+        if config.fetch_backend != "pyhive":
+            from .columnar import arrow_available, fetchmany
+
+            self._fetchmany = fetchmany
+            if config.fetch_backend == "arrow":
+                if arrow_available():
+                    self.arrow_results = True
+                else:
+                    logger.warning(
+                        "SPARK_FETCH_BACKEND=arrow needs pyarrow; keeping background query "
+                        "results as rows. Install it with: "
+                        "pip install 'spark-sql-mcp-server[arrow]'"
+                    )
+        self._plans: TTLCache[PlanEstimate] = TTLCache(
+            config.metadata_cache_size, config.metadata_cache_ttl
+        )
+        self._results: TTLCache[QueryResult] = TTLCache(
+            sys.maxsize,
+            config.result_cache_ttl,
+            max_bytes=config.result_cache_max_bytes,
+            sizeof=result_size,
+        )
+
+    @property
+    def pool(self) -> ConnectionPool:
+        """The connection pool, created on first use; connections open lazily."""
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ConnectionPool(
+                    self._open_connection,
+                    min_size=self._config.pool_min_size,
+                    max_size=self._config.pool_max_size,
+                    timeout=self._config.pool_timeout,
+                    idle_timeout=self._config.pool_idle_timeout,
+                    health_check=self._health_check,
+                    is_disconnect=self._on_disconnect,
+                    reserved=self._config.pool_max_size - self._config.pool_query_size,
+                )
+            return self._pool
+
+    @property
+    def executor(self) -> BlockingExecutor:
+        """Thread pool for blocking query calls, sized to the connection pool."""
+        if self._executor is None:
+            self._executor = BlockingExecutor(self._config.pool_max_size)
+        return self._executor
 
     @property
-    def connection(self) -> hive.Connection:
-        if self._connection is None:
-            raise RuntimeError("Not connected. Call connect() first.")
-        return self._connection
+    def metadata_executor(self) -> BlockingExecutor:
+        """Separate threads for metadata calls, so lookups (often cache hits) never
+        queue behind scans. Run work here inside ``reserved_checkouts()`` to let
+        cache misses use the pool's reserved connections."""
+        if self._metadata_executor is None:
+            self._metadata_executor = BlockingExecutor(_METADATA_WORKERS)
+        return self._metadata_executor
 
     def connect(self) -> None:
+        """Open ``pool_min_size`` connections now instead of on first use."""
+        self.pool.fill()
+
+    def _open_connection(self) -> hive.Connection:
+        """Connect, retrying with exponential backoff."""
+        token = current_token()
+        delay = self._config.reconnect_backoff
+        attempt = 1
+        while True:
+            start = time.monotonic()
+            try:
+                conn = self._connect_once()
+            except _ConnectFailedError:
+                self._record("connect_failures")
+                if attempt >= self._config.reconnect_attempts:
+                    with self._reconnect_lock:
+                        self._unreachable_until = time.monotonic() + _UNREACHABLE_COOLDOWN
+                    raise
+                if token.wait(delay):
+                    token.raise_if_cancelled()
+                delay = min(delay * 2, self._config.reconnect_backoff_max)
+                attempt += 1
+                continue
+            elapsed_ms = (time.monotonic() - start) * 1000
+            with self._reconnect_lock:
+                stats = self._reconnect_stats
+                stats["connects"] += 1
+                stats["last_connect_ms"] = elapsed_ms
+                stats["max_connect_ms"] = max(stats["max_connect_ms"], elapsed_ms)
+                self._unreachable_until = 0.0
+            return conn
+
+    @property
+    def config(self) -> SparkConfig:
+        return self._config
+
+    @property
+    def reachable(self) -> bool:
+        """False for a while after every connection attempt to the cluster failed."""
+        with self._reconnect_lock:
+            return time.monotonic() >= self._unreachable_until
+
+    def _connect_once(self) -> hive.Connection:
+        from pyhive import hive
+
         kwargs: dict[str, Any] = {
             "host": self._config.host,
             "port": self._config.port,
@@ -39,39 +337,599 @@ class SparkSQLClient:
         if self._config.auth == "KERBEROS":
             kwargs["kerberos_service_name"] = self._config.kerberos_service_name
         try:
-            self._connection = hive.Connection(**kwargs)
+            return hive.Connection(**kwargs)
         except Exception as exc:
-            raise ConnectionError(
+            raise _ConnectFailedError(
                 f"Failed to connect to Spark Thrift Server at "
                 f"{self._config.host}:{self._config.port}: {type(exc).__name__}"
             ) from None
 
+    def _health_check(self, conn: hive.Connection, idle: float) -> bool:
+        if not _transport_open(conn):
+            return False
+        # Only probe the server for connections that sat idle long enough to have
+        # been dropped by a firewall or an expired session.
+        if idle < self._config.liveness_interval:
+            return True
+        return _session_alive(conn)
+
+    def _on_disconnect(self, exc: BaseException) -> bool:
+        if _is_disconnect(exc):
+            self._record("disconnects")
+            return True
+        return False
+
+    def _record(self, counter: str) -> None:
+        with self._reconnect_lock:
+            self._reconnect_stats[counter] += 1
+
     def close(self) -> None:
-        if self._connection:
-            self._connection.close()
-            self._connection = None
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+        if pool:
+            pool.close()
+        for executor in (self._executor, self._metadata_executor):
+            if executor:
+                executor.shutdown()
+        self._executor = self._metadata_executor = None
+        if self._catalog is not None:
+            self._catalog.close()
+
+    def pool_stats(self) -> PoolStats | None:
+        return self._pool.stats() if self._pool else None
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        """Operational counters, grouped by component."""
+        stats: dict[str, dict[str, Any]] = {}
+        pool = self.pool_stats()
+        if pool is not None:
+            stats["connection_pool"] = asdict(pool)
+        with self._reconnect_lock:
+            stats["connections"] = dict(self._reconnect_stats)
+        stats["metadata_cache"] = asdict(self._metadata.stats())
+        timings = {
+            f"{name}.{key}": value
+            for name, summary in self.instrumentation.summary().items()
+            for key, value in summary.items()
+        }
+        if timings:
+            stats["timings"] = timings
+        results = self._results.stats()
+        if self._results.enabled or results.coalesced:
+            stats["result_cache"] = asdict(results)
+        if len(self.schema_index):
+            stats["schema_index"] = self.schema_index.stats()
+        return stats
+
+    def iter_query(self, sql: str, limit: int | None = None) -> Iterator[dict[str, Any]]:
+        """Yield result rows as they arrive, holding at most one fetch batch in memory.
+
+        Stops reading after ``limit`` rows and cancels the rest of the operation.
+        """
+        with self.instrumentation.span(QUERY_SPAN, activate=False, sql=_sql_attr(sql)) as span:
+            for columns, batch in self._iter_batches(sql, limit, span):
+                for row in batch:
+                    yield dict(zip(columns, row))
+
+    def iter_batches(self, sql: str, limit: int | None = None) -> Iterator[QueryResult]:
+        """Like ``iter_query``, but yields each fetch batch as a ``QueryResult``."""
+        with self.instrumentation.span(QUERY_SPAN, activate=False, sql=_sql_attr(sql)) as span:
+            for columns, batch in self._iter_batches(sql, limit, span):
+                yield QueryResult(columns, tuple(batch))
+
+    def iter_record_batches(
+        self, sql: str, limit: int | None = None
+    ) -> Iterator[pyarrow.RecordBatch]:
+        """Like ``iter_batches``, but decodes each fetch batch into an Arrow record batch.
+
+        Needs pyarrow; decimals and timestamps are left as strings.
+        """
+        from .columnar import fetch_record_batch
 
-    def execute_query(self, sql: str) -> list[dict[str, Any]]:
-        cursor = self.connection.cursor()
+        with self.instrumentation.span(QUERY_SPAN, activate=False, sql=_sql_attr(sql)) as span:
+            for _, batch in self._iter_batches(sql, limit, span, fetch_record_batch):
+                yield batch
+
+    def query(
+        self,
+        sql: str,
+        limit: int | None = None,
+        *,
+        cached: bool = False,
+        max_bytes: int = 0,
+        fmt: str = "markdown",
+    ) -> QueryResult:
+        """Run ``sql`` and return up to ``limit`` rows.
+
+        With ``cached=True`` the result may be served from, and is stored in, the
+        result cache, and concurrent calls for the same normalized statement,
+        database, limit and budget share one execution even when the cache is
+        disabled. Only pass it for read-only statements.
+
+        With ``max_bytes``, long values are cut and fetching stops once the rows
+        read would render to more than about ``max_bytes`` in the output format
+        ``fmt``; the result's ``truncation`` says what was left out.
+        """
+        with self.instrumentation.span(QUERY_SPAN, sql=_sql_attr(sql)) as span:
+            if cached:
+                # Without a budget, every format is rendered from the same rows.
+                key = (
+                    normalize(sql), self._config.database, limit, max_bytes,
+                    fmt if max_bytes else None,
+                )
+                loaded: list[bool] = []
+
+                def _load() -> QueryResult:
+                    loaded.append(True)
+                    return self._fetch(sql, limit, span, max_bytes, fmt)
+
+                result = self._results.get_or_load(key, _load)
+                if self._results.enabled:
+                    span.set("cache_hit", not loaded)
+                elif not loaded:
+                    span.set("coalesced", True)
+            else:
+                result = self._fetch(sql, limit, span, max_bytes, fmt)
+            span.set("rows", len(result))
+            if result.truncation is not None:
+                span.set("truncated", True)
+            return result
+
+    def execute_query(
+        self, sql: str, limit: int | None = None, *, cached: bool = False
+    ) -> list[dict[str, Any]]:
+        """Like ``query``, but returns each row as a dict."""
+        return self.query(sql, limit, cached=cached).to_dicts()
+
+    def _fetch(
+        self,
+        sql: str,
+        limit: int | None,
+        span: Span | None = None,
+        max_bytes: int = 0,
+        fmt: str = "markdown",
+    ) -> QueryResult:
         try:
-            cursor.execute(sql)
-            if cursor.description is None:
-                return []
-            columns = [desc[0] for desc in cursor.description]
-            return [dict(zip(columns, row)) for row in cursor.fetchall()]
-        finally:
-            cursor.close()
+            return self._fetch_once(sql, limit, span, max_bytes, fmt)
+        except Exception as exc:
+            # The broken connection has already been dropped from the pool. Reading
+            # is idempotent, so one retry on a fresh connection is safe.
+            retryable = _is_disconnect(exc) and not isinstance(exc, _ConnectFailedError)
+            if not (retryable and is_read_only(sql)):
+                raise
+        self._record("retried_queries")
+        if span is not None:
+            span.set("retried", True)
+        return self._fetch_once(sql, limit, span, max_bytes, fmt)
+
+    def _fetch_once(
+        self,
+        sql: str,
+        limit: int | None,
+        span: Span | None,
+        max_bytes: int = 0,
+        fmt: str = "markdown",
+    ) -> QueryResult:
+        columns: tuple[str, ...] = ()
+        rows: list[tuple] = []
+        tracker: BudgetTracker | None = None
+        with closing(self._iter_batches(sql, limit, span)) as batches:
+            for columns, batch in batches:
+                if not max_bytes:
+                    rows.extend(batch)
+                    continue
+                if tracker is None:
+                    tracker = BudgetTracker(
+                        columns, max_bytes, self._config.max_cell_chars, fmt
+                    )
+                for row in batch:
+                    capped = tracker.admit(row)
+                    if capped is None:
+                        break
+                    rows.append(capped)
+                if tracker.exhausted:
+                    # Closing the generator closes the operation; nothing more is read.
+                    break
+        truncation = tracker.truncation() if tracker is not None else None
+        return QueryResult(columns, tuple(rows), truncation)
+
+    def _iter_batches(
+        self,
+        sql: str,
+        limit: int | None,
+        span: Span | None = None,
+        fetchmany: Callable[[hive.Cursor, int], Any] | None = None,
+    ) -> Generator[tuple[tuple[str, ...], Any], None, None]:
+        """Run ``sql`` and yield ``(columns, batch)`` pairs.
+
+        Batches are row lists from the configured fetch backend, or whatever
+        ``fetchmany(cursor, size)`` returns if given.
+
+        Execute latency, fetch latency, rows and estimated bytes are recorded on
+        ``span``. Fetch latency covers only the Thrift round trips, not the time
+        the consumer spends between batches.
+        """
+        token = current_token()
+        token.raise_if_cancelled()
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                start = time.perf_counter()
+                # Run asynchronously so a cancelled request can stop the Spark job.
+                cursor.execute(sql, async_=True)
+                _wait_for_completion(cursor, token)
+                if span is not None:
+                    span.set("execute_ms", round((time.perf_counter() - start) * 1000, 3))
+                if cursor.description is None:
+                    return
+                columns = tuple(desc[0] for desc in cursor.description)
+                fetch_time = 0.0
+                rows = 0
+                nbytes = 0
+                batches = _iter_batches(
+                    cursor, token, self._config.fetch_size, limit, fetchmany or self._fetchmany
+                )
+                while True:
+                    start = time.perf_counter()
+                    batch = next(batches, None)
+                    fetch_time += time.perf_counter() - start
+                    if span is not None:
+                        span.set("fetch_ms", round(fetch_time * 1000, 3))
+                    if batch is None:
+                        break
+                    rows += len(batch)
+                    nbytes += _estimate_batch_bytes(batch)
+                    if span is not None:
+                        span.set("rows", rows)
+                        span.set("bytes", nbytes)
+                    yield columns, batch
+            finally:
+                _close_quietly(cursor)
 
     def list_databases(self) -> list[str]:
-        results = self.execute_query("SHOW DATABASES")
-        return [next(iter(r.values())) for r in results]
+        key = ("databases",)
+        return list(self._metadata.get_or_load(key, self._persisted(key, self._fetch_databases)))
 
     def list_tables(self, database: str | None = None) -> list[str]:
         db = _validate_identifier(database or self._config.database)
-        results = self.execute_query(f"SHOW TABLES IN {db}")
-        return [r.get("tableName", next(iter(r.values()))) for r in results]
+        key = ("tables", db.lower())
+        return list(
+            self._metadata.get_or_load(key, self._persisted(key, lambda: self._fetch_tables(db)))
+        )
 
     def describe_table(self, table: str, database: str | None = None) -> list[dict[str, Any]]:
         db = _validate_identifier(database or self._config.database)
         tbl = _validate_identifier(table)
-        return self.execute_query(f"DESCRIBE {db}.{tbl}")
+        key = ("columns", db.lower(), tbl.lower())
+        rows = self._metadata.get_or_load(
+            key, self._persisted(key, lambda: self._fetch_columns(db, tbl))
+        )
+        return [dict(row) for row in rows]
+
+    def load_catalog(self) -> int:
+        """Seed the metadata cache from the on-disk snapshot, if one is configured.
+
+        Returns the number of entries loaded. An unreadable snapshot is logged
+        and ignored; metadata is then fetched from the cluster as usual.
+        """
+        if self._catalog is None:
+            return 0
+        import sqlite3
+
+        try:
+            entries = self._catalog.load()
+        except (sqlite3.Error, ValueError):
+            logger.warning("Could not read catalog snapshot %s; ignoring it", self._catalog.path)
+            return 0
+        for key, value in entries:
+            self._metadata.put(key, value)
+            self._index(key, value)
+        return len(entries)
+
+    def revalidate_catalog(self) -> int:
+        """Bring the snapshot and metadata cache up to date with the cluster.
+
+        For each database in the snapshot, the table listing is refreshed and
+        one ``SHOW TABLE EXTENDED`` call fingerprints every table. Only tables
+        whose fingerprint changed (or was never recorded) are described again;
+        the cache entries of unchanged ones are renewed from the snapshot.
+        Dropped tables and databases are removed. Returns the number of tables
+        re-described.
+        """
+        if self._catalog is None:
+            return 0
+        databases = self._fetch_databases()
+        self._remember(("databases",), databases)
+        existing = {d.lower() for d in databases}
+        stored = dict(self._catalog.load())
+        snapshot_dbs = {key[1] for key in stored if key[0] != "databases"}
+        described = 0
+        for db in sorted(snapshot_dbs):
+            if db not in existing or not _IDENTIFIER_RE.match(db):
+                self._forget(lambda key: key[0] != "databases" and key[1] == db)
+                continue
+            tables = self._fetch_tables(db)
+            self._remember(("tables", db), tables)
+            names = {t.lower() for t in tables}
+            current = self._table_fingerprints(db)
+            for tbl, version in self._catalog.versions(db).items():
+                if tbl not in names:
+                    self._forget(lambda key: key == ("columns", db, tbl))
+                    continue
+                fingerprint = current.get(tbl) if current is not None else None
+                key = ("columns", db, tbl)
+                if fingerprint is not None and fingerprint == version and key in stored:
+                    # Unchanged: restart its TTL so it does not expire before the next pass.
+                    self._metadata.put(key, stored[key])
+                    continue
+                self._remember(key, self._fetch_columns(db, tbl), fingerprint)
+                described += 1
+        return described
+
+    def refresh_schema_index(self) -> int:
+        """Re-index every table of every database; returns the number of tables indexed.
+
+        Each database costs one ``SHOW TABLES`` and one ``SHOW TABLE EXTENDED``
+        call, plus a ``DESCRIBE`` for each table the latter cannot parse, run
+        concurrently over the connection pool. A database that fails is logged
+        and skipped, keeping whatever the index already had for it.
+        """
+        databases = self._fetch_databases()
+        self._remember(("databases",), databases)
+        names = {d.lower() for d in databases}
+        self.schema_index.invalidate(lambda db, _table: db not in names)
+        for db in databases:
+            if not _IDENTIFIER_RE.match(db):
+                continue
+            try:
+                self._remember(("tables", db.lower()), self._fetch_tables(db))
+                schemas = self._fetch_schemas(db, "*")
+            except QueryCancelledError:
+                raise
+            except Exception:
+                logger.warning("Indexing schemas of database %s failed; skipping it", db)
+                continue
+            self._metadata.put(("schemas", db.lower(), "*"), schemas)
+            self.schema_index.replace_database(db, dict(schemas))
+        return len(self.schema_index)
+
+    def _persisted(self, key: tuple[Any, ...], loader: Callable[[], Any]) -> Callable[[], Any]:
+        """Wrap a metadata loader so its result is also indexed and written to the snapshot."""
+        def _load() -> Any:
+            value = loader()
+            self._index(key, value)
+            self._store_snapshot(key, value)
+            return value
+
+        return _load
+
+    def _index(self, key: tuple[Any, ...], value: Any) -> None:
+        if key[0] == "columns":
+            self.schema_index.add_table(key[1], key[2], value)
+
+    def _remember(self, key: tuple[Any, ...], value: Any, version: str | None = None) -> None:
+        self._metadata.put(key, value)
+        self._index(key, value)
+        self._store_snapshot(key, value, version)
+
+    def _store_snapshot(self, key: tuple[Any, ...], value: Any, version: str | None = None) -> None:
+        catalog = self._catalog
+        if catalog is None:
+            return
+        import sqlite3
+
+        try:
+            catalog.store(key, value, version)
+        except sqlite3.Error:
+            logger.warning("Could not write catalog snapshot %s", catalog.path)
+
+    def _forget(self, predicate: Callable[[tuple[Any, ...]], bool]) -> None:
+        self._metadata.invalidate(predicate)
+        self.schema_index.invalidate(lambda db, tbl: predicate(("columns", db, tbl)))
+        if self._catalog is not None:
+            self._catalog.delete(predicate)
+
+    def describe_tables(
+        self, database: str | None = None, pattern: str = "*"
+    ) -> dict[str, list[dict[str, Any]]]:
+        """``DESCRIBE`` output for every table in a database matching the glob ``pattern``.
+
+        Schemas come from a single ``SHOW TABLE EXTENDED`` call where the server
+        supports it; the remaining tables (nested types, older servers) are
+        described concurrently, up to ``pool_max_size`` at a time. Those lookups
+        fill the per-table metadata cache, and the combined result is cached too.
+        """
+        db = _validate_identifier(database or self._config.database)
+        key = ("schemas", db.lower(), pattern.lower())
+
+        def _load() -> tuple[tuple[str, tuple[dict[str, Any], ...]], ...]:
+            schemas = self._fetch_schemas(db, pattern)
+            if pattern == "*":
+                self.schema_index.replace_database(db, dict(schemas))
+            else:
+                for table, rows in schemas:
+                    self.schema_index.add_table(db, table, rows)
+            return schemas
+
+        schemas = self._metadata.get_or_load(key, _load)
+        return {table: [dict(row) for row in rows] for table, rows in schemas}
+
+    def profile_table(
+        self,
+        table: str,
+        database: str | None = None,
+        *,
+        columns: list[str] | None = None,
+        sample: str | None = None,
+    ) -> TableProfile:
+        """Null counts, approximate distinct counts, min/max and percentiles per column.
+
+        All columns (or just ``columns``) are profiled by a single aggregate query,
+        optionally over ``TABLESAMPLE (<sample>)``. Profiles are cached like other
+        metadata and dropped by ``invalidate_metadata`` for the table.
+        """
+        db = _validate_identifier(database or self._config.database)
+        tbl = _validate_identifier(table)
+        wanted = tuple(c.lower() for c in columns) if columns else None
+        key = ("profile", db.lower(), tbl.lower(), sample, wanted)
+
+        def _load() -> TableProfile:
+            described = table_columns(self.describe_table(tbl, db))
+            selected = described
+            if wanted is not None and columns:
+                selected = [c for c in described if c[0].lower() in wanted]
+                known = {c[0].lower() for c in described}
+                missing = [c for c in columns if c.lower() not in known]
+                if missing:
+                    raise ValueError(f"Unknown column(s) in {db}.{tbl}: {', '.join(missing)}")
+            source = f"{db}.{tbl}" + (f" TABLESAMPLE ({sample})" if sample else "")
+            return build_profile(self.query(profile_query(source, selected)), selected)
+
+        return self._metadata.get_or_load(key, _load)
+
+    def sample_table(
+        self,
+        table: str,
+        database: str | None = None,
+        *,
+        sample: str = "1 PERCENT",
+        limit: int = 20,
+        max_bytes: int = 0,
+        fmt: str = "markdown",
+    ) -> QueryResult:
+        """Up to ``limit`` rows drawn with ``TABLESAMPLE (<sample>)``, e.g. ``"1 PERCENT"``.
+
+        ``max_bytes`` and ``fmt`` bound the rendered rows as in ``query``.
+        """
+        db = _validate_identifier(database or self._config.database)
+        tbl = _validate_identifier(table)
+        if limit < 1:
+            raise ValueError("limit must be a positive integer")
+        return self.query(
+            f"SELECT * FROM {db}.{tbl} TABLESAMPLE ({sample}) LIMIT {limit}",
+            limit, max_bytes=max_bytes, fmt=fmt,
+        )
+
+    def invalidate_metadata(self, database: str | None = None, table: str | None = None) -> int:
+        """Drop cached metadata so the next lookup goes to the cluster.
+
+        With no arguments the whole cache is cleared. Otherwise the entries for the
+        database (or one table in it) are dropped, along with the listings that
+        would mention it. Returns the number of entries removed.
+        """
+        # Plans embed table statistics, which DDL and ANALYZE can change.
+        self._plans.invalidate()
+        if database is None and table is None:
+            if self._catalog is not None:
+                self._catalog.delete()
+            self.schema_index.invalidate()
+            return self._metadata.invalidate()
+        db = _validate_identifier(database or self._config.database).lower()
+        tbl = _validate_identifier(table).lower() if table else None
+
+        def _matches(key: tuple[Any, ...]) -> bool:
+            kind, *rest = key
+            if kind == "databases":
+                return tbl is None
+            if kind in ("tables", "schemas"):
+                return rest[0] == db
+            return rest[0] == db and (tbl is None or rest[1] == tbl)
+
+        if self._catalog is not None:
+            self._catalog.delete(_matches)
+        self.schema_index.invalidate(lambda d, t: _matches(("columns", d, t)))
+        return self._metadata.invalidate(_matches)
+
+    def explain(self, sql: str) -> PlanEstimate:
+        """Cost estimate from ``EXPLAIN COST``, cached per normalized statement."""
+        key = (normalize(sql), self._config.database)
+        return self._plans.get_or_load(key, lambda: self._fetch_plan(sql))
+
+    def _fetch_databases(self) -> tuple[str, ...]:
+        return tuple(row[0] for row in self.query("SHOW DATABASES"))
+
+    def _fetch_tables(self, db: str) -> tuple[str, ...]:
+        result = self.query(f"SHOW TABLES IN {db}")
+        index = result.columns.index("tableName") if "tableName" in result.columns else 0
+        return tuple(row[index] for row in result)
+
+    def _fetch_plan(self, sql: str) -> PlanEstimate:
+        result = self.query(f"EXPLAIN COST {sql}")
+        return parse_plan("\n".join(str(row[0]) for row in result))
+
+    def _fetch_columns(self, db: str, tbl: str) -> tuple[dict[str, Any], ...]:
+        return tuple(self.execute_query(f"DESCRIBE {db}.{tbl}"))
+
+    def _fetch_schemas(
+        self, db: str, pattern: str
+    ) -> tuple[tuple[str, tuple[dict[str, Any], ...]], ...]:
+        glob = pattern.lower()
+        tables = [
+            t for t in self.list_tables(db)
+            if fnmatchcase(t.lower(), glob) and _IDENTIFIER_RE.match(t)
+        ]
+        extended = self._fetch_extended(db, pattern) if tables else {}
+        missing = [t for t in tables if t.lower() not in extended]
+        described = self._describe_concurrently(db, missing)
+        return tuple(
+            (t, tuple(extended[t.lower()]) if t.lower() in extended else tuple(described[t]))
+            for t in sorted(tables, key=str.lower)
+        )
+
+    def _fetch_extended(self, db: str, pattern: str) -> dict[str, list[dict[str, Any]]]:
+        """Schemas parsed from ``SHOW TABLE EXTENDED``, keyed by lower-cased table name.
+
+        Returns only the tables whose schema could be parsed, and nothing at all
+        if the server rejects the statement.
+        """
+        like = pattern if _LIKE_PATTERN_RE.match(pattern) else "*"
+        schemas = {}
+        for table, information in (self._show_table_extended(db, like) or {}).items():
+            columns = parse_table_information(information)
+            if columns is not None:
+                schemas[table] = columns
+        return schemas
+
+    def _table_fingerprints(self, db: str) -> dict[str, str] | None:
+        from .catalog import table_fingerprint
+
+        tables = self._show_table_extended(db)
+        if tables is None:
+            return None
+        return {table: table_fingerprint(info) for table, info in tables.items()}
+
+    def _show_table_extended(self, db: str, like: str = "*") -> dict[str, str] | None:
+        """``information`` text per lower-cased table name, or None if unsupported."""
+        from pyhive import hive
+
+        try:
+            result = self.query(f"SHOW TABLE EXTENDED IN {db} LIKE '{like}'")
+        except hive.OperationalError as exc:
+            if _is_disconnect(exc):
+                raise
+            return None
+        if "information" not in result.columns or "tableName" not in result.columns:
+            return None
+        return {
+            str(row["tableName"]).lower(): str(row["information"] or "")
+            for row in result.to_dicts()
+            if str(row.get("isTemporary")).lower() != "true"
+        }
+
+    def _describe_concurrently(
+        self, db: str, tables: list[str]
+    ) -> dict[str, list[dict[str, Any]]]:
+        workers = min(self._config.pool_max_size, len(tables))
+        if workers <= 1:
+            return {t: self.describe_table(t, db) for t in tables}
+        # Each task runs in a copy of this context, so it sees the request's cancel token.
+        with ThreadPoolExecutor(workers, thread_name_prefix="spark-sql-describe") as pool:
+            futures = [
+                pool.submit(contextvars.copy_context().run, self.describe_table, t, db)
+                for t in tables
+            ]
+            try:
+                return {t: f.result() for t, f in zip(tables, futures)}
+            finally:
+                for future in futures:
+                    future.cancel()
@@ -0,0 +1,380 @@
+"""Lightweight Spark SQL tokenizer used to rewrite statements safely.
+
+This is not a full parser. It understands enough of the lexical structure
+(strings, quoted identifiers, comments, parentheses) to tell the top-level
+statement apart from subqueries, CTE bodies and literals.
+"""
+
+import re
+from typing import NamedTuple
+
+_TOKEN_RE = re.compile(
+    r"""
+    (?P<ws>\s+)
+    | (?P<comment>--[^\n]*|/\*.*?(?:\*/|\Z))
+    | (?P<string>'(?:[^'\\]|\\.|'')*(?:'|\Z)|"(?:[^"\\]|\\.|"")*(?:"|\Z))
+    | (?P<quoted>`(?:[^`]|``)*(?:`|\Z))
+    | (?P<number>\d+(?:\.\d*)?(?:[eE][+-]?\d+)?)
+    | (?P<word>[A-Za-z_][\w$]*)
+    | (?P<lparen>\()
+    | (?P<rparen>\))
+    | (?P<semicolon>;)
+    | (?P<punct>.)
+    """,
+    re.VERBOSE | re.DOTALL,
+)
+
+_ROW_QUERY_KEYWORDS = frozenset({"SELECT", "WITH"})
+_TABLE_CLAUSE_KEYWORDS = frozenset({"FROM", "JOIN"})
+# Words that may follow a table reference and therefore cannot be its alias.
+_NON_ALIAS_KEYWORDS = frozenset({
+    "ANTI", "CLUSTER", "CROSS", "DISTRIBUTE", "EXCEPT", "FULL", "GROUP", "HAVING", "INNER",
+    "INTERSECT", "JOIN", "LATERAL", "LEFT", "LIMIT", "MINUS", "NATURAL", "ON", "ORDER",
+    "OUTER", "PIVOT", "RIGHT", "SEMI", "SORT", "TABLESAMPLE", "UNION", "UNPIVOT", "USING",
+    "WHERE", "WINDOW",
+})
+# Words followed by an operand, so a ``limit`` right after one is a column name.
+_OPERAND_KEYWORDS = frozenset({
+    "AND", "BETWEEN", "BY", "CASE", "DISTINCT", "ELSE", "HAVING", "IN", "IS", "LIKE", "NOT",
+    "ON", "OR", "SELECT", "THEN", "WHEN", "WHERE",
+})
+# Clauses that come before LIMIT; a ``limit`` followed by one of them is a column name.
+_PRE_LIMIT_CLAUSES = frozenset({
+    "CLUSTER", "DISTRIBUTE", "FROM", "GROUP", "HAVING", "ORDER", "SORT", "WHERE", "WINDOW",
+})
+_READ_ONLY_KEYWORDS = frozenset({"SELECT", "SHOW", "DESCRIBE", "DESC", "EXPLAIN", "WITH"})
+
+
+class TableRef(NamedTuple):
+    """A table named in a FROM or JOIN clause; ``end`` is the offset after its name."""
+
+    database: str | None
+    table: str
+    start: int
+    end: int
+
+
+class Token(NamedTuple):
+    kind: str
+    text: str
+    start: int
+    end: int
+
+    @property
+    def upper(self) -> str:
+        return self.text.upper()
+
+
+def tokenize(sql: str) -> list[Token]:
+    return [
+        Token(m.lastgroup or "punct", m.group(), m.start(), m.end())
+        for m in _TOKEN_RE.finditer(sql)
+    ]
+
+
+def significant_tokens(sql: str) -> list[Token]:
+    """Tokens of a single statement, without whitespace, comments or trailing semicolons.
+
+    Raises ValueError if ``sql`` contains more than one statement.
+    """
+    tokens = [t for t in tokenize(sql) if t.kind not in ("ws", "comment")]
+    for i, token in enumerate(tokens):
+        if token.kind == "semicolon":
+            if any(t.kind != "semicolon" for t in tokens[i + 1:]):
+                raise ValueError("Only a single SQL statement is allowed per query.")
+            return tokens[:i]
+    return tokens
+
+
+def is_read_only(sql: str) -> bool:
+    """Whether ``sql`` is a single statement of a kind that cannot modify data."""
+    try:
+        tokens = significant_tokens(sql)
+    except ValueError:
+        return False
+    return bool(tokens) and tokens[0].upper in _READ_ONLY_KEYWORDS
+
+
+def is_query(sql: str) -> bool:
+    """Whether ``sql`` is a SELECT or WITH query, as opposed to SHOW, DESCRIBE or EXPLAIN."""
+    try:
+        tokens = significant_tokens(sql)
+    except ValueError:
+        return False
+    return bool(tokens) and tokens[0].upper in _ROW_QUERY_KEYWORDS
+
+
+def normalize(sql: str) -> str:
+    """Canonical form of a statement for use as a cache key.
+
+    Comments and trailing semicolons are dropped and runs of whitespace collapse
+    to a single space. Identifier case is preserved because it shapes the column
+    names of the result.
+    """
+    parts: list[str] = []
+    pending_space = False
+    for token in tokenize(sql):
+        if token.kind in ("ws", "comment"):
+            pending_space = bool(parts)
+            continue
+        if token.kind == "semicolon":
+            break
+        if pending_space:
+            parts.append(" ")
+            pending_space = False
+        parts.append(token.text)
+    return "".join(parts)
+
+
+def _identifier(token: Token) -> str:
+    if token.kind == "quoted":
+        return token.text[1:-1].replace("``", "`")
+    return token.text
+
+
+def table_references(sql: str) -> list[TableRef]:
+    """Tables read by ``sql``, in order of appearance, including those in subqueries.
+
+    Subqueries and table-valued functions in FROM position are skipped, as are
+    names that are only CTEs. Unlike ``significant_tokens`` this never raises,
+    so it can be used on statements that have not been validated yet.
+    """
+    tokens = [t for t in tokenize(sql) if t.kind not in ("ws", "comment")]
+    ctes = {
+        _identifier(tokens[i - 1]).lower()
+        for i in range(1, len(tokens) - 1)
+        if tokens[i].upper == "AS"
+        and tokens[i + 1].kind == "lparen"
+        and tokens[i - 1].kind in ("word", "quoted")
+    }
+    refs: list[TableRef] = []
+    # One entry per open parenthesis: whether it encloses a query rather than,
+    # say, the arguments of EXTRACT(year FROM ts).
+    query_parens: list[bool] = []
+    i = 0
+    while i < len(tokens):
+        token = tokens[i]
+        i += 1
+        if token.kind == "lparen":
+            inner = tokens[i].upper if i < len(tokens) else ""
+            query_parens.append(inner in _ROW_QUERY_KEYWORDS or inner == "(")
+            continue
+        if token.kind == "rparen":
+            if query_parens:
+                query_parens.pop()
+            continue
+        if token.upper not in _TABLE_CLAUSE_KEYWORDS or not all(query_parens[-1:]):
+            continue
+        while i < len(tokens) and tokens[i].kind in ("word", "quoted"):
+            start = i
+            parts = [_identifier(tokens[i])]
+            while (
+                i + 2 < len(tokens)
+                and tokens[i + 1].text == "."
+                and tokens[i + 2].kind in ("word", "quoted")
+            ):
+                parts.append(_identifier(tokens[i + 2]))
+                i += 2
+            if i + 1 < len(tokens) and tokens[i + 1].kind == "lparen":
+                break  # A table-valued function such as range(10).
+            if len(parts) > 1 or parts[0].lower() not in ctes:
+                database = parts[-2] if len(parts) > 1 else None
+                refs.append(TableRef(database, parts[-1], tokens[start].start, tokens[i].end))
+            i += 1
+            if i < len(tokens) and tokens[i].upper == "AS":
+                i += 1
+            if (
+                i < len(tokens)
+                and tokens[i].kind in ("word", "quoted")
+                and tokens[i].upper not in _NON_ALIAS_KEYWORDS
+            ):
+                i += 1
+            if i < len(tokens) and tokens[i].text == ",":
+                i += 1
+                continue
+            break
+    return refs
+
+
+def _top_level(tokens: list[Token]) -> list[tuple[int, Token]]:
+    """Index/token pairs for tokens outside any parentheses."""
+    depth = 0
+    result = []
+    for i, token in enumerate(tokens):
+        if token.kind == "lparen":
+            depth += 1
+        elif token.kind == "rparen":
+            depth = max(depth - 1, 0)
+        elif depth == 0:
+            result.append((i, token))
+    return result
+
+
+def _is_limit_clause(tokens: list[Token], top: list[tuple[int, Token]], at: int) -> bool:
+    """Whether the top-level word ``LIMIT`` at ``top[at]`` starts the LIMIT clause.
+
+    Tells the clause apart from an unquoted column named ``limit``, as in
+    ``SELECT limit - 1 FROM t`` or ``ORDER BY limit``: the clause follows the end
+    of an expression, comes after every other clause, and is followed by
+    something that can begin its value.
+    """
+    i = top[at][0]
+    previous = tokens[i - 1] if i else None
+    if (
+        previous is None
+        or previous.kind in ("punct", "lparen")
+        or (previous.kind == "word" and previous.upper in _OPERAND_KEYWORDS)
+    ):
+        return False
+    if any(t.kind == "word" and t.upper in _PRE_LIMIT_CLAUSES for _, t in top[at + 1:]):
+        return False
+    following = tokens[i + 1:i + 3]
+    if not following:
+        return False
+    value = following[0]
+    after = following[1] if len(following) > 1 else None
+    if value.kind in ("number", "lparen"):
+        return True
+    if value.text in ("+", "-"):
+        return after is not None and after.kind == "number"
+    if value.kind == "word":
+        # ALL, or a function call such as CAST(...).
+        return value.upper == "ALL" or (after is not None and after.kind == "lparen")
+    return False
+
+
+def apply_limit(sql: str, limit: int) -> str:
+    """Cap the row count of the top-level query at ``limit``.
+
+    An existing top-level ``LIMIT n`` is tightened to ``min(n, limit)`` and a
+    missing one is added. LIMITs inside subqueries, CTEs, string literals and
+    comments are left alone. Statements that do not return query rows (SHOW,
+    DESCRIBE, EXPLAIN) are returned without a LIMIT.
+    """
+    if limit < 1:
+        raise ValueError("limit must be a positive integer")
+    tokens = significant_tokens(sql)
+    if not tokens:
+        return sql
+    body = sql[: tokens[-1].end]
+    if tokens[0].upper not in _ROW_QUERY_KEYWORDS:
+        return body
+
+    top = _top_level(tokens)
+    limit_at = next(
+        (
+            top[at][0] for at in reversed(range(len(top)))
+            if top[at][1].kind == "word" and top[at][1].upper == "LIMIT"
+            and _is_limit_clause(tokens, top, at)
+        ),
+        None,
+    )
+    if limit_at is not None:
+        value = tokens[limit_at + 1] if limit_at + 1 < len(tokens) else None
+        if value is not None and value.kind == "number" and value.text.isdigit():
+            new_value = min(int(value.text), limit)
+        elif value is not None and value.kind == "word" and value.upper == "ALL":
+            new_value = limit
+        else:
+            # A computed LIMIT expression; the client-side fetch limit still applies.
+            return body
+        return f"{body[:value.start]}{new_value}{body[value.end:]}"
+
+    offset_at = next((t for _, t in top if t.kind == "word" and t.upper == "OFFSET"), None)
+    if offset_at is not None:
+        # Spark requires LIMIT to come before OFFSET.
+        return f"{body[:offset_at.start]}LIMIT {limit} {body[offset_at.start:]}"
+    return f"{body} LIMIT {limit}"
+
+
+_SAMPLE_RE = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*(%|percent|rows?)\s*$", re.IGNORECASE)
+
+
+def parse_sample(spec: str) -> str:
+    """Turn ``"5%"``, ``"0.5 percent"`` or ``"1000 rows"`` into a TABLESAMPLE argument."""
+    match = _SAMPLE_RE.match(spec)
+    if match is None:
+        raise ValueError(
+            f"Invalid sample: {spec!r}. Use a percentage such as '1%' or a row count "
+            "such as '1000 rows'."
+        )
+    value, unit = match.groups()
+    if unit.lower().startswith("row"):
+        if "." in value or int(value) < 1:
+            raise ValueError("A row sample must be a positive whole number of rows")
+        return f"{int(value)} ROWS"
+    percent = float(value)
+    if not 0 < percent <= 100:
+        raise ValueError("A percentage sample must be greater than 0 and at most 100")
+    return f"{percent:g} PERCENT"
+
+
+def apply_sample(sql: str, sample: str) -> str:
+    """Add ``TABLESAMPLE (<sample>)`` to every table the query reads.
+
+    ``sample`` is the TABLESAMPLE argument, e.g. ``"5 PERCENT"`` or ``"1000 ROWS"``.
+    Tables that already have a TABLESAMPLE clause are left alone, as are
+    subqueries and CTE names (the tables inside them are sampled instead).
+    """
+    if not is_query(sql):
+        raise ValueError("Sampling only applies to SELECT and WITH queries")
+    tokens = tokenize(sql)
+    result = []
+    last = 0
+    for ref in table_references(sql):
+        following = next(
+            (t for t in tokens if t.start >= ref.end and t.kind not in ("ws", "comment")), None
+        )
+        if following is not None and following.upper == "TABLESAMPLE":
+            continue
+        result.append(sql[last:ref.end])
+        result.append(f" TABLESAMPLE ({sample})")
+        last = ref.end
+    result.append(sql[last:])
+    return "".join(result)
+
+
+def _matching_paren(tokens: list[Token], open_index: int) -> int:
+    depth = 0
+    for i in range(open_index, len(tokens)):
+        if tokens[i].kind == "lparen":
+            depth += 1
+        elif tokens[i].kind == "rparen":
+            depth -= 1
+            if depth == 0:
+                return i
+    return len(tokens) - 1
+
+
+def approximate_aggregates(sql: str) -> tuple[str, list[str]]:
+    """Replace exact aggregates with Spark's approximate ones.
+
+    ``COUNT(DISTINCT x)`` becomes ``approx_count_distinct(x)``, ``percentile``
+    becomes ``percentile_approx`` and ``median(x)`` becomes
+    ``percentile_approx(x, 0.5)``. Returns the new SQL and the names of the
+    aggregates that were replaced.
+    """
+    tokens = [t for t in tokenize(sql) if t.kind not in ("ws", "comment")]
+    edits: list[tuple[int, int, str]] = []
+    replaced: list[str] = []
+    for i, token in enumerate(tokens[:-1]):
+        if token.kind != "word" or tokens[i + 1].kind != "lparen":
+            continue
+        name = token.upper
+        close = _matching_paren(tokens, i + 1)
+        if name == "COUNT" and i + 2 < close and tokens[i + 2].upper == "DISTINCT":
+            inner = tokens[i + 3:close]
+            if not inner or any(t.text == "," for _, t in _top_level(inner)):
+                continue  # approx_count_distinct takes a single expression.
+            edits.append((token.start, inner[0].start, "approx_count_distinct("))
+            replaced.append("COUNT(DISTINCT)")
+        elif name == "PERCENTILE":
+            edits.append((token.start, token.end, "percentile_approx"))
+            replaced.append("percentile")
+        elif name == "MEDIAN":
+            edits.append((token.start, token.end, "percentile_approx"))
+            edits.append((tokens[close].start, tokens[close].start, ", 0.5"))
+            replaced.append("median")
+    for start, end, text in sorted(edits, reverse=True):
+        sql = sql[:start] + text + sql[end:]
+    return sql, replaced
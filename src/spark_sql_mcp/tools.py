@@ -1,14 +1,42 @@
 """MCP tool definitions for Spark SQL operations."""
 
+import asyncio
+import logging
 import re
-from collections.abc import Callable
+from collections.abc import Awaitable, Callable, Hashable, Iterable
+from contextlib import nullcontext
+from dataclasses import asdict
 from typing import Any
 
-from mcp.server.fastmcp import FastMCP
+from mcp.server.fastmcp import Context, FastMCP
 
+from .admission import AdmissionController, ServerBusyError
+from .budget import BudgetTracker, tokens_to_bytes
+from .executor import BlockingExecutor
+from .formats import format_result, validate_format
+from .guard import check_cost
+from .jobs import CANCELLED, FINISHED, Job, JobRegistry
+from .pool import PoolTimeoutError, reserved_checkouts
+from .results import QueryResult
+from .router import ClusterRouter
+from .schema import format_schemas
 from .spark_client import SparkSQLClient
+from .sql import (
+    apply_limit,
+    apply_sample,
+    approximate_aggregates,
+    is_query,
+    parse_sample,
+    table_references,
+)
+
+logger = logging.getLogger(__name__)
+
+_MAX_BATCH_STATEMENTS = 50
+
+# Errors after which a request routed by rule may be retried on another cluster.
+_FAILOVER_ERRORS = (ConnectionError, PoolTimeoutError)
 
-_LIMIT_RE = re.compile(r"\bLIMIT\b", re.IGNORECASE)
 _READONLY_RE = re.compile(
     r"^\s*(SELECT|SHOW|DESCRIBE|DESC|EXPLAIN|WITH)\b", re.IGNORECASE
 )
@@ -22,17 +50,13 @@ def _validate_readonly(sql: str) -> None:
         )
 
 
-def format_as_table(rows: list[dict[str, Any]]) -> str:
-    if not rows:
+def format_as_table(
+    rows: QueryResult | list[dict[str, Any]], fmt: str = "markdown", *, max_cell_chars: int = 0
+) -> str:
+    result = rows if isinstance(rows, QueryResult) else QueryResult.from_dicts(rows)
+    if not result:
         return "No results."
-    columns = list(rows[0].keys())
-    lines = [
-        "| " + " | ".join(columns) + " |",
-        "| " + " | ".join("---" for _ in columns) + " |",
-    ]
-    for row in rows:
-        lines.append("| " + " | ".join(str(row.get(c, "")) for c in columns) + " |")
-    return "\n".join(lines)
+    return format_result(result, fmt, max_cell_chars=max_cell_chars)
 
 
 def _safe_tool_call(fn: Callable[[], str]) -> str:
@@ -45,39 +69,616 @@ def _safe_tool_call(fn: Callable[[], str]) -> str:
         return "Error: query execution failed. Check the server logs for details."
 
 
-def register_tools(mcp: FastMCP, get_client: Callable[[], SparkSQLClient]) -> None:
+async def _safe_async_tool_call(fn: Callable[[], Awaitable[str]]) -> str:
+    """Async counterpart of ``_safe_tool_call``."""
+    try:
+        return await fn()
+    except (ValueError, ServerBusyError) as exc:
+        return f"Error: {exc}"
+    except PoolTimeoutError:
+        # Admitted, but every connection is held, e.g. by background jobs.
+        return "Error: Server busy: no Spark connection became free in time. Try again shortly."
+    except Exception:
+        return "Error: query execution failed. Check the server logs for details."
+
+
+async def _run_tool(
+    get_router: Callable[[], ClusterRouter],
+    name: str,
+    fn: Callable[[SparkSQLClient], str],
+    *,
+    admission: AdmissionController,
+    session: Hashable = None,
+    cluster: str | None = None,
+    databases: Iterable[str | None] = (),
+    metadata: bool = False,
+) -> str:
+    """Run a blocking tool body on the routed cluster's executor so the event loop stays free.
+
+    The call first waits for a slot from ``admission``. If the cluster cannot be
+    reached and failover is enabled, the next candidate cluster is tried.
+    Metadata calls run on the cluster's metadata executor and may use the
+    connections its pool reserves for them.
+    """
+    def _instrumented(client: SparkSQLClient) -> str:
+        lane = reserved_checkouts() if metadata else nullcontext()
+        with client.instrumentation.span(f"tool.{name}"), lane:
+            return fn(client)
+
+    def _executor(client: SparkSQLClient) -> BlockingExecutor:
+        return client.metadata_executor if metadata else client.executor
+
+    async def _call() -> str:
+        clients = get_router().candidates(cluster, databases, metadata=metadata)
+        async with admission.admit(session, metadata=metadata):
+            for client in clients[:-1]:
+                try:
+                    return await _executor(client).run(_instrumented, client)
+                except _FAILOVER_ERRORS as exc:
+                    logger.warning(
+                        "Cluster %s unavailable for %s (%s); failing over",
+                        client.config.host, name, type(exc).__name__,
+                    )
+            return await _executor(clients[-1]).run(_instrumented, clients[-1])
+    return await _safe_async_tool_call(_call)
+
+
+def _session_key(ctx: Context) -> Hashable:
+    """Identify the MCP session a call belongs to, for per-session limits."""
+    try:
+        return ctx.session
+    except ValueError:
+        # Called outside a request, e.g. directly in tests.
+        return None
+
+
+def _format(
+    client: SparkSQLClient, rows: QueryResult | list[dict[str, Any]], fmt: str | None = None
+) -> str:
+    """Render with ``fmt``, or the cluster's configured output format."""
+    config = client.config
+    fmt = fmt or config.output_format
+    with client.instrumentation.span("format", rows=len(rows), format=fmt):
+        return format_as_table(rows, fmt, max_cell_chars=config.max_cell_chars)
+
+
+def _response_bytes(client: SparkSQLClient, max_tokens: int | None) -> int:
+    """The byte budget for one response: ``max_tokens`` if given, else the server's."""
+    if max_tokens is None:
+        return client.config.max_response_bytes
+    if max_tokens < 1:
+        raise ValueError("max_tokens must be a positive integer")
+    return tokens_to_bytes(max_tokens)
+
+
+def _fit_budget(
+    client: SparkSQLClient, result: QueryResult, max_bytes: int, fmt: str
+) -> QueryResult:
+    """``result`` cut to ``max_bytes`` in ``fmt``, the way ``query`` cuts rows it fetches."""
+    if not max_bytes:
+        return result
+    tracker = BudgetTracker(result.columns, max_bytes, client.config.max_cell_chars, fmt)
+    rows = []
+    for row in result:
+        capped = tracker.admit(row)
+        if capped is None:
+            break
+        rows.append(capped)
+    return QueryResult(result.columns, tuple(rows), tracker.truncation())
+
+
+def _execute_query(
+    client: SparkSQLClient,
+    sql: str,
+    limit: int,
+    *,
+    bypass_cache: bool = False,
+    sample: str | None = None,
+    approximate: bool = False,
+    fmt: str | None = None,
+    max_bytes: int = 0,
+) -> str:
+    """Validate, rewrite, cost-check and run one statement; the body of ``execute_query``."""
+    _validate_readonly(sql)
+    query = sql
+    notes = []
+    if sample is not None:
+        clause = parse_sample(sample)
+        query = apply_sample(query, clause)
+        notes.append(f"each table sampled with TABLESAMPLE ({clause})")
+    if approximate:
+        query, replaced = approximate_aggregates(query)
+        if replaced:
+            notes.append(f"approximate {', '.join(dict.fromkeys(replaced))}")
+    query = apply_limit(query, limit)
+    warning = None
+    if client.config.cost_guard != "off" and is_query(query):
+        with client.instrumentation.span("cost_check"):
+            warning = check_cost(client, query)
+    fmt = fmt or client.config.output_format
+    results = client.query(
+        query, limit=limit, cached=not bypass_cache, max_bytes=max_bytes, fmt=fmt
+    )
+    output = _format(client, results, fmt) if results else "Query returned no results."
+    if results.truncation is not None:
+        output = f"{results.truncation.note(len(results))}\n\n{output}"
+    if notes:
+        output = f"Approximate results ({'; '.join(notes)}).\n\n{output}"
+    return f"{warning}\n\n{output}" if warning else output
+
+
+def _stats_sections(
+    router: ClusterRouter, admission: AdmissionController
+) -> list[tuple[str, dict[str, Any]]]:
+    clients = router.clients
+    sections: list[tuple[str, dict[str, Any]]] = [("admission", asdict(admission.stats()))]
+    if len(clients) == 1:
+        return sections + list(next(iter(clients.values())).stats().items())
+    sections += [
+        (f"cluster {h.name}", {k: v for k, v in asdict(h).items() if k != "name"})
+        for h in router.health()
+    ]
+    for cluster, client in clients.items():
+        sections.extend((f"{cluster}: {name}", stats) for name, stats in client.stats().items())
+    return sections
+
+
+def _cluster_name(router: ClusterRouter, client: SparkSQLClient) -> str:
+    return next(name for name, c in router.clients.items() if c is client)
+
+
+def _job_rows(registry: JobRegistry) -> list[dict[str, Any]]:
+    return [
+        {
+            "job": job.id,
+            "state": job.state,
+            "cluster": job.cluster,
+            "rows_fetched": job.rows_fetched,
+            "elapsed_s": round(job.elapsed(), 1),
+            "sql": job.sql if len(job.sql) <= 80 else job.sql[:77] + "...",
+        }
+        for job in registry.jobs()
+    ]
+
+
+def register_tools(
+    mcp: FastMCP,
+    get_router: Callable[[], ClusterRouter],
+    get_admission: Callable[[], AdmissionController] | None = None,
+    get_jobs: Callable[[], JobRegistry] | None = None,
+) -> None:
+    """Register the Spark SQL tools on ``mcp``.
+
+    Without ``get_admission`` tool calls are not limited beyond the connection pools.
+    Without ``get_jobs`` background queries use a registry with default limits.
+    """
+    if get_admission is None:
+        unlimited = AdmissionController()
+
+        def get_admission() -> AdmissionController:
+            return unlimited
+
+    if get_jobs is None:
+        registry = JobRegistry()
+
+        def get_jobs() -> JobRegistry:
+            return registry
+
     @mcp.tool()
-    def list_databases() -> str:
+    async def list_databases(ctx: Context, cluster: str | None = None) -> str:
         """List all available databases in the Spark cluster."""
-        return _safe_tool_call(lambda: "\n".join(get_client().list_databases()))
+        return await _run_tool(
+            get_router, "list_databases", lambda c: "\n".join(c.list_databases()),
+            admission=get_admission(), session=_session_key(ctx), cluster=cluster, metadata=True,
+        )
 
     @mcp.tool()
-    def list_tables(database: str | None = None) -> str:
+    async def list_tables(
+        ctx: Context, database: str | None = None, cluster: str | None = None
+    ) -> str:
         """List all tables in a database. Uses the default database if not specified."""
-        def _run() -> str:
-            tables = get_client().list_tables(database)
+        def _run(client: SparkSQLClient) -> str:
+            tables = client.list_tables(database)
             return "\n".join(tables) if tables else "No tables found."
-        return _safe_tool_call(_run)
+        return await _run_tool(
+            get_router, "list_tables", _run,
+            admission=get_admission(), session=_session_key(ctx),
+            cluster=cluster, databases=[database], metadata=True,
+        )
 
     @mcp.tool()
-    def describe_table(table: str, database: str | None = None) -> str:
-        """Get the schema/structure of a table including column names and types."""
-        return _safe_tool_call(
-            lambda: format_as_table(get_client().describe_table(table, database))
+    async def describe_table(
+        ctx: Context,
+        table: str,
+        database: str | None = None,
+        cluster: str | None = None,
+        format: str | None = None,
+    ) -> str:
+        """Get the schema/structure of a table including column names and types.
+
+        ``format`` is one of markdown, csv, tsv, jsonl or json.
+        """
+        def _run(client: SparkSQLClient) -> str:
+            fmt = validate_format(format) if format is not None else None
+            return _format(client, client.describe_table(table, database), fmt)
+        return await _run_tool(
+            get_router, "describe_table", _run,
+            admission=get_admission(), session=_session_key(ctx),
+            cluster=cluster, databases=[database], metadata=True,
         )
 
     @mcp.tool()
-    def execute_query(sql: str, limit: int = 100) -> str:
+    async def describe_database(
+        ctx: Context,
+        database: str | None = None,
+        pattern: str = "*",
+        cluster: str | None = None,
+    ) -> str:
+        """Get the schemas of all tables in a database in one call.
+
+        ``pattern`` is a glob on table names, e.g. ``"orders_*"``. Tables with
+        identical schemas are listed together, so the output stays compact.
+        """
+        def _run(client: SparkSQLClient) -> str:
+            schemas = client.describe_tables(database, pattern)
+            return format_schemas(database or client.config.database, schemas)
+        return await _run_tool(
+            get_router, "describe_database", _run,
+            admission=get_admission(), session=_session_key(ctx),
+            cluster=cluster, databases=[database], metadata=True,
+        )
+
+    @mcp.tool()
+    async def search_schema(
+        ctx: Context,
+        query: str,
+        database: str | None = None,
+        limit: int = 20,
+        cluster: str | None = None,
+    ) -> str:
+        """Find tables and columns by name, type or comment, e.g. ``"customer email"``.
+
+        Terms match whole words, prefixes (``cust``) and near misses. Only schemas
+        the server has already loaded are searched; ``describe_database`` indexes
+        a whole database.
+        """
+        def _run(client: SparkSQLClient) -> str:
+            if limit < 1:
+                raise ValueError("limit must be a positive integer")
+            index = client.schema_index
+            matches = index.search(query, database=database, limit=limit)
+            if not matches:
+                return (
+                    f"No matches (indexed tables: {len(index)}). "
+                    "Use describe_database to index more."
+                )
+            return format_as_table([asdict(m) for m in matches])
+        # Off the event loop: a search waits for the index lock while schemas are added.
+        return await _run_tool(
+            get_router, "search_schema", _run,
+            admission=get_admission(), session=_session_key(ctx),
+            cluster=cluster, databases=[database], metadata=True,
+        )
+
+    @mcp.tool()
+    async def execute_query(
+        ctx: Context,
+        sql: str,
+        limit: int = 100,
+        bypass_cache: bool = False,
+        cluster: str | None = None,
+        sample: str | None = None,
+        approximate: bool = False,
+        format: str | None = None,
+        max_tokens: int | None = None,
+    ) -> str:
         """Execute a read-only Spark SQL query and return results as a formatted table.
 
         Only SELECT, SHOW, DESCRIBE, EXPLAIN, and WITH statements are allowed.
-        A LIMIT clause is automatically appended if not present in the query.
+        The outer query's LIMIT is capped at ``limit``; one is added if not present.
+        Set ``bypass_cache`` to re-run the query even if a cached result exists.
+        Without ``cluster``, the query is routed by the databases it reads from.
+        If the cluster has a cost guard, queries estimated to scan too much are
+        rejected or returned with a warning.
+
+        For quick exploration, ``sample`` reads only part of every table, e.g.
+        ``"1%"`` or ``"10000 rows"``, and ``approximate`` replaces COUNT(DISTINCT),
+        percentile and median with Spark's approximate aggregates. Such results
+        are labelled as approximate.
+
+        ``format`` picks the encoding: markdown (default), csv, tsv, jsonl (one
+        object per row) or json (column names once, then rows as arrays). CSV
+        and json are the most compact for wide or numeric results.
+
+        The response is kept to about ``max_tokens`` tokens (or the server's
+        byte budget): long values are cut and fewer rows returned, with a note
+        saying so.
         """
-        def _run() -> str:
+        def _run(client: SparkSQLClient) -> str:
+            fmt = validate_format(format) if format is not None else None
+            max_bytes = _response_bytes(client, max_tokens)
+            return _execute_query(
+                client, sql, limit,
+                bypass_cache=bypass_cache, sample=sample, approximate=approximate,
+                fmt=fmt, max_bytes=max_bytes,
+            )
+        return await _run_tool(
+            get_router, "execute_query", _run,
+            admission=get_admission(), session=_session_key(ctx),
+            cluster=cluster, databases=[ref.database for ref in table_references(sql)],
+        )
+
+    @mcp.tool()
+    async def execute_batch(
+        ctx: Context,
+        statements: list[str],
+        limit: int = 100,
+        cluster: str | None = None,
+        format: str | None = None,
+        max_tokens: int | None = None,
+    ) -> str:
+        """Run several independent read-only queries at once and return all their results.
+
+        Use this instead of consecutive ``execute_query`` calls for unrelated
+        lookups, e.g. row counts of several tables: the statements run in
+        parallel, so the batch takes about as long as its slowest statement.
+        Each statement is validated, limited, routed and cost-checked like
+        ``execute_query``, and a failing statement does not affect the others.
+        The response budget (``max_tokens``) is shared evenly between them.
+        """
+        async def _batch() -> str:
+            if not statements:
+                raise ValueError("statements must not be empty")
+            if len(statements) > _MAX_BATCH_STATEMENTS:
+                raise ValueError(f"At most {_MAX_BATCH_STATEMENTS} statements per batch")
+            fmt = validate_format(format) if format is not None else None
+            router = get_router()
+            budget = _response_bytes(router.client(cluster), max_tokens)
+            # A budget of 0 means unlimited, so it must not become a 1-byte share.
+            max_bytes = max(1, budget // len(statements)) if budget else 0
+            admission = get_admission()
+            session = _session_key(ctx)
+            # Statements may be routed to different clusters; each has its own cap.
+            limits: dict[str, asyncio.Semaphore] = {}
+
+            def _parallel(name: str) -> asyncio.Semaphore:
+                if name not in limits:
+                    target = router.clients[name].config
+                    limits[name] = asyncio.Semaphore(
+                        min(target.batch_parallelism, target.pool_query_size)
+                    )
+                return limits[name]
+
+            async def _one(sql: str) -> str:
+                databases = [ref.database for ref in table_references(sql)]
+                async with _parallel(router.route(cluster, databases)):
+                    return await _run_tool(
+                        get_router, "execute_batch",
+                        lambda client: _execute_query(
+                            client, sql, limit, fmt=fmt, max_bytes=max_bytes
+                        ),
+                        admission=admission, session=session, cluster=cluster,
+                        databases=databases,
+                    )
+
+            outputs = await asyncio.gather(*(_one(sql) for sql in statements))
+            failed = sum(output.startswith("Error:") for output in outputs)
+            sections = [
+                f"Ran {len(statements)} statements: "
+                f"{len(statements) - failed} succeeded, {failed} failed."
+            ]
+            sections.extend(
+                f"## Statement {i}\n\n```sql\n{sql.strip()}\n```\n\n{output}"
+                for i, (sql, output) in enumerate(zip(statements, outputs), 1)
+            )
+            return "\n\n".join(sections)
+        return await _safe_async_tool_call(_batch)
+
+    @mcp.tool()
+    async def submit_query(
+        ctx: Context, sql: str, limit: int = 10000, cluster: str | None = None
+    ) -> str:
+        """Start a long-running read-only query in the background and return a job id.
+
+        Use ``query_status`` to follow it, ``fetch_results`` to read its rows
+        once it has finished, and ``cancel_query`` to stop it. At most ``limit``
+        rows are kept. Results are held in memory for a limited time.
+        """
+        def _run(client: SparkSQLClient) -> str:
             _validate_readonly(sql)
-            query = sql if _LIMIT_RE.search(sql) else f"{sql} LIMIT {limit}"
-            results = get_client().execute_query(query)
+            if limit < 1:
+                raise ValueError("limit must be a positive integer")
+            query = apply_limit(sql, limit)
+            warning = None
+            if client.config.cost_guard != "off" and is_query(query):
+                with client.instrumentation.span("cost_check"):
+                    warning = check_cost(client, query)
+            job = get_jobs().submit(
+                client, query,
+                cluster=_cluster_name(get_router(), client), limit=limit, warning=warning,
+            )
+            output = (
+                f"Submitted {job.id} on cluster {job.cluster}. Check progress with "
+                "query_status and read the rows with fetch_results."
+            )
+            return f"{warning}\n\n{output}" if warning else output
+        return await _run_tool(
+            get_router, "submit_query", _run,
+            admission=get_admission(), session=_session_key(ctx),
+            cluster=cluster, databases=[ref.database for ref in table_references(sql)],
+        )
+
+    @mcp.tool()
+    def query_status(job_id: str | None = None) -> str:
+        """Show the state, elapsed time and rows fetched of a background query.
+
+        Without ``job_id``, lists all known jobs, newest first.
+        """
+        def _run() -> str:
+            registry = get_jobs()
+            if job_id is None:
+                return format_as_table(_job_rows(registry)) if registry.jobs() else "No jobs."
+            job = registry.get(job_id)
+            status = {
+                "job": job.id,
+                "state": job.state,
+                "cluster": job.cluster,
+                "elapsed_s": round(job.elapsed(), 1),
+                "rows_fetched": job.rows_fetched,
+            }
+            if job.state == FINISHED:
+                status["results"] = "available" if registry.has_results(job.id) else "expired"
+            if job.error:
+                status["error"] = job.error
+            if job.warning:
+                status["warning"] = job.warning
+            return format_as_table([{"field": k, "value": v} for k, v in status.items()])
+        return _safe_tool_call(_run)
+
+    @mcp.tool()
+    async def fetch_results(
+        job_id: str,
+        offset: int = 0,
+        limit: int = 100,
+        format: str | None = None,
+        max_tokens: int | None = None,
+    ) -> str:
+        """Read rows ``offset`` to ``offset + limit`` of a finished background query.
+
+        The page is kept to about ``max_tokens`` tokens (or the server's byte
+        budget) like ``execute_query``; if rows are cut, the note gives the
+        offset to continue from.
+        """
+        def _page(job: Job) -> str:
+            client = job.client
+            fmt = validate_format(format) if format is not None else client.config.output_format
+            max_bytes = _response_bytes(client, max_tokens)
+            result = get_jobs().results(job.id)
+            if not result:
+                return f"{job.id} returned no rows."
+            page = result.page(offset, limit)
+            if not page:
+                return f"{job.id} has {len(result)} rows; offset {offset} is past the end."
+            page = _fit_budget(client, page, max_bytes, fmt)
+            header = f"Rows {offset + 1}-{offset + len(page)} of {len(result)} from {job.id}."
+            output = _format(client, page, fmt)
+            if page.truncation is not None:
+                note = page.truncation.note(len(page))
+                if page.truncation.rows_cut:
+                    note += f" Continue from offset {offset + len(page)}."
+                output = f"{note}\n\n{output}"
+            return f"{header}\n\n{output}"
+
+        async def _call() -> str:
+            if offset < 0 or limit < 1:
+                raise ValueError("offset must not be negative and limit must be positive")
+            job = get_jobs().get(job_id)
+            # Converting an Arrow page and formatting it is CPU work; keep it off the loop.
+            return await job.client.executor.run(_page, job)
+        return await _safe_async_tool_call(_call)
+
+    @mcp.tool()
+    def cancel_query(job_id: str) -> str:
+        """Stop a queued or running background query."""
+        def _run() -> str:
+            job = get_jobs().cancel(job_id)
+            if job.active or job.state == CANCELLED:
+                return f"Cancelling {job.id}."
+            return f"{job.id} already {job.state}; nothing to cancel."
+        return _safe_tool_call(_run)
+
+    @mcp.tool()
+    async def profile_table(
+        ctx: Context,
+        table: str,
+        database: str | None = None,
+        columns: list[str] | None = None,
+        sample: str | None = None,
+        cluster: str | None = None,
+    ) -> str:
+        """Profile a table's columns in a single Spark job.
+
+        For every column (or only ``columns``) reports null count and percentage,
+        approximate distinct count, min/max, and approximate quartiles for numeric
+        columns. Set ``sample`` (e.g. ``"1%"``) to profile a sample of a large table.
+        """
+        def _run(client: SparkSQLClient) -> str:
+            clause = parse_sample(sample) if sample is not None else None
+            profile = client.profile_table(table, database, columns=columns, sample=clause)
+            header = f"{profile.row_count} rows"
+            if clause:
+                header += f" in sample (TABLESAMPLE ({clause}))"
+            return f"{header}.\n\n{_format(client, profile.columns)}"
+        return await _run_tool(
+            get_router, "profile_table", _run,
+            admission=get_admission(), session=_session_key(ctx),
+            cluster=cluster, databases=[database],
+        )
+
+    @mcp.tool()
+    async def sample_table(
+        ctx: Context,
+        table: str,
+        database: str | None = None,
+        sample: str = "1%",
+        limit: int = 20,
+        cluster: str | None = None,
+        format: str | None = None,
+        max_tokens: int | None = None,
+    ) -> str:
+        """Show a random sample of a table's rows without scanning all of it.
+
+        ``sample`` is a percentage such as ``"1%"`` or a row count such as
+        ``"1000 rows"``; at most ``limit`` rows are returned. ``format`` and
+        ``max_tokens`` work as in ``execute_query``.
+        """
+        def _run(client: SparkSQLClient) -> str:
+            clause = parse_sample(sample)
+            fmt = validate_format(format) if format is not None else client.config.output_format
+            results = client.sample_table(
+                table, database, sample=clause, limit=limit,
+                max_bytes=_response_bytes(client, max_tokens), fmt=fmt,
+            )
             if not results:
-                return "Query returned no results."
-            return format_as_table(results[:limit])
+                return "Sample returned no rows."
+            output = _format(client, results, fmt)
+            if results.truncation is not None:
+                output = f"{results.truncation.note(len(results))}\n\n{output}"
+            return f"Sample (TABLESAMPLE ({clause})).\n\n{output}"
+        return await _run_tool(
+            get_router, "sample_table", _run,
+            admission=get_admission(), session=_session_key(ctx),
+            cluster=cluster, databases=[database],
+        )
+
+    @mcp.tool()
+    async def refresh_metadata(
+        database: str | None = None, table: str | None = None, cluster: str | None = None
+    ) -> str:
+        """Clear cached database, table and schema listings so they are reloaded.
+
+        Use after DDL changes. Clears everything if no database or table is given,
+        on every cluster unless ``cluster`` is set.
+        """
+        async def _call() -> str:
+            router = get_router()
+            clients = [router.client(cluster)] if cluster else router.clients.values()
+            # Clearing the snapshot is a SQLite scan; keep it off the event loop.
+            removed = await asyncio.gather(*(
+                c.metadata_executor.run(c.invalidate_metadata, database, table)
+                for c in clients
+            ))
+            return f"Cleared {sum(removed)} cached metadata entries."
+        return await _safe_async_tool_call(_call)
+
+    @mcp.tool()
+    def server_stats() -> str:
+        """Report admission queues, cluster health, pool usage, cache hit rates and timings."""
+        def _run() -> str:
+            sections = [
+                f"## {name}\n\n"
+                + format_as_table([{"metric": k, "value": v} for k, v in stats.items()])
+                for name, stats in _stats_sections(get_router(), get_admission())
+            ]
+            return "\n\n".join(sections)
         return _safe_tool_call(_run)
@@ -1,8 +1,10 @@
 from unittest.mock import MagicMock
 
 import pytest
+from TCLIService.ttypes import TOperationState
 
 from spark_sql_mcp.config import SparkConfig
+from spark_sql_mcp.pool import ConnectionPool
 from spark_sql_mcp.spark_client import SparkSQLClient
 
 
@@ -11,14 +13,32 @@ def spark_config():
     return SparkConfig(host="localhost", port=10000)
 
 
+def _serve_rows(cursor, rows):
+    """Make ``cursor.fetchmany`` page through ``rows`` like a HiveServer2 cursor."""
+    remaining = list(rows)
+
+    def fetchmany(size):
+        batch = remaining[:size]
+        del remaining[:size]
+        return batch
+
+    cursor.fetchmany.side_effect = fetchmany
+
+
 @pytest.fixture
 def mock_hive_cursor():
     cursor = MagicMock()
     cursor.description = [("id",), ("name",)]
-    cursor.fetchall.return_value = [(1, "alice"), (2, "bob")]
+    cursor.poll.return_value.operationState = TOperationState.FINISHED_STATE
+    _serve_rows(cursor, [(1, "alice"), (2, "bob")])
     return cursor
 
 
+@pytest.fixture
+def serve_rows(mock_hive_cursor):
+    return lambda rows: _serve_rows(mock_hive_cursor, rows)
+
+
 @pytest.fixture
 def mock_hive_connection(mock_hive_cursor):
     conn = MagicMock()
@@ -29,5 +49,6 @@ def mock_hive_connection(mock_hive_cursor):
 @pytest.fixture
 def connected_client(spark_config, mock_hive_connection):
     client = SparkSQLClient(spark_config)
-    client._connection = mock_hive_connection
+    client._pool = ConnectionPool(lambda: mock_hive_connection)
+    client._pool.fill()
     return client
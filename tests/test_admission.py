@@ -0,0 +1,140 @@
+import asyncio
+
+import pytest
+
+from spark_sql_mcp.admission import AdmissionController, ServerBusyError
+from spark_sql_mcp.config import AdmissionConfig
+
+
+async def _hold(controller, release, started, session=None, *, metadata=False):
+    async with controller.admit(session, metadata=metadata):
+        started.append(session)
+        await release.wait()
+
+
+class TestAdmissionController:
+    def test_unlimited_by_default(self):
+        async def main():
+            controller = AdmissionController()
+            release = asyncio.Event()
+            started = []
+            tasks = [asyncio.create_task(_hold(controller, release, started)) for _ in range(20)]
+            await asyncio.sleep(0)
+            assert len(started) == 20
+            release.set()
+            await asyncio.gather(*tasks)
+            assert controller.stats().admitted == 20
+        asyncio.run(main())
+
+    def test_global_cap_queues_in_order(self):
+        async def main():
+            controller = AdmissionController(2)
+            release = asyncio.Event()
+            started = []
+            tasks = [
+                asyncio.create_task(_hold(controller, release, started, session=i))
+                for i in range(4)
+            ]
+            await asyncio.sleep(0)
+            assert started == [0, 1]
+            stats = controller.stats()
+            assert (stats.running, stats.queued) == (2, 2)
+            release.set()
+            await asyncio.gather(*tasks)
+            assert started == [0, 1, 2, 3]
+            assert controller.stats().running == 0
+        asyncio.run(main())
+
+    def test_full_queue_rejects(self):
+        async def main():
+            controller = AdmissionController(1, max_queue=1)
+            release = asyncio.Event()
+            started = []
+            tasks = [asyncio.create_task(_hold(controller, release, started)) for _ in range(2)]
+            await asyncio.sleep(0)
+            with pytest.raises(ServerBusyError, match="Server busy"):
+                async with controller.admit():
+                    pass
+            assert controller.stats().rejected == 1
+            release.set()
+            await asyncio.gather(*tasks)
+        asyncio.run(main())
+
+    def test_queue_timeout(self):
+        async def main():
+            controller = AdmissionController(1, queue_timeout=0.01)
+            release = asyncio.Event()
+            task = asyncio.create_task(_hold(controller, release, []))
+            await asyncio.sleep(0)
+            with pytest.raises(ServerBusyError, match="within 0.01s"):
+                async with controller.admit():
+                    pass
+            stats = controller.stats()
+            assert (stats.timed_out, stats.queued) == (1, 0)
+            release.set()
+            await task
+        asyncio.run(main())
+
+    def test_per_session_cap_does_not_block_other_sessions(self):
+        async def main():
+            controller = AdmissionController(3, max_per_session=1)
+            release = asyncio.Event()
+            started = []
+            tasks = [
+                asyncio.create_task(_hold(controller, release, started, session=s))
+                for s in ("a", "a", "b")
+            ]
+            await asyncio.sleep(0)
+            # The second "a" waits for its session; "b" is admitted past it.
+            assert started == ["a", "b"]
+            release.set()
+            await asyncio.gather(*tasks)
+            assert started == ["a", "b", "a"]
+        asyncio.run(main())
+
+    def test_metadata_lane_is_separate(self):
+        async def main():
+            controller = AdmissionController(1, max_queue=0, max_metadata_concurrent=1)
+            release = asyncio.Event()
+            started = []
+            scan = asyncio.create_task(_hold(controller, release, started, "scan"))
+            await asyncio.sleep(0)
+            async with controller.admit(metadata=True):
+                assert controller.stats().metadata_running == 1
+            release.set()
+            await scan
+        asyncio.run(main())
+
+    def test_cancelled_waiter_leaves_queue(self):
+        async def main():
+            controller = AdmissionController(1)
+            release = asyncio.Event()
+            holder = asyncio.create_task(_hold(controller, release, []))
+            await asyncio.sleep(0)
+            waiter = asyncio.create_task(_hold(controller, release, []))
+            await asyncio.sleep(0)
+            assert controller.stats().queued == 1
+            waiter.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await waiter
+            assert controller.stats().queued == 0
+            release.set()
+            await holder
+            assert controller.stats().running == 0
+        asyncio.run(main())
+
+    def test_slot_released_on_error(self):
+        async def main():
+            controller = AdmissionController(1)
+            with pytest.raises(RuntimeError):
+                async with controller.admit():
+                    raise RuntimeError("boom")
+            assert controller.stats().running == 0
+        asyncio.run(main())
+
+    def test_from_config(self):
+        controller = AdmissionController.from_config(
+            AdmissionConfig(max_concurrent_queries=3, queue_size=0)
+        )
+        assert controller._queries.limit == 3
+        assert controller._max_queue == 0
@@ -0,0 +1,70 @@
+import pytest
+
+from spark_sql_mcp.budget import BudgetTracker, Truncation, cell_limit, tokens_to_bytes
+from spark_sql_mcp.formats import FORMATS, format_result
+from spark_sql_mcp.results import QueryResult
+
+
+class TestBudgetTracker:
+    def test_admits_rows_until_budget_used(self):
+        tracker = BudgetTracker(("id", "name"), max_bytes=100)
+        admitted = [tracker.admit((i, "x" * 10)) for i in range(10)]
+        assert admitted[0] == (0, "x" * 10)
+        assert None in admitted
+        assert tracker.exhausted
+        assert tracker.used <= 100
+        # Once exhausted, later (smaller) rows are not admitted either.
+        assert tracker.admit((1, "")) is None
+
+    def test_first_row_always_admitted(self):
+        tracker = BudgetTracker(("blob",), max_bytes=10, max_cell_chars=1000)
+        assert tracker.admit(("x" * 500,)) == ("x" * 500,)
+        assert tracker.admit(("y",)) is None
+
+    def test_caps_long_values(self):
+        tracker = BudgetTracker(("id", "payload", "raw"), max_bytes=1 << 20, max_cell_chars=10)
+        row = tracker.admit((123456789012345, "a" * 50, b"b" * 50))
+        assert row == (123456789012345, "aaaaaaa...", b"b" * 10)
+        assert tracker.cells_cut == 2
+        assert tracker.truncation() == Truncation(1 << 20, False, 2, 10)
+
+    @pytest.mark.parametrize("fmt", FORMATS)
+    def test_rendered_size_within_budget(self, fmt):
+        columns = tuple(f"column_{i}" for i in range(30))
+        tracker = BudgetTracker(columns, max_bytes=16 * 1024, fmt=fmt)
+        rows = []
+        for i in range(10_000):
+            row = tracker.admit(tuple(i if c % 2 else f"value {i}" for c in range(30)))
+            if row is None:
+                break
+            rows.append(row)
+        rendered = len(format_result(QueryResult(columns, tuple(rows)), fmt).encode())
+        assert tracker.exhausted
+        assert 0.9 * 16 * 1024 < rendered <= 16 * 1024
+
+    def test_no_truncation(self):
+        tracker = BudgetTracker(("id",), max_bytes=1000)
+        tracker.admit((1,))
+        assert tracker.truncation() is None
+
+
+class TestTruncation:
+    def test_note(self):
+        note = Truncation(262144, True, 3, 32768).note(12)
+        assert note == (
+            "Output truncated to fit the 262,144-byte response budget "
+            "(showing the first 12 rows; 3 values cut to 32768 characters)."
+        )
+
+    def test_note_rows_only(self):
+        assert Truncation(1000, True, 0, 125).note(5).endswith("(showing the first 5 rows).")
+
+
+def test_cell_limit():
+    assert cell_limit(1 << 20, 500) == 500
+    assert cell_limit(1 << 20) == 1 << 17
+    assert cell_limit(100) == 64
+
+
+def test_tokens_to_bytes():
+    assert tokens_to_bytes(1000) == 4000
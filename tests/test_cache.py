@@ -0,0 +1,177 @@
+import threading
+import time
+
+import pytest
+
+from spark_sql_mcp.cache import TTLCache
+from spark_sql_mcp.executor import CancelToken, QueryCancelledError, cancel_scope, current_token
+
+
+def _load_in_thread(cache, token, loader, outcomes):
+    def _run():
+        with cancel_scope(token):
+            try:
+                outcomes.append(cache.get_or_load("k", loader))
+            except QueryCancelledError as exc:
+                outcomes.append(exc)
+
+    thread = threading.Thread(target=_run)
+    thread.start()
+    return thread
+
+
+class TestTTLCache:
+    def test_hit_after_load(self):
+        cache = TTLCache(10, 60)
+        assert cache.get_or_load("k", lambda: 1) == 1
+        assert cache.get_or_load("k", lambda: 2) == 1
+        stats = cache.stats()
+        assert (stats.hits, stats.misses) == (1, 1)
+
+    def test_expiry(self):
+        cache = TTLCache(10, 0.01)
+        cache.get_or_load("k", lambda: 1)
+        time.sleep(0.02)
+        assert cache.get_or_load("k", lambda: 2) == 2
+
+    def test_get(self):
+        cache = TTLCache(10, 0.01)
+        assert cache.get("k") is None
+        cache.put("k", 1)
+        assert cache.get("k") == 1
+        time.sleep(0.02)
+        assert cache.get("k") is None
+        assert cache.stats().entries == 0
+
+    def test_disabled_with_zero_ttl(self):
+        cache = TTLCache(10, 0)
+        cache.get_or_load("k", lambda: 1)
+        assert cache.get_or_load("k", lambda: 2) == 2
+        assert cache.stats().entries == 0
+
+    def test_lru_eviction(self):
+        cache = TTLCache(2, 60)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get_or_load("a", lambda: 0)
+        cache.put("c", 3)
+        assert cache.get_or_load("b", lambda: "reloaded") == "reloaded"
+        assert cache.stats().evictions == 2
+
+    def test_loader_error_not_cached(self):
+        cache = TTLCache(10, 60)
+
+        def _fail():
+            raise RuntimeError("down")
+
+        with pytest.raises(RuntimeError):
+            cache.get_or_load("k", _fail)
+        assert cache.get_or_load("k", lambda: 1) == 1
+
+    def test_concurrent_misses_share_one_load(self):
+        cache = TTLCache(10, 60)
+        release = threading.Event()
+        calls = []
+
+        def _loader():
+            calls.append(1)
+            release.wait(2)
+            return "value"
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(cache.get_or_load("k", _loader)))
+            for _ in range(5)
+        ]
+        for t in threads:
+            t.start()
+        while cache.stats().coalesced < 4:
+            time.sleep(0.001)
+        release.set()
+        for t in threads:
+            t.join(2)
+        assert calls == [1]
+        assert results == ["value"] * 5
+
+    def test_cancelled_leader_leaves_load_running_for_others(self):
+        cache = TTLCache(10, 0)
+        started, release = threading.Event(), threading.Event()
+        tokens = []
+
+        def _loader():
+            tokens.append(current_token())
+            started.set()
+            release.wait(2)
+            return "value"
+
+        leader_token, waiter_token = CancelToken(), CancelToken()
+        leader_out, waiter_out = [], []
+        leader = _load_in_thread(cache, leader_token, _loader, leader_out)
+        started.wait(2)
+        waiter = _load_in_thread(cache, waiter_token, _loader, waiter_out)
+        while cache.stats().coalesced < 1:
+            time.sleep(0.001)
+        leader_token.cancel()
+        assert not tokens[0].cancelled
+        release.set()
+        leader.join(2)
+        waiter.join(2)
+        assert waiter_out == ["value"]
+
+    def test_load_cancelled_when_every_caller_is(self):
+        cache = TTLCache(10, 0)
+        started = threading.Event()
+
+        def _loader():
+            started.set()
+            token = current_token()
+            while not token.wait(0.01):
+                pass
+            token.raise_if_cancelled()
+
+        tokens = [CancelToken(), CancelToken()]
+        outcomes = []
+        first = _load_in_thread(cache, tokens[0], _loader, outcomes)
+        started.wait(2)
+        second = _load_in_thread(cache, tokens[1], _loader, outcomes)
+        while cache.stats().coalesced < 1:
+            time.sleep(0.001)
+        tokens[1].cancel()
+        tokens[0].cancel()
+        first.join(2)
+        second.join(2)
+        assert [type(o) for o in outcomes] == [QueryCancelledError] * 2
+        # The cancelled flight is not joined by later callers.
+        assert cache.get_or_load("k", lambda: "fresh") == "fresh"
+
+    def test_invalidate_predicate(self):
+        cache = TTLCache(10, 60)
+        cache.put(("tables", "a"), 1)
+        cache.put(("tables", "b"), 2)
+        assert cache.invalidate(lambda k: k[1] == "a") == 1
+        assert cache.stats().entries == 1
+
+    def test_invalidate_during_load_discards_result(self):
+        cache = TTLCache(10, 60)
+
+        def _loader():
+            cache.invalidate()
+            return "stale"
+
+        assert cache.get_or_load("k", _loader) == "stale"
+        assert cache.stats().entries == 0
+
+    def test_byte_budget_evicts_lru(self):
+        cache = TTLCache(100, 60, max_bytes=10, sizeof=len)
+        cache.put("a", "xxxx")
+        cache.put("b", "xxxx")
+        cache.put("c", "xxxx")
+        stats = cache.stats()
+        assert stats.entries == 2
+        assert stats.bytes == 8
+        assert cache.get_or_load("a", lambda: "new") == "new"
+
+    def test_oversized_value_not_cached(self):
+        cache = TTLCache(100, 60, max_bytes=3, sizeof=len)
+        cache.put("a", "xxxx")
+        assert cache.stats().entries == 0
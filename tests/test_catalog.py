@@ -0,0 +1,70 @@
+import sqlite3
+
+from spark_sql_mcp.catalog import CatalogSnapshot, snapshot_path, table_fingerprint
+
+
+class TestCatalogSnapshot:
+    def test_round_trip(self, tmp_path):
+        path = str(tmp_path / "snap.sqlite")
+        snapshot = CatalogSnapshot(path)
+        snapshot.store(("databases",), ("default", "sales"))
+        snapshot.store(("tables", "sales"), ("orders",))
+        snapshot.store(
+            ("columns", "sales", "orders"),
+            ({"col_name": "id", "data_type": "int", "comment": None},),
+            "v1",
+        )
+        snapshot.close()
+
+        entries = dict(CatalogSnapshot(path).load())
+        assert entries[("databases",)] == ("default", "sales")
+        assert entries[("tables", "sales")] == ("orders",)
+        assert entries[("columns", "sales", "orders")] == (
+            {"col_name": "id", "data_type": "int", "comment": None},
+        )
+
+    def test_only_listings_and_schemas_persisted(self, tmp_path):
+        snapshot = CatalogSnapshot(str(tmp_path / "snap.sqlite"))
+        snapshot.store(("profile", "sales", "orders", None, None), ("x",))
+        assert snapshot.load() == []
+
+    def test_versions(self, tmp_path):
+        snapshot = CatalogSnapshot(str(tmp_path / "snap.sqlite"))
+        snapshot.store(("columns", "sales", "orders"), (), "v1")
+        snapshot.store(("columns", "sales", "users"), ())
+        snapshot.store(("columns", "default", "t"), (), "v2")
+        assert snapshot.versions("sales") == {"orders": "v1", "users": None}
+
+    def test_store_without_version_keeps_fingerprint(self, tmp_path):
+        snapshot = CatalogSnapshot(str(tmp_path / "snap.sqlite"))
+        snapshot.store(("columns", "sales", "orders"), (), "v1")
+        snapshot.store(("columns", "sales", "orders"), ({"col_name": "id"},))
+        assert snapshot.versions("sales") == {"orders": "v1"}
+        assert snapshot.load() == [(("columns", "sales", "orders"), ({"col_name": "id"},))]
+        snapshot.store(("columns", "sales", "orders"), (), "v2")
+        assert snapshot.versions("sales") == {"orders": "v2"}
+
+    def test_delete(self, tmp_path):
+        snapshot = CatalogSnapshot(str(tmp_path / "snap.sqlite"))
+        snapshot.store(("tables", "sales"), ("orders",))
+        snapshot.store(("tables", "default"), ("t",))
+        assert snapshot.delete(lambda key: key[1] == "sales") == 1
+        assert [key for key, _ in snapshot.load()] == [("tables", "default")]
+        assert snapshot.delete() == 1
+
+    def test_creates_directory(self, tmp_path):
+        path = str(tmp_path / "nested" / "snap.sqlite")
+        CatalogSnapshot(path).store(("databases",), ("default",))
+        with sqlite3.connect(path) as conn:
+            assert conn.execute("SELECT count(*) FROM entries").fetchone() == (1,)
+
+
+def test_snapshot_path(tmp_path):
+    path = snapshot_path(str(tmp_path), "spark.example.com/x", 10000)
+    assert path == str(tmp_path / "spark.example.com_x_10000.sqlite")
+
+
+def test_fingerprint_ignores_volatile_lines():
+    info = "Table: t\nLast Access: {}\nStatistics: {} bytes\nSchema: root\n |-- id: long\n"
+    assert table_fingerprint(info.format("a", 1)) == table_fingerprint(info.format("b", 2))
+    assert table_fingerprint(info) != table_fingerprint(info.replace("long", "string"))
@@ -0,0 +1,116 @@
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+from pyhive import hive
+from TCLIService.ttypes import (
+    TColumn,
+    TFetchResultsResp,
+    TI64Column,
+    TOperationHandle,
+    TRowSet,
+    TStatus,
+    TStatusCode,
+    TStringColumn,
+)
+
+from spark_sql_mcp.columnar import ArrowResult, decode_values, fetch_record_batch, fetchmany
+
+DESCRIPTION = [
+    ("id", "BIGINT_TYPE", None, None, None, None, True),
+    ("price", "DECIMAL_TYPE", None, None, None, None, True),
+]
+
+
+def _ids(values, nulls=b""):
+    return TColumn(i64Val=TI64Column(values=list(values), nulls=nulls))
+
+
+def _strings(values, nulls=b""):
+    return TColumn(stringVal=TStringColumn(values=list(values), nulls=nulls))
+
+
+def _row_sets():
+    """Two pages of (id, price), then an empty one."""
+    return [
+        [_ids(range(10), b"\x04\x02"), _strings([f"{i}.50" for i in range(10)], b"\x01")],
+        [_ids([10]), _strings(["10.50"])],
+        [_ids([]), _strings([])],
+    ]
+
+
+def _cursor(pages):
+    """A PyHive cursor whose Thrift client serves ``pages`` of columns."""
+    responses = iter(pages)
+
+    def fetch_results(request):
+        return TFetchResultsResp(
+            status=TStatus(statusCode=TStatusCode.SUCCESS_STATUS),
+            results=TRowSet(startRowOffset=0, rows=[], columns=next(responses)),
+        )
+
+    cursor = hive.Cursor(SimpleNamespace(client=SimpleNamespace(FetchResults=fetch_results)))
+    cursor._state = cursor._STATE_RUNNING
+    cursor._operationHandle = TOperationHandle(
+        operationId=None, operationType=0, hasResultSet=True
+    )
+    cursor._description = DESCRIPTION
+    return cursor
+
+
+class TestDecodeValues:
+    def test_nulls(self):
+        assert decode_values(_ids(range(10), b"\x04\x02"), "BIGINT_TYPE") == [
+            0, 1, None, 3, 4, 5, 6, 7, 8, None
+        ]
+
+    def test_trailing_zero_bytes_dropped(self):
+        assert decode_values(_ids(range(10), b"\x01"), "BIGINT_TYPE")[:2] == [None, 1]
+
+    def test_decimals_parsed(self):
+        assert decode_values(_strings(["1.50", ""]), "DECIMAL_TYPE") == [Decimal("1.50"), ""]
+
+
+class TestFetchmany:
+    def test_matches_pyhive(self):
+        expected = []
+        cursor = _cursor(_row_sets())
+        while batch := cursor.fetchmany(100):
+            expected.extend(batch)
+        cursor = _cursor(_row_sets())
+        assert fetchmany(cursor, 100) + fetchmany(cursor, 100) == expected
+        assert fetchmany(cursor, 100) == []
+
+    def test_request_size(self):
+        requests = []
+        cursor = _cursor(_row_sets())
+        fetch_results = cursor._connection.client.FetchResults
+        cursor._connection.client.FetchResults = lambda r: requests.append(r) or fetch_results(r)
+        fetchmany(cursor, 25)
+        assert requests[0].maxRows == 25
+
+
+class TestArrow:
+    def test_record_batch(self):
+        pytest.importorskip("pyarrow")
+        batch = fetch_record_batch(_cursor(_row_sets()), 100)
+        assert batch.schema.names == ["id", "price"]
+        assert batch.column(0).null_count == 2
+        assert batch.column(0).to_pylist()[:3] == [0, 1, None]
+        assert batch.column(1).to_pylist()[:2] == [None, "1.50"]
+
+    def test_exhausted(self):
+        pytest.importorskip("pyarrow")
+        assert fetch_record_batch(_cursor(_row_sets()[2:]), 100) is None
+
+    def test_arrow_result_pages(self):
+        pytest.importorskip("pyarrow")
+        cursor = _cursor(_row_sets())
+        result = ArrowResult.from_batches(
+            [fetch_record_batch(cursor, 100), fetch_record_batch(cursor, 100)]
+        )
+        assert len(result) == 11
+        assert result.columns == ("id", "price")
+        assert result.nbytes > 0
+        page = result.page(9, 5)
+        assert page.rows == ((None, Decimal("9.50")), (10, Decimal("10.50")))
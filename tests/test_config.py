@@ -1,6 +1,6 @@
 import pytest
 
-from spark_sql_mcp.config import SparkConfig
+from spark_sql_mcp.config import AdmissionConfig, JobConfig, RoutingConfig, SparkConfig
 
 
 def test_from_env_minimal(monkeypatch):
@@ -71,3 +71,273 @@ def test_from_env_auth_case_insensitive(monkeypatch):
     monkeypatch.setenv("SPARK_AUTH", "ldap")
     config = SparkConfig.from_env()
     assert config.auth == "LDAP"
+
+
+def test_from_env_pool_settings(monkeypatch):
+    monkeypatch.setenv("SPARK_HOST", "localhost")
+    monkeypatch.setenv("SPARK_POOL_MIN_SIZE", "2")
+    monkeypatch.setenv("SPARK_POOL_MAX_SIZE", "8")
+    monkeypatch.setenv("SPARK_POOL_TIMEOUT", "5")
+    monkeypatch.setenv("SPARK_POOL_IDLE_TIMEOUT", "60.5")
+    monkeypatch.setenv("SPARK_POOL_METADATA_RESERVED", "2")
+    config = SparkConfig.from_env()
+    assert config.pool_min_size == 2
+    assert config.pool_max_size == 8
+    assert config.pool_timeout == 5.0
+    assert config.pool_idle_timeout == 60.5
+    assert config.pool_metadata_reserved == 2
+
+
+def test_from_env_invalid_pool_size(monkeypatch):
+    monkeypatch.setenv("SPARK_HOST", "localhost")
+    monkeypatch.setenv("SPARK_POOL_MAX_SIZE", "many")
+    with pytest.raises(ValueError, match="SPARK_POOL_MAX_SIZE"):
+        SparkConfig.from_env()
+
+
+def test_pool_query_size():
+    assert SparkConfig(host="localhost", pool_max_size=4).pool_query_size == 3
+    assert SparkConfig(host="localhost", pool_max_size=1).pool_query_size == 1
+    config = SparkConfig(host="localhost", pool_max_size=4, pool_metadata_reserved=0)
+    assert config.pool_query_size == 4
+
+
+def test_pool_min_exceeds_max():
+    with pytest.raises(ValueError, match="pool_min_size"):
+        SparkConfig(host="localhost", pool_min_size=5, pool_max_size=2)
+
+
+def test_from_env_fetch_size(monkeypatch):
+    monkeypatch.setenv("SPARK_HOST", "localhost")
+    monkeypatch.setenv("SPARK_FETCH_SIZE", "5000")
+    assert SparkConfig.from_env().fetch_size == 5000
+
+
+def test_from_env_fetch_backend(monkeypatch):
+    monkeypatch.setenv("SPARK_HOST", "localhost")
+    assert SparkConfig.from_env().fetch_backend == "pyhive"
+    monkeypatch.setenv("SPARK_FETCH_BACKEND", "Arrow")
+    assert SparkConfig.from_env().fetch_backend == "arrow"
+
+
+def test_from_env_batch_parallelism(monkeypatch):
+    monkeypatch.setenv("SPARK_HOST", "localhost")
+    monkeypatch.setenv("SPARK_BATCH_PARALLELISM", "8")
+    assert SparkConfig.from_env().batch_parallelism == 8
+    with pytest.raises(ValueError, match="batch_parallelism"):
+        SparkConfig(host="localhost", batch_parallelism=0)
+
+
+def test_invalid_fetch_backend():
+    with pytest.raises(ValueError, match="Invalid fetch backend"):
+        SparkConfig(host="localhost", fetch_backend="numpy")
+
+
+def test_from_env_metadata_cache(monkeypatch):
+    monkeypatch.setenv("SPARK_HOST", "localhost")
+    monkeypatch.setenv("SPARK_METADATA_CACHE_TTL", "0")
+    monkeypatch.setenv("SPARK_METADATA_CACHE_SIZE", "50")
+    config = SparkConfig.from_env()
+    assert config.metadata_cache_ttl == 0
+    assert config.metadata_cache_size == 50
+
+
+def test_from_env_reconnect_settings(monkeypatch):
+    monkeypatch.setenv("SPARK_HOST", "localhost")
+    monkeypatch.setenv("SPARK_RECONNECT_ATTEMPTS", "5")
+    monkeypatch.setenv("SPARK_RECONNECT_BACKOFF", "0.1")
+    monkeypatch.setenv("SPARK_RECONNECT_BACKOFF_MAX", "2")
+    monkeypatch.setenv("SPARK_LIVENESS_INTERVAL", "10")
+    config = SparkConfig.from_env()
+    assert config.reconnect_attempts == 5
+    assert config.reconnect_backoff == 0.1
+    assert config.reconnect_backoff_max == 2.0
+    assert config.liveness_interval == 10.0
+
+
+def test_from_env_metrics(monkeypatch):
+    monkeypatch.setenv("SPARK_HOST", "localhost")
+    monkeypatch.setenv("SPARK_METRICS_SINK", "OTEL")
+    monkeypatch.setenv("SPARK_SLOW_QUERY_MS", "250")
+    config = SparkConfig.from_env()
+    assert config.metrics_sink == "otel"
+    assert config.slow_query_ms == 250.0
+
+
+def test_from_env_cost_guard(monkeypatch):
+    monkeypatch.setenv("SPARK_HOST", "localhost")
+    monkeypatch.setenv("SPARK_COST_GUARD", "Reject")
+    monkeypatch.setenv("SPARK_COST_MAX_SCAN_BYTES", "1099511627776")
+    monkeypatch.setenv("SPARK_COST_MAX_SCAN_ROWS", "1000000")
+    monkeypatch.setenv("SPARK_COST_REQUIRE_PARTITION_FILTER", "yes")
+    config = SparkConfig.from_env()
+    assert config.cost_guard == "reject"
+    assert config.cost_max_scan_bytes == 1 << 40
+    assert config.cost_max_scan_rows == 1_000_000
+    assert config.cost_require_partition_filter is True
+
+
+def test_invalid_cost_guard():
+    with pytest.raises(ValueError, match="Invalid cost guard mode"):
+        SparkConfig(host="localhost", cost_guard="block")
+
+
+def test_from_env_output_format(monkeypatch):
+    monkeypatch.setenv("SPARK_HOST", "localhost")
+    monkeypatch.setenv("SPARK_OUTPUT_FORMAT", "CSV")
+    monkeypatch.setenv("SPARK_MAX_CELL_CHARS", "80")
+    monkeypatch.setenv("SPARK_MAX_RESPONSE_BYTES", "65536")
+    config = SparkConfig.from_env()
+    assert config.output_format == "csv"
+    assert config.max_cell_chars == 80
+    assert config.max_response_bytes == 65536
+
+
+def test_from_env_catalog(monkeypatch):
+    monkeypatch.setenv("SPARK_HOST", "localhost")
+    assert SparkConfig.from_env().catalog_dir is None
+    monkeypatch.setenv("SPARK_CATALOG_DIR", "/var/cache/spark-sql-mcp")
+    monkeypatch.setenv("SPARK_CATALOG_REFRESH_INTERVAL", "0")
+    config = SparkConfig.from_env()
+    assert config.catalog_dir == "/var/cache/spark-sql-mcp"
+    assert config.catalog_refresh_interval == 0.0
+
+
+def test_from_env_search_index_interval(monkeypatch):
+    monkeypatch.setenv("SPARK_HOST", "localhost")
+    assert SparkConfig.from_env().search_index_interval == 0.0
+    monkeypatch.setenv("SPARK_SEARCH_INDEX_INTERVAL", "600")
+    assert SparkConfig.from_env().search_index_interval == 600.0
+
+
+def test_invalid_output_format():
+    with pytest.raises(ValueError, match="Invalid output format"):
+        SparkConfig(host="localhost", output_format="xml")
+
+
+def test_invalid_metrics_sink():
+    with pytest.raises(ValueError, match="Invalid metrics sink"):
+        SparkConfig(host="localhost", metrics_sink="statsd")
+
+
+def test_from_env_prewarm(monkeypatch):
+    monkeypatch.setenv("SPARK_HOST", "localhost")
+    assert SparkConfig.from_env().prewarm is False
+    monkeypatch.setenv("SPARK_PREWARM", "true")
+    assert SparkConfig.from_env().prewarm is True
+
+
+def test_from_env_invalid_prewarm(monkeypatch):
+    monkeypatch.setenv("SPARK_HOST", "localhost")
+    monkeypatch.setenv("SPARK_PREWARM", "sometimes")
+    with pytest.raises(ValueError, match="SPARK_PREWARM"):
+        SparkConfig.from_env()
+
+
+class TestRoutingConfig:
+    def test_single_cluster_by_default(self, monkeypatch):
+        monkeypatch.setenv("SPARK_HOST", "localhost")
+        monkeypatch.delenv("SPARK_CLUSTERS", raising=False)
+        config = RoutingConfig.from_env()
+        assert list(config.clusters) == ["default"]
+        assert config.default_cluster == "default"
+        assert config.clusters["default"].host == "localhost"
+
+    def test_named_clusters_override_shared_settings(self, monkeypatch):
+        monkeypatch.setenv("SPARK_CLUSTERS", "fast, Batch")
+        monkeypatch.setenv("SPARK_FAST_HOST", "fast.example.com")
+        monkeypatch.setenv("SPARK_BATCH_HOST", "batch.example.com")
+        monkeypatch.setenv("SPARK_AUTH", "LDAP")
+        monkeypatch.setenv("SPARK_POOL_MAX_SIZE", "4")
+        monkeypatch.setenv("SPARK_BATCH_POOL_MAX_SIZE", "16")
+        config = RoutingConfig.from_env()
+        fast, batch = config.clusters["fast"], config.clusters["batch"]
+        assert (fast.host, fast.auth, fast.pool_max_size) == ("fast.example.com", "LDAP", 4)
+        assert (batch.host, batch.auth, batch.pool_max_size) == ("batch.example.com", "LDAP", 16)
+        assert config.default_cluster == "fast"
+
+    def test_cluster_host_is_required(self, monkeypatch):
+        monkeypatch.setenv("SPARK_CLUSTERS", "fast")
+        monkeypatch.setenv("SPARK_HOST", "shared.example.com")
+        monkeypatch.delenv("SPARK_FAST_HOST", raising=False)
+        with pytest.raises(ValueError, match="SPARK_FAST_HOST"):
+            RoutingConfig.from_env()
+
+    def test_invalid_cluster_setting_names_scoped_variable(self, monkeypatch):
+        monkeypatch.setenv("SPARK_CLUSTERS", "fast")
+        monkeypatch.setenv("SPARK_FAST_HOST", "fast.example.com")
+        monkeypatch.setenv("SPARK_FAST_FETCH_SIZE", "lots")
+        with pytest.raises(ValueError, match="SPARK_FAST_FETCH_SIZE"):
+            RoutingConfig.from_env()
+
+    def test_routes(self, monkeypatch):
+        monkeypatch.setenv("SPARK_CLUSTERS", "fast,batch")
+        monkeypatch.setenv("SPARK_FAST_HOST", "fast.example.com")
+        monkeypatch.setenv("SPARK_BATCH_HOST", "batch.example.com")
+        monkeypatch.setenv("SPARK_ROUTES", "warehouse_*=batch, Events=batch")
+        monkeypatch.setenv("SPARK_METADATA_CLUSTER", "fast")
+        monkeypatch.setenv("SPARK_FAILOVER", "true")
+        config = RoutingConfig.from_env()
+        assert config.routes == (("warehouse_*", "batch"), ("events", "batch"))
+        assert config.metadata_cluster == "fast"
+        assert config.failover is True
+
+    def test_malformed_route(self, monkeypatch):
+        monkeypatch.setenv("SPARK_CLUSTERS", "fast")
+        monkeypatch.setenv("SPARK_FAST_HOST", "fast.example.com")
+        monkeypatch.setenv("SPARK_ROUTES", "warehouse")
+        with pytest.raises(ValueError, match="Invalid SPARK_ROUTES rule"):
+            RoutingConfig.from_env()
+
+    def test_route_to_unknown_cluster(self):
+        with pytest.raises(ValueError, match="Unknown cluster: 'batch'"):
+            RoutingConfig(
+                clusters={"fast": SparkConfig(host="fast")},
+                default_cluster="fast",
+                routes=(("sales", "batch"),),
+            )
+
+    def test_invalid_cluster_name(self, monkeypatch):
+        monkeypatch.setenv("SPARK_CLUSTERS", "fast-1")
+        with pytest.raises(ValueError, match="Invalid cluster name"):
+            RoutingConfig.from_env()
+
+
+class TestAdmissionConfig:
+    def test_from_env(self, monkeypatch):
+        monkeypatch.setenv("SPARK_MAX_CONCURRENT_QUERIES", "2")
+        monkeypatch.setenv("SPARK_MAX_SESSION_QUERIES", "1")
+        monkeypatch.setenv("SPARK_ADMISSION_QUEUE_SIZE", "5")
+        monkeypatch.setenv("SPARK_ADMISSION_TIMEOUT", "1.5")
+        monkeypatch.setenv("SPARK_MAX_CONCURRENT_METADATA", "3")
+        assert AdmissionConfig.from_env() == AdmissionConfig(2, 1, 5, 1.5, 3)
+
+    def test_negative_rejected(self):
+        with pytest.raises(ValueError, match="queue_size"):
+            AdmissionConfig(queue_size=-1)
+
+    def test_default_query_cap_fits_the_pool(self):
+        # Excess queries should be told the server is busy, not wait on the pool.
+        spark = SparkConfig(host="localhost")
+        assert (
+            AdmissionConfig().max_concurrent_queries
+            <= spark.pool_max_size - spark.pool_metadata_reserved
+        )
+
+
+class TestJobConfig:
+    def test_from_env(self, monkeypatch):
+        monkeypatch.setenv("SPARK_JOB_MAX_RUNNING", "3")
+        monkeypatch.setenv("SPARK_JOB_HISTORY", "20")
+        monkeypatch.setenv("SPARK_JOB_RESULT_TTL", "60")
+        monkeypatch.setenv("SPARK_JOB_RESULT_MAX_BYTES", "1048576")
+        assert JobConfig.from_env() == JobConfig(3, 20, 60.0, 1 << 20)
+
+    def test_defaults(self, monkeypatch):
+        for name in ("MAX_RUNNING", "HISTORY", "RESULT_TTL", "RESULT_MAX_BYTES"):
+            monkeypatch.delenv(f"SPARK_JOB_{name}", raising=False)
+        assert JobConfig.from_env() == JobConfig()
+
+    def test_invalid(self):
+        with pytest.raises(ValueError, match="max_running"):
+            JobConfig(max_running=0)
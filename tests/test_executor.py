@@ -0,0 +1,85 @@
+import asyncio
+import threading
+
+import pytest
+
+from spark_sql_mcp.executor import (
+    BlockingExecutor,
+    CancelToken,
+    QueryCancelledError,
+    current_token,
+)
+
+
+class TestCancelToken:
+    def test_initially_not_cancelled(self):
+        token = CancelToken()
+        assert not token.cancelled
+        token.raise_if_cancelled()
+
+    def test_cancel(self):
+        token = CancelToken()
+        token.cancel()
+        assert token.cancelled
+        assert token.wait(10)
+        with pytest.raises(QueryCancelledError):
+            token.raise_if_cancelled()
+
+    def test_on_cancel(self):
+        token = CancelToken()
+        calls = []
+        token.on_cancel(lambda: calls.append("a"))
+        release = token.on_cancel(lambda: calls.append("b"))
+        release()
+        token.cancel()
+        token.cancel()
+        assert calls == ["a"]
+        # Registering on a cancelled token calls back at once.
+        token.on_cancel(lambda: calls.append("c"))
+        assert calls == ["a", "c"]
+
+    def test_default_token_outside_executor(self):
+        assert not current_token().cancelled
+
+
+class TestBlockingExecutor:
+    def test_runs_in_worker_thread(self):
+        executor = BlockingExecutor(1)
+        name = asyncio.run(executor.run(lambda: threading.current_thread().name))
+        assert name.startswith("spark-sql")
+        executor.shutdown()
+
+    def test_propagates_exceptions(self):
+        executor = BlockingExecutor(1)
+
+        def _fail():
+            raise ValueError("boom")
+
+        with pytest.raises(ValueError, match="boom"):
+            asyncio.run(executor.run(_fail))
+        executor.shutdown()
+
+    def test_cancellation_sets_worker_token(self):
+        executor = BlockingExecutor(1)
+        started = threading.Event()
+        seen = []
+
+        def _work():
+            token = current_token()
+            started.set()
+            seen.append(token.wait(5))
+
+        async def _main():
+            task = asyncio.ensure_future(executor.run(_work))
+            await asyncio.get_running_loop().run_in_executor(None, started.wait)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(_main())
+        executor.shutdown()
+        for _ in range(100):
+            if seen:
+                break
+            threading.Event().wait(0.01)
+        assert seen == [True]
@@ -0,0 +1,72 @@
+import json
+from decimal import Decimal
+
+import pytest
+
+from spark_sql_mcp.formats import FORMATS, format_result, validate_format
+from spark_sql_mcp.results import QueryResult
+
+RESULT = QueryResult(
+    ("id", "name", "price"),
+    ((1, "alice", Decimal("9.50")), (2, None, 3.25)),
+)
+
+
+class TestFormatResult:
+    def test_markdown(self):
+        assert format_result(RESULT).splitlines() == [
+            "| id | name | price |",
+            "| --- | --- | --- |",
+            "| 1 | alice | 9.50 |",
+            "| 2 | None | 3.25 |",
+        ]
+
+    def test_csv(self):
+        assert format_result(RESULT, "csv") == "id,name,price\n1,alice,9.50\n2,,3.25\n"
+
+    def test_csv_quotes_delimiters(self):
+        result = QueryResult(("a",), (("x,y",), ('say "hi"',)))
+        assert format_result(result, "csv") == 'a\n"x,y"\n"say ""hi"""\n'
+
+    def test_tsv(self):
+        assert format_result(RESULT, "tsv").splitlines()[1] == "1\talice\t9.50"
+
+    def test_jsonl(self):
+        lines = format_result(RESULT, "jsonl").splitlines()
+        assert [json.loads(line) for line in lines] == [
+            {"id": 1, "name": "alice", "price": "9.50"},
+            {"id": 2, "name": None, "price": 3.25},
+        ]
+
+    def test_json_sends_columns_once(self):
+        output = format_result(RESULT, "json")
+        assert json.loads(output) == {
+            "columns": ["id", "name", "price"],
+            "rows": [[1, "alice", "9.50"], [2, None, 3.25]],
+        }
+        assert output.count('"name"') == 1
+
+    def test_empty_rows(self):
+        assert json.loads(format_result(QueryResult(("id",), ()), "json"))["rows"] == []
+        assert format_result(QueryResult(("id",), ()), "jsonl") == ""
+
+    @pytest.mark.parametrize("fmt", FORMATS)
+    def test_truncation(self, fmt):
+        result = QueryResult(("text",), (("x" * 50,),))
+        output = format_result(result, fmt, max_cell_chars=10)
+        assert "xxxxxxx..." in output
+        assert "x" * 11 not in output
+
+    @pytest.mark.parametrize("fmt", FORMATS)
+    def test_truncation_keeps_numbers(self, fmt):
+        result = QueryResult(("n",), ((123456789,),))
+        assert "123456789" in format_result(result, fmt, max_cell_chars=3)
+
+
+class TestValidateFormat:
+    def test_case_insensitive(self):
+        assert validate_format("JSONL") == "jsonl"
+
+    def test_unknown(self):
+        with pytest.raises(ValueError, match="Unknown format"):
+            validate_format("xml")
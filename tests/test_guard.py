@@ -0,0 +1,173 @@
+from dataclasses import replace
+from unittest.mock import MagicMock
+
+import pytest
+
+from spark_sql_mcp.config import SparkConfig
+from spark_sql_mcp.guard import (
+    PlanEstimate,
+    QueryTooExpensiveError,
+    check_cost,
+    parse_plan,
+    partition_columns,
+)
+
+FULL_SCAN_PLAN = """== Optimized Logical Plan ==
+GlobalLimit 100, Statistics(sizeInBytes=9.4 KiB, rowCount=100)
++- LocalLimit 100, Statistics(sizeInBytes=2.1 TiB, rowCount=3.00E+9)
+   +- Aggregate [country#2], [country#2, count(1) AS n#10L], Statistics(sizeInBytes=2.1 TiB)
+      +- Relation spark_catalog.sales.events[id#1,country#2,dt#3] parquet, \
+Statistics(sizeInBytes=2.0 TiB, rowCount=3.00E+9)
+
+== Physical Plan ==
+TakeOrderedAndProject(limit=100, orderBy=[n#10L DESC], output=[country#2,n#10L])
++- *(2) HashAggregate(keys=[country#2], functions=[count(1)])
+   +- Exchange hashpartitioning(country#2, 200), ENSURE_REQUIREMENTS, [id=#20]
+      +- *(1) HashAggregate(keys=[country#2], functions=[partial_count(1)])
+         +- *(1) ColumnarToRow
+            +- FileScan parquet spark_catalog.sales.events[country#2,dt#3] Batched: true, \
+DataFilters: [], Format: Parquet, Location: CatalogFileIndex(1 paths)[s3://bucket/events], \
+PartitionFilters: [], PushedFilters: [], ReadSchema: struct<country:string>
+"""
+
+LIMIT_ONLY_PLAN = """== Optimized Logical Plan ==
+GlobalLimit 100, Statistics(sizeInBytes=9.4 KiB, rowCount=100)
++- Relation spark_catalog.sales.events[id#1] parquet, Statistics(sizeInBytes=2.0 TiB)
+
+== Physical Plan ==
+CollectLimit 100
++- *(1) ColumnarToRow
+   +- FileScan parquet spark_catalog.sales.events[id#1] Batched: true, DataFilters: [], \
+Format: Parquet, PartitionFilters: [], PushedFilters: [], ReadSchema: struct<id:int>
+"""
+
+PRUNED_PLAN = """== Optimized Logical Plan ==
+Filter (dt#3 = 2024-01-01), Statistics(sizeInBytes=1.5 GiB)
++- Relation sales.events[id#1,dt#3] parquet, Statistics(sizeInBytes=1.5 GiB)
+
+== Physical Plan ==
+*(1) ColumnarToRow
++- FileScan parquet sales.events[id#1,dt#3] Batched: true, DataFilters: [], Format: Parquet, \
+PartitionFilters: [isnotnull(dt#3), (dt#3 = 2024-01-01)], PushedFilters: [], ReadSchema: x
+"""
+
+PARTITIONED_DESCRIBE = [
+    {"col_name": "id", "data_type": "int"},
+    {"col_name": "dt", "data_type": "string"},
+    {"col_name": "# Partition Information", "data_type": ""},
+    {"col_name": "# col_name", "data_type": "data_type"},
+    {"col_name": "dt", "data_type": "string"},
+]
+
+
+class TestParsePlan:
+    def test_full_scan(self):
+        estimate = parse_plan(FULL_SCAN_PLAN)
+        assert estimate.scan_bytes == 2 << 40
+        assert estimate.scan_rows == 3_000_000_000
+        assert estimate.unfiltered_scans == ("spark_catalog.sales.events",)
+        assert not estimate.incremental
+
+    def test_limit_over_scan_is_incremental(self):
+        estimate = parse_plan(LIMIT_ONLY_PLAN)
+        assert estimate.incremental
+        assert estimate.scan_rows is None
+
+    def test_partition_filters_present(self):
+        estimate = parse_plan(PRUNED_PLAN)
+        assert estimate.scan_bytes == int(1.5 * (1 << 30))
+        assert estimate.unfiltered_scans == ()
+
+    def test_unknown_size(self):
+        plan = (
+            "== Optimized Logical Plan ==\n"
+            "Relation t[a#1] csv, Statistics(sizeInBytes=8.0 EiB)\n"
+        )
+        assert parse_plan(plan).scan_bytes is None
+
+    def test_no_statistics(self):
+        assert parse_plan("== Physical Plan ==\nLocalTableScan [a#1]\n") == PlanEstimate(
+            None, None, (), False
+        )
+
+
+class TestPartitionColumns:
+    def test_partitioned(self):
+        assert partition_columns(PARTITIONED_DESCRIBE) == ["dt"]
+
+    def test_unpartitioned(self):
+        assert partition_columns([{"col_name": "id", "data_type": "int"}]) == []
+
+    def test_stops_at_next_section(self):
+        rows = PARTITIONED_DESCRIBE + [
+            {"col_name": "", "data_type": ""},
+            {"col_name": "# Detailed Table Information", "data_type": ""},
+            {"col_name": "Owner", "data_type": "hive"},
+        ]
+        assert partition_columns(rows) == ["dt"]
+
+
+class TestCheckCost:
+    @pytest.fixture
+    def client(self):
+        client = MagicMock()
+        client.config = SparkConfig(
+            host="localhost", cost_guard="reject", cost_max_scan_bytes=1 << 40
+        )
+        client.explain.return_value = parse_plan(FULL_SCAN_PLAN)
+        client.describe_table.return_value = PARTITIONED_DESCRIBE
+        return client
+
+    def test_off(self, client):
+        client.config = replace(client.config, cost_guard="off")
+        assert check_cost(client, "SELECT 1") is None
+        client.explain.assert_not_called()
+
+    def test_rejects_large_scan(self, client):
+        with pytest.raises(QueryTooExpensiveError, match=r"scan about 2\.0 TiB \(limit 1\.0 TiB\)"):
+            check_cost(client, "SELECT * FROM sales.events")
+
+    def test_warn_mode(self, client):
+        client.config = replace(client.config, cost_guard="warn", cost_max_scan_rows=1000)
+        warning = check_cost(client, "SELECT * FROM sales.events")
+        assert warning.startswith("Warning: Query cost check:")
+        assert "3,000,000,000 rows" in warning
+
+    def test_within_limits(self, client):
+        client.config = replace(client.config, cost_max_scan_bytes=4 << 40)
+        assert check_cost(client, "SELECT * FROM sales.events") is None
+
+    def test_incremental_limit_skips_size_limits(self, client):
+        client.explain.return_value = parse_plan(LIMIT_ONLY_PLAN)
+        assert check_cost(client, "SELECT * FROM sales.events LIMIT 100") is None
+
+    def test_missing_partition_filter(self, client):
+        client.config = replace(
+            client.config, cost_max_scan_bytes=0, cost_require_partition_filter=True
+        )
+        expected = r"sales\.events .* partition columns \(dt\)"
+        with pytest.raises(QueryTooExpensiveError, match=expected):
+            check_cost(client, "SELECT country, count(*) FROM sales.events GROUP BY country")
+        client.describe_table.assert_called_once_with("events", "sales")
+
+    def test_unpartitioned_table_needs_no_filter(self, client):
+        client.config = replace(
+            client.config, cost_max_scan_bytes=0, cost_require_partition_filter=True
+        )
+        client.describe_table.return_value = [{"col_name": "id", "data_type": "int"}]
+        assert check_cost(client, "SELECT * FROM sales.events") is None
+
+    def test_describe_failure_skips_partition_check(self, client):
+        client.config = replace(
+            client.config, cost_max_scan_bytes=0, cost_require_partition_filter=True
+        )
+        client.explain.return_value = parse_plan(
+            FULL_SCAN_PLAN.replace("sales.events", "sales.2024_orders")
+        )
+        client.describe_table.side_effect = ValueError("Invalid SQL identifier: '2024_orders'")
+        assert check_cost(client, "SELECT * FROM sales.`2024_orders`") is None
+        client.describe_table.assert_called_once_with("2024_orders", "sales")
+
+    def test_explain_failure_allows_query(self, client):
+        client.explain.side_effect = RuntimeError("parse error")
+        assert check_cost(client, "SELECT * FROM sales.events") is None
@@ -0,0 +1,163 @@
+import threading
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from spark_sql_mcp.admission import ServerBusyError
+from spark_sql_mcp.executor import current_token
+from spark_sql_mcp.jobs import CANCELLED, FAILED, FINISHED, QUEUED, RUNNING, JobRegistry
+from spark_sql_mcp.pool import ConnectionPool, PoolTimeoutError
+from spark_sql_mcp.results import QueryResult
+
+
+def _wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not met in time")
+        time.sleep(0.005)
+
+
+def _client(*batches, gate=None):
+    """A client whose ``iter_batches`` yields ``batches``, waiting on ``gate`` first."""
+    client = MagicMock(arrow_results=False)
+
+    def iter_batches(sql, limit=None):
+        if gate is not None:
+            while not gate.wait(0.01):
+                current_token().raise_if_cancelled()
+        for rows in batches:
+            current_token().raise_if_cancelled()
+            yield QueryResult(("id",), tuple((r,) for r in rows))
+
+    client.iter_batches.side_effect = iter_batches
+    return client
+
+
+@pytest.fixture
+def registry():
+    registry = JobRegistry(1, max_jobs=3)
+    yield registry
+    registry.shutdown()
+
+
+class TestJobRegistry:
+    def test_runs_in_background(self, registry):
+        gate = threading.Event()
+        job = registry.submit(_client([1, 2], [3], gate=gate), "SELECT id FROM t", cluster="c")
+        _wait_for(lambda: job.state == RUNNING)
+        gate.set()
+        _wait_for(lambda: job.state == FINISHED)
+        assert job.rows_fetched == 3
+        assert registry.results(job.id).rows == ((1,), (2,), (3,))
+        assert job.elapsed() >= 0
+
+    def test_arrow_results(self, registry):
+        pa = pytest.importorskip("pyarrow")
+        client = MagicMock(arrow_results=True)
+        client.iter_record_batches.return_value = iter([
+            pa.record_batch([pa.array([1, 2])], names=["id"]),
+            pa.record_batch([pa.array([3])], names=["id"]),
+        ])
+        job = registry.submit(client, "SELECT id FROM t", cluster="c")
+        _wait_for(lambda: job.state == FINISHED)
+        result = registry.results(job.id)
+        assert job.rows_fetched == len(result) == 3
+        assert result.page(1, 5).rows == ((2,), (3,))
+        client.iter_batches.assert_not_called()
+
+    def test_results_before_finish(self, registry):
+        gate = threading.Event()
+        job = registry.submit(_client([1], gate=gate), "SELECT 1", cluster="c")
+        with pytest.raises(ValueError, match="results are available once it has finished"):
+            registry.results(job.id)
+        gate.set()
+
+    def test_cancel_running(self, registry):
+        job = registry.submit(_client([1], gate=threading.Event()), "SELECT 1", cluster="c")
+        _wait_for(lambda: job.state == RUNNING)
+        registry.cancel(job.id)
+        _wait_for(lambda: job.state == CANCELLED)
+
+    def test_cancel_queued(self, registry):
+        gate = threading.Event()
+        first = registry.submit(_client([1], gate=gate), "SELECT 1", cluster="c")
+        second = registry.submit(_client([2]), "SELECT 2", cluster="c")
+        assert second.state == QUEUED
+        registry.cancel(second.id)
+        assert second.state == CANCELLED
+        gate.set()
+        _wait_for(lambda: first.state == FINISHED)
+        assert second.state == CANCELLED
+        second.client.iter_batches.assert_not_called()
+
+    def test_failure_is_sanitized(self, registry, caplog):
+        client = MagicMock(arrow_results=False)
+        client.iter_batches.side_effect = RuntimeError("secret detail")
+        job = registry.submit(client, "SELECT 1", cluster="c")
+        _wait_for(lambda: job.state == FAILED)
+        assert job.error == "query execution failed. Check the server logs for details."
+        assert "secret detail" in caplog.text
+
+    def test_pool_timeout_reported_as_busy(self, registry):
+        client = MagicMock(arrow_results=False)
+        client.iter_batches.side_effect = PoolTimeoutError("Timed out after 30s")
+        job = registry.submit(client, "SELECT 1", cluster="c")
+        _wait_for(lambda: job.state == FAILED)
+        assert job.error.startswith("Server busy:")
+
+    def test_jobs_leave_a_connection_for_interactive_queries(self):
+        registry = JobRegistry(2)
+        pool = ConnectionPool(MagicMock, min_size=0, max_size=3, timeout=1, reserved=1)
+        gate = threading.Event()
+        client = MagicMock(arrow_results=False)
+
+        def iter_batches(sql, limit=None):
+            with pool.connection():
+                gate.wait(5)
+                yield QueryResult(("id",), ((1,),))
+
+        client.iter_batches.side_effect = iter_batches
+        try:
+            jobs = [registry.submit(client, "SELECT 1", cluster="c") for _ in range(2)]
+            _wait_for(lambda: pool.stats().in_use == 1 and pool.stats().waiters == 1)
+            # The second job waits, but an interactive query gets a connection at once.
+            with pool.connection():
+                pass
+            gate.set()
+            _wait_for(lambda: all(job.state == FINISHED for job in jobs))
+        finally:
+            gate.set()
+            registry.shutdown()
+
+    def test_unknown_job(self, registry):
+        with pytest.raises(ValueError, match="Unknown job"):
+            registry.get("job-nope")
+
+    def test_old_jobs_trimmed(self, registry):
+        jobs = [registry.submit(_client([i]), f"SELECT {i}", cluster="c") for i in range(3)]
+        _wait_for(lambda: all(j.state == FINISHED for j in jobs))
+        newest = registry.submit(_client([9]), "SELECT 9", cluster="c")
+        assert [j.id for j in registry.jobs()] == [newest.id, jobs[2].id, jobs[1].id]
+        with pytest.raises(ValueError, match="Unknown job"):
+            registry.results(jobs[0].id)
+
+    def test_rejects_when_all_jobs_active(self, registry):
+        gate = threading.Event()
+        for i in range(3):
+            registry.submit(_client([i], gate=gate), "SELECT 1", cluster="c")
+        with pytest.raises(ServerBusyError, match="3 jobs are queued or running"):
+            registry.submit(_client([1]), "SELECT 1", cluster="c")
+        gate.set()
+
+    def test_results_evicted_to_byte_budget(self):
+        registry = JobRegistry(1, result_max_bytes=2000)
+        try:
+            job = registry.submit(_client(list(range(1000))), "SELECT 1", cluster="c")
+            _wait_for(lambda: job.state == FINISHED)
+            assert not registry.has_results(job.id)
+            with pytest.raises(ValueError, match="no longer available"):
+                registry.results(job.id)
+        finally:
+            registry.shutdown()
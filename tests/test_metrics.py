@@ -0,0 +1,114 @@
+import logging
+
+import pytest
+
+from spark_sql_mcp.metrics import (
+    QUERY_SPAN,
+    Instrumentation,
+    LoggingSink,
+    MetricsSink,
+    OpenTelemetrySink,
+    create_sink,
+)
+
+
+class RecordingSink(MetricsSink):
+    def __init__(self):
+        self.started = []
+        self.ended = []
+
+    def on_start(self, span):
+        self.started.append(span.name)
+
+    def on_end(self, span):
+        self.ended.append(span)
+
+
+class TestInstrumentation:
+    def test_span_records_duration_and_attributes(self):
+        sink = RecordingSink()
+        instrumentation = Instrumentation(sink)
+        with instrumentation.span("work", sql="SELECT 1") as span:
+            span.set("rows", 3)
+        (ended,) = sink.ended
+        assert ended.attributes == {"sql": "SELECT 1", "rows": 3}
+        assert ended.duration_ms >= 0
+
+    def test_nested_spans_have_parent(self):
+        sink = RecordingSink()
+        instrumentation = Instrumentation(sink)
+        with instrumentation.span("outer") as outer:
+            with instrumentation.span("inner"):
+                pass
+        inner = sink.ended[0]
+        assert inner.parent is outer
+
+    def test_inactive_span_is_not_parent(self):
+        sink = RecordingSink()
+        instrumentation = Instrumentation(sink)
+        with instrumentation.span("stream", activate=False):
+            with instrumentation.span("other"):
+                pass
+        assert sink.ended[0].parent is None
+
+    def test_error_recorded(self):
+        sink = RecordingSink()
+        with pytest.raises(RuntimeError):
+            with Instrumentation(sink).span("work"):
+                raise RuntimeError("boom")
+        assert sink.ended[0].attributes["error"] == "RuntimeError"
+
+    def test_summary(self):
+        instrumentation = Instrumentation()
+        for _ in range(3):
+            with instrumentation.span("work"):
+                pass
+        summary = instrumentation.summary()["work"]
+        assert summary["count"] == 3
+        assert summary["max_ms"] >= summary["avg_ms"]
+
+    def test_slow_query_logged(self, caplog):
+        instrumentation = Instrumentation(slow_query_ms=0.0001)
+        with caplog.at_level(logging.WARNING, logger="spark_sql_mcp.slow_query"):
+            with instrumentation.span(QUERY_SPAN, sql="SELECT * FROM big") as span:
+                span.set("rows", 10)
+        assert "SELECT * FROM big" in caplog.text
+
+    def test_fast_query_not_logged(self, caplog):
+        instrumentation = Instrumentation(slow_query_ms=60_000)
+        with caplog.at_level(logging.WARNING, logger="spark_sql_mcp.slow_query"):
+            with instrumentation.span(QUERY_SPAN, sql="SELECT 1"):
+                pass
+        assert caplog.text == ""
+
+    def test_failing_sink_does_not_break_queries(self):
+        class BrokenSink(MetricsSink):
+            def on_end(self, span):
+                raise RuntimeError("exporter down")
+
+        with Instrumentation(BrokenSink()).span("work"):
+            pass
+
+
+class TestSinks:
+    def test_logging_sink(self, caplog):
+        with caplog.at_level(logging.DEBUG, logger="spark_sql_mcp.metrics"):
+            with Instrumentation(LoggingSink()).span("spark.query", rows=5):
+                pass
+        assert "spark.query" in caplog.text
+        assert "rows=5" in caplog.text
+
+    def test_otel_sink(self):
+        pytest.importorskip("opentelemetry")
+        instrumentation = Instrumentation(OpenTelemetrySink())
+        with instrumentation.span("outer"):
+            with instrumentation.span("inner", rows=1):
+                pass
+
+    def test_create_sink(self):
+        assert isinstance(create_sink("logging"), LoggingSink)
+        assert type(create_sink("none")) is MetricsSink
+
+    def test_create_unknown_sink(self):
+        with pytest.raises(ValueError, match="Unknown metrics sink"):
+            create_sink("statsd")
@@ -0,0 +1,222 @@
+import threading
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from spark_sql_mcp.pool import (
+    ConnectionPool,
+    PoolTimeoutError,
+    background_checkouts,
+    reserved_checkouts,
+)
+
+
+def _factory():
+    return MagicMock()
+
+
+class TestConnectionPool:
+    def test_fill_opens_min_size(self):
+        factory = MagicMock(side_effect=_factory)
+        pool = ConnectionPool(factory, min_size=2, max_size=4)
+        pool.fill()
+        assert factory.call_count == 2
+        assert pool.stats().idle == 2
+
+    def test_reuses_released_connection(self):
+        pool = ConnectionPool(_factory, min_size=0, max_size=2)
+        with pool.connection() as first:
+            pass
+        with pool.connection() as second:
+            assert second is first
+        assert pool.stats().size == 1
+
+    def test_grows_up_to_max_size(self):
+        pool = ConnectionPool(_factory, min_size=0, max_size=2)
+        a = pool.acquire()
+        b = pool.acquire()
+        assert a is not b
+        stats = pool.stats()
+        assert stats.size == 2
+        assert stats.in_use == 2
+
+    def test_checkout_timeout(self):
+        pool = ConnectionPool(_factory, min_size=0, max_size=1, timeout=0.05)
+        pool.acquire()
+        with pytest.raises(PoolTimeoutError):
+            pool.acquire()
+        assert pool.stats().timeouts == 1
+
+    def test_waiter_gets_released_connection(self):
+        pool = ConnectionPool(_factory, min_size=0, max_size=1, timeout=2)
+        conn = pool.acquire()
+        result = []
+        waiter = threading.Thread(target=lambda: result.append(pool.acquire()))
+        waiter.start()
+        while pool.stats().waiters == 0:
+            time.sleep(0.001)
+        pool.release(conn)
+        waiter.join(timeout=2)
+        assert result == [conn]
+
+    def test_unhealthy_connection_replaced(self):
+        pool = ConnectionPool(_factory, min_size=0, max_size=1, health_check=lambda c, idle: False)
+        with pool.connection() as first:
+            pass
+        with pool.connection() as second:
+            assert second is not first
+        first.close.assert_called_once()
+        assert pool.stats().size == 1
+
+    def test_idle_eviction_keeps_min_size(self):
+        pool = ConnectionPool(_factory, min_size=1, max_size=3, idle_timeout=0)
+        conns = [pool.acquire() for _ in range(3)]
+        for conn in conns:
+            pool.release(conn)
+        with pool.connection():
+            pass
+        assert pool.stats().size == 1
+        assert sum(c.close.call_count for c in conns) == 2
+
+    def test_idle_connections_closed_without_checkouts(self):
+        pool = ConnectionPool(_factory, min_size=1, max_size=3, idle_timeout=0.05)
+        conns = [pool.acquire() for _ in range(3)]
+        for conn in conns:
+            pool.release(conn)
+        deadline = time.monotonic() + 2
+        while pool.stats().size > 1 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert pool.stats().size == 1
+        assert sum(c.close.call_count for c in conns) == 2
+        pool.close()
+
+    def test_close_stops_reaper(self):
+        pool = ConnectionPool(_factory, min_size=0, max_size=1, idle_timeout=60)
+        pool.release(pool.acquire())
+        reaper = pool._reaper
+        assert reaper is not None and reaper.is_alive()
+        pool.close()
+        reaper.join(timeout=1)
+        assert not reaper.is_alive()
+
+    def test_factory_error_frees_slot(self):
+        factory = MagicMock(side_effect=[ConnectionError("down"), MagicMock()])
+        pool = ConnectionPool(factory, min_size=0, max_size=1)
+        with pytest.raises(ConnectionError):
+            pool.acquire()
+        assert pool.stats().size == 0
+        pool.acquire()
+
+    def test_discard(self):
+        pool = ConnectionPool(_factory, min_size=0, max_size=1)
+        conn = pool.acquire()
+        pool.discard(conn)
+        conn.close.assert_called_once()
+        assert pool.stats().size == 0
+
+    def test_close_closes_idle_and_released(self):
+        pool = ConnectionPool(_factory, min_size=0, max_size=2)
+        idle = pool.acquire()
+        busy = pool.acquire()
+        pool.release(idle)
+        pool.close()
+        idle.close.assert_called_once()
+        pool.release(busy)
+        busy.close.assert_called_once()
+        with pytest.raises(RuntimeError, match="closed"):
+            pool.acquire()
+
+    def test_stats_latency(self):
+        pool = ConnectionPool(_factory, min_size=0, max_size=1)
+        with pool.connection():
+            pass
+        stats = pool.stats()
+        assert stats.checkouts == 1
+        assert stats.max_checkout_ms >= stats.avg_checkout_ms >= 0
+
+    def test_health_check_receives_idle_time(self):
+        seen = []
+        pool = ConnectionPool(
+            _factory, min_size=0, max_size=1, health_check=lambda c, idle: seen.append(idle) or True
+        )
+        with pool.connection():
+            pass
+        with pool.connection():
+            pass
+        assert len(seen) == 1
+        assert seen[0] >= 0
+
+    def test_disconnect_error_discards_connection(self):
+        pool = ConnectionPool(
+            _factory, min_size=0, max_size=1, is_disconnect=lambda e: isinstance(e, EOFError)
+        )
+        with pytest.raises(EOFError):
+            with pool.connection() as conn:
+                raise EOFError()
+        conn.close.assert_called_once()
+        assert pool.stats().size == 0
+
+    def test_other_error_returns_connection(self):
+        pool = ConnectionPool(
+            _factory, min_size=0, max_size=1, is_disconnect=lambda e: isinstance(e, EOFError)
+        )
+        with pytest.raises(ValueError):
+            with pool.connection():
+                raise ValueError()
+        assert pool.stats().idle == 1
+
+    def test_reserved_connections(self):
+        pool = ConnectionPool(_factory, min_size=0, max_size=2, timeout=0.05, reserved=1)
+        pool.acquire()
+        with pytest.raises(PoolTimeoutError):
+            pool.acquire()
+        with reserved_checkouts():
+            pool.acquire()
+        assert pool.stats().in_use == 2
+
+    def test_reserved_waiter_woken(self):
+        pool = ConnectionPool(_factory, min_size=0, max_size=2, timeout=2, reserved=1)
+        first = pool.acquire()
+        with reserved_checkouts():
+            second = pool.acquire()
+        result = []
+
+        def _reserved():
+            with reserved_checkouts():
+                result.append(pool.acquire())
+
+        # The first waiter may not take the freed connection while another is in use.
+        waiters = [threading.Thread(target=pool.acquire), threading.Thread(target=_reserved)]
+        for count, waiter in enumerate(waiters, 1):
+            waiter.start()
+            while pool.stats().waiters < count:
+                time.sleep(0.001)
+        pool.release(second)
+        waiters[1].join(timeout=1)
+        assert result == [second]
+        pool.release(first)
+        pool.release(result[0])
+        waiters[0].join(timeout=1)
+        assert not waiters[0].is_alive()
+
+    def test_background_checkouts_leave_a_connection(self):
+        pool = ConnectionPool(_factory, min_size=0, max_size=3, timeout=0.05, reserved=1)
+        with background_checkouts():
+            pool.acquire()
+            with pytest.raises(PoolTimeoutError):
+                pool.acquire()
+        pool.acquire()
+        with reserved_checkouts():
+            pool.acquire()
+        assert pool.stats().in_use == 3
+
+    def test_background_checkouts_use_a_single_connection(self):
+        pool = ConnectionPool(_factory, min_size=0, max_size=2, timeout=0.05, reserved=1)
+        with background_checkouts():
+            pool.acquire()
+        assert pool.stats().in_use == 1
+
+    def test_reserved_must_leave_a_connection(self):
+        with pytest.raises(ValueError, match="reserved"):
+            ConnectionPool(_factory, max_size=1, reserved=1)
@@ -0,0 +1,77 @@
+import pytest
+
+from spark_sql_mcp.profile import (
+    PROFILE_COLUMNS,
+    build_profile,
+    profile_query,
+    table_columns,
+)
+from spark_sql_mcp.results import QueryResult
+
+DESCRIBE = [
+    {"col_name": "id", "data_type": "bigint", "comment": ""},
+    {"col_name": "name", "data_type": "string", "comment": ""},
+    {"col_name": "tags", "data_type": "array<string>", "comment": ""},
+    {"col_name": "dt", "data_type": "date", "comment": ""},
+    {"col_name": "# Partition Information", "data_type": "", "comment": ""},
+    {"col_name": "# col_name", "data_type": "data_type", "comment": "comment"},
+    {"col_name": "dt", "data_type": "date", "comment": ""},
+]
+
+
+class TestTableColumns:
+    def test_stops_at_partition_section(self):
+        assert table_columns(DESCRIBE) == [
+            ("id", "bigint"), ("name", "string"), ("tags", "array<string>"), ("dt", "date"),
+        ]
+
+
+class TestProfileQuery:
+    def test_aggregates_chosen_by_type(self):
+        sql = profile_query("db.t", [("id", "bigint"), ("tags", "array<string>")])
+        assert sql == (
+            "SELECT count(1) AS row_count, count(`id`) AS c0_non_null, "
+            "approx_count_distinct(`id`) AS c0_distinct, min(`id`) AS c0_min, "
+            "max(`id`) AS c0_max, percentile_approx(`id`, 0.25) AS c0_p0, "
+            "percentile_approx(`id`, 0.5) AS c0_p1, percentile_approx(`id`, 0.75) AS c0_p2, "
+            "count(`tags`) AS c1_non_null FROM db.t"
+        )
+
+    def test_strings_and_dates_get_no_percentiles(self):
+        sql = profile_query("db.t", [("name", "varchar(10)"), ("dt", "date")])
+        assert "percentile_approx" not in sql
+        assert "min(`name`) AS c0_min" in sql
+        assert "max(`dt`) AS c1_max" in sql
+
+    def test_decimal_is_numeric(self):
+        assert "percentile_approx(`x`" in profile_query("t", [("x", "decimal(10,2)")])
+
+    def test_quotes_identifiers(self):
+        assert "count(`we``ird`)" in profile_query("t", [("we`ird", "int")])
+
+    def test_no_columns(self):
+        with pytest.raises(ValueError, match="no columns"):
+            profile_query("t", [])
+
+
+class TestBuildProfile:
+    def test_one_row_per_column(self):
+        columns = [("id", "bigint"), ("tags", "array<string>")]
+        result = QueryResult(
+            ("row_count", "c0_non_null", "c0_distinct", "c0_min", "c0_max",
+             "c0_p0", "c0_p1", "c0_p2", "c1_non_null"),
+            ((200, 150, 148, 1, 999, 250, 500, 750, 200),),
+        )
+        profile = build_profile(result, columns)
+        assert profile.row_count == 200
+        assert profile.columns.columns == PROFILE_COLUMNS
+        assert profile.columns.rows == (
+            ("id", "bigint", 50, 25.0, 148, 1, 999, 250, 500, 750),
+            ("tags", "array<string>", 0, 0.0, None, None, None, None, None, None),
+        )
+
+    def test_empty_table(self):
+        result = QueryResult(("row_count", "c0_non_null"), ((0, 0),))
+        profile = build_profile(result, [("tags", "map<string,int>")])
+        assert profile.row_count == 0
+        assert profile.columns.rows[0][2:4] == (0, None)
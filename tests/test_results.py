@@ -0,0 +1,26 @@
+from spark_sql_mcp.results import QueryResult
+
+
+class TestQueryResult:
+    def test_to_dicts(self):
+        result = QueryResult(("id", "name"), ((1, "alice"), (2, "bob")))
+        assert result.to_dicts() == [{"id": 1, "name": "alice"}, {"id": 2, "name": "bob"}]
+
+    def test_from_dicts_round_trip(self):
+        rows = [{"id": 1, "name": "alice"}]
+        result = QueryResult.from_dicts(rows)
+        assert result.columns == ("id", "name")
+        assert result.to_dicts() == rows
+
+    def test_from_dicts_empty(self):
+        assert len(QueryResult.from_dicts([])) == 0
+
+    def test_column(self):
+        result = QueryResult(("id", "name"), ((1, "alice"), (2, "bob")))
+        assert result.column("name") == ["alice", "bob"]
+
+    def test_len_and_iter(self):
+        result = QueryResult(("id",), ((1,), (2,)))
+        assert len(result) == 2
+        assert list(result) == [(1,), (2,)]
+        assert not QueryResult(("id",), ())
@@ -0,0 +1,101 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from spark_sql_mcp.config import RoutingConfig, SparkConfig
+from spark_sql_mcp.pool import PoolStats
+from spark_sql_mcp.router import ClusterRouter
+
+
+def _client(reachable=True, in_use=0, waiters=0, max_size=4):
+    client = MagicMock()
+    client.reachable = reachable
+    client.pool_stats.return_value = PoolStats(
+        size=in_use, idle=0, in_use=in_use, waiters=waiters, max_size=max_size,
+        checkouts=0, timeouts=0, avg_checkout_ms=0.0, max_checkout_ms=0.0,
+    )
+    return client
+
+
+@pytest.fixture
+def clients():
+    return {"fast": _client(), "batch": _client()}
+
+
+class TestRoute:
+    def test_default(self, clients):
+        router = ClusterRouter(clients)
+        assert router.route() == "fast"
+        assert router.client() is clients["fast"]
+
+    def test_explicit_cluster(self, clients):
+        router = ClusterRouter(clients, routes=[("sales", "fast")])
+        assert router.route("Batch", ["sales"]) == "batch"
+
+    def test_unknown_cluster(self, clients):
+        with pytest.raises(ValueError, match="Unknown cluster: 'adhoc'"):
+            ClusterRouter(clients).route("adhoc")
+
+    def test_database_rules_first_match_wins(self, clients):
+        router = ClusterRouter(clients, routes=[("warehouse_*", "batch"), ("*", "fast")])
+        assert router.route(databases=[None, "Warehouse_Events"]) == "batch"
+        assert router.route(databases=["scratch"]) == "fast"
+
+    def test_no_matching_rule_uses_default(self, clients):
+        router = ClusterRouter(clients, default="batch", routes=[("warehouse", "fast")])
+        assert router.route(databases=["scratch"]) == "batch"
+
+    def test_metadata_cluster(self, clients):
+        router = ClusterRouter(clients, routes=[("*", "batch")], metadata_cluster="fast")
+        assert router.route(databases=["sales"], metadata=True) == "fast"
+        assert router.route(databases=["sales"]) == "batch"
+
+
+class TestCandidates:
+    def test_no_failover_by_default(self, clients):
+        assert ClusterRouter(clients).candidates() == [clients["fast"]]
+
+    def test_failover_appends_other_clusters(self, clients):
+        router = ClusterRouter(clients, failover=True)
+        assert router.candidates() == [clients["fast"], clients["batch"]]
+
+    def test_unreachable_cluster_moves_last(self, clients):
+        clients["fast"].reachable = False
+        router = ClusterRouter(clients, failover=True)
+        assert router.candidates() == [clients["batch"], clients["fast"]]
+
+    def test_saturated_cluster_with_queue_moves_behind_free_one(self, clients):
+        clients["fast"] = _client(in_use=4, waiters=2)
+        router = ClusterRouter(clients, failover=True)
+        assert router.candidates() == [clients["batch"], clients["fast"]]
+
+    def test_explicit_cluster_never_fails_over(self, clients):
+        clients["batch"].reachable = False
+        router = ClusterRouter(clients, failover=True)
+        assert router.candidates("batch") == [clients["batch"]]
+
+
+class TestHealth:
+    def test_reports_pool_state(self, clients):
+        clients["batch"] = _client(reachable=False, in_use=4, waiters=3)
+        health = {h.name: h for h in ClusterRouter(clients).health()}
+        assert health["fast"].reachable and not health["fast"].saturated
+        assert not health["batch"].reachable
+        assert health["batch"].saturated
+        assert health["batch"].queue_depth == 3
+
+    def test_cluster_without_pool(self, clients):
+        clients["fast"].pool_stats.return_value = None
+        clients["fast"].config = SparkConfig(host="fast", pool_max_size=8)
+        health = ClusterRouter(clients).health()[0]
+        assert (health.in_use, health.max_size, health.queue_depth) == (0, 8, 0)
+
+
+def test_from_config_builds_client_per_cluster():
+    config = RoutingConfig(
+        clusters={"fast": SparkConfig(host="fast"), "batch": SparkConfig(host="batch")},
+        default_cluster="batch",
+    )
+    router = ClusterRouter.from_config(config)
+    assert router.client().config.host == "batch"
+    assert router.client("fast").config.host == "fast"
@@ -0,0 +1,67 @@
+from spark_sql_mcp.guard import partition_columns
+from spark_sql_mcp.profile import table_columns
+from spark_sql_mcp.schema import format_schemas, parse_table_information
+
+INFORMATION = """Database: sales
+Table: orders
+Type: MANAGED
+Provider: parquet
+Partition Provider: Catalog
+Partition Columns: [`dt`]
+Schema: root
+ |-- id: long (nullable = true)
+ |-- amount: decimal(10,2) (nullable = true)
+ |-- dt: string (nullable = true)
+"""
+
+
+def _rows(*columns):
+    return [{"col_name": n, "data_type": t, "comment": None} for n, t in columns]
+
+
+class TestParseTableInformation:
+    def test_columns_and_partitions(self):
+        rows = parse_table_information(INFORMATION)
+        assert table_columns(rows) == [
+            ("id", "bigint"), ("amount", "decimal(10,2)"), ("dt", "string"),
+        ]
+        assert partition_columns(rows) == ["dt"]
+
+    def test_unpartitioned(self):
+        info = "Schema: root\n |-- id: integer (nullable = false)\n"
+        assert parse_table_information(info) == _rows(("id", "int"))
+
+    def test_nested_type_left_to_describe(self):
+        info = (
+            "Schema: root\n |-- id: integer (nullable = true)\n"
+            " |-- tags: array (nullable = true)\n |    |-- element: string (containsNull = true)\n"
+        )
+        assert parse_table_information(info) is None
+
+    def test_no_schema(self):
+        assert parse_table_information("Database: sales\nTable: t\n") is None
+
+
+class TestFormatSchemas:
+    def test_groups_identical_schemas(self):
+        schemas = {
+            "orders_2023": _rows(("id", "bigint"), ("amount", "double")),
+            "orders_2024": _rows(("id", "bigint"), ("amount", "double")),
+            "customers": _rows(("id", "bigint"), ("name", "string")),
+        }
+        assert format_schemas("sales", schemas) == (
+            "3 tables in sales, 2 distinct schemas.\n"
+            "\n"
+            "orders_2023, orders_2024\n"
+            "  id bigint, amount double\n"
+            "\n"
+            "customers\n"
+            "  id bigint, name string"
+        )
+
+    def test_partitions(self):
+        output = format_schemas("sales", {"orders": parse_table_information(INFORMATION)})
+        assert output.endswith("  partitioned by dt")
+
+    def test_empty(self):
+        assert format_schemas("sales", {}) == "No tables found in sales."
@@ -0,0 +1,100 @@
+import pytest
+
+from spark_sql_mcp.search import SchemaIndex, name_tokens, text_tokens
+
+ORDERS = [
+    {"col_name": "order_id", "data_type": "bigint", "comment": None},
+    {"col_name": "customerId", "data_type": "bigint", "comment": "buyer, see crm.customers"},
+    {"col_name": "amount", "data_type": "decimal(10,2)", "comment": ""},
+    {"col_name": "dt", "data_type": "string", "comment": None},
+    {"col_name": "# Partition Information", "data_type": "", "comment": ""},
+    {"col_name": "# col_name", "data_type": "data_type", "comment": "comment"},
+    {"col_name": "dt", "data_type": "string", "comment": None},
+]
+CUSTOMERS = [
+    {"col_name": "customer_id", "data_type": "bigint", "comment": None},
+    {"col_name": "email", "data_type": "string", "comment": "primary contact address"},
+]
+
+
+@pytest.fixture
+def index():
+    index = SchemaIndex()
+    index.add_table("sales", "orders", ORDERS)
+    index.add_table("crm", "customers", CUSTOMERS)
+    return index
+
+
+def _hits(matches):
+    return [(m.database, m.table, m.column) for m in matches]
+
+
+class TestTokens:
+    def test_name_tokens(self):
+        assert name_tokens("customerId") == {"customerid", "customer", "id"}
+        assert name_tokens("order_id") == {"order_id", "order", "id"}
+        assert name_tokens("HTTPStatus") == {"httpstatus", "http", "status"}
+
+    def test_text_tokens_skip_single_characters(self):
+        assert text_tokens("decimal(10,2)") == {"decimal", "10"}
+
+
+class TestSchemaIndex:
+    def test_stats(self, index):
+        assert len(index) == 2
+        # Partition columns are not indexed twice.
+        assert index.stats()["columns"] == 6
+
+    def test_exact_name_ranks_first(self, index):
+        matches = index.search("customer_id")
+        assert _hits(matches)[0] == ("crm", "customers", "customer_id")
+        assert ("sales", "orders", "customerId") in _hits(matches)
+
+    def test_table_match(self, index):
+        assert _hits(index.search("orders"))[0] == ("sales", "orders", None)
+
+    def test_prefix(self, index):
+        assert ("crm", "customers", "email") in _hits(index.search("emai"))
+
+    def test_fuzzy(self, index):
+        assert _hits(index.search("ammount")) == [("sales", "orders", "amount")]
+
+    def test_fuzzy_compares_only_candidates_sharing_trigrams(self, index):
+        candidates = index._fuzzy_candidates_locked("custmer")
+        assert candidates[0] == "customer"
+        assert "amount" not in candidates
+
+    def test_comment_and_type(self, index):
+        assert _hits(index.search("contact")) == [("crm", "customers", "email")]
+        assert _hits(index.search("decimal")) == [("sales", "orders", "amount")]
+
+    def test_more_terms_matched_ranks_first(self, index):
+        matches = index.search("customer email")
+        assert _hits(matches)[0] == ("crm", "customers", "email")
+
+    def test_database_filter_and_limit(self, index):
+        assert {m.database for m in index.search("id", database="SALES")} == {"sales"}
+        assert len(index.search("id", limit=1)) == 1
+
+    def test_no_terms(self, index):
+        assert index.search("  ") == []
+
+    def test_re_adding_table_replaces_it(self, index):
+        index.add_table("sales", "ORDERS", [{"col_name": "total", "data_type": "double"}])
+        assert index.search("amount") == []
+        assert _hits(index.search("total")) == [("sales", "orders", "total")]
+        assert len(index) == 2
+
+    def test_invalidate(self, index):
+        assert index.invalidate(lambda db, table: db == "crm") == 1
+        assert index.search("email") == []
+        assert "email" not in index._postings
+        assert "ema" not in index._grams
+        assert index.invalidate() == 1
+        assert index.stats() == {"tables": 0, "columns": 0, "tokens": 0}
+
+    def test_replace_database_drops_missing_tables(self, index):
+        index.add_table("sales", "refunds", [{"col_name": "reason", "data_type": "string"}])
+        index.replace_database("sales", {"Orders": ORDERS})
+        assert index.search("reason") == []
+        assert len(index) == 2
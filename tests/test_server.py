@@ -0,0 +1,76 @@
+import subprocess
+import sys
+import threading
+from unittest.mock import patch
+
+from spark_sql_mcp import server
+from spark_sql_mcp.config import SparkConfig
+
+
+class TestStartup:
+    def test_import_does_not_load_thrift_stack(self):
+        probe = (
+            "import sys, spark_sql_mcp.server; "
+            "print(sorted(m for m in ('pyhive', 'thrift', 'TCLIService') if m in sys.modules))"
+        )
+        out = subprocess.run(
+            [sys.executable, "-c", probe], check=True, capture_output=True, text=True
+        ).stdout
+        assert out.strip() == "[]"
+
+    def test_main_does_not_connect(self, monkeypatch):
+        monkeypatch.setenv("SPARK_HOST", "localhost")
+        monkeypatch.delenv("SPARK_PREWARM", raising=False)
+        with (
+            patch.object(server.mcp, "run"),
+            patch.object(server.SparkSQLClient, "connect") as connect,
+        ):
+            server.main()
+        connect.assert_not_called()
+
+    def test_prewarm_connects_in_background(self, monkeypatch):
+        monkeypatch.setenv("SPARK_HOST", "localhost")
+        monkeypatch.setenv("SPARK_PREWARM", "true")
+        connected = threading.Event()
+        with (
+            patch.object(server.mcp, "run"),
+            patch.object(server.SparkSQLClient, "connect", side_effect=connected.set),
+        ):
+            server.main()
+            assert connected.wait(5)
+
+    def test_prewarm_failure_is_logged(self, caplog):
+        client = server.SparkSQLClient(SparkConfig(host="localhost"))
+        with patch.object(client, "connect", side_effect=ConnectionError("down")):
+            server._prewarm(client)
+        assert "Pre-warming" in caplog.text
+
+    def test_catalog_loaded_and_revalidated(self, monkeypatch, tmp_path):
+        monkeypatch.setenv("SPARK_HOST", "localhost")
+        monkeypatch.setenv("SPARK_CATALOG_DIR", str(tmp_path))
+        revalidated = threading.Event()
+        with (
+            patch.object(server.mcp, "run"),
+            patch.object(server.SparkSQLClient, "load_catalog") as load,
+            patch.object(
+                server.SparkSQLClient, "revalidate_catalog",
+                side_effect=lambda: revalidated.set() or 0,
+            ),
+        ):
+            server.main()
+            assert revalidated.wait(5)
+        load.assert_called_once()
+
+    def test_schema_index_crawled_when_enabled(self, monkeypatch):
+        monkeypatch.setenv("SPARK_HOST", "localhost")
+        monkeypatch.setenv("SPARK_SEARCH_INDEX_INTERVAL", "600")
+        crawled = threading.Event()
+        with (
+            patch.object(server.mcp, "run"),
+            patch.object(
+                server.SparkSQLClient, "refresh_schema_index",
+                side_effect=lambda: crawled.set() or 0,
+            ),
+        ):
+            server.main()
+            assert crawled.wait(5)
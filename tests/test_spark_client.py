@@ -1,8 +1,30 @@
-from unittest.mock import patch
+import threading
+import time
+from unittest.mock import MagicMock, patch
 
 import pytest
+from pyhive import hive
+from TCLIService.ttypes import (
+    TColumn,
+    TFetchResultsResp,
+    TI64Column,
+    TOperationState,
+    TRowSet,
+    TStatus,
+    TStatusCode,
+)
+from thrift.transport.TTransport import TTransportException
 
-from spark_sql_mcp.spark_client import SparkSQLClient, _validate_identifier
+from spark_sql_mcp.config import SparkConfig
+from spark_sql_mcp.executor import CancelToken, QueryCancelledError
+from spark_sql_mcp.metrics import Instrumentation
+from spark_sql_mcp.pool import ConnectionPool, PoolTimeoutError
+from spark_sql_mcp.spark_client import (
+    SparkSQLClient,
+    _is_disconnect,
+    _validate_identifier,
+    _wait_for_completion,
+)
 
 
 class TestValidateIdentifier:
@@ -29,12 +51,15 @@ class TestValidateIdentifier:
 
 
 class TestSparkSQLClient:
-    def test_not_connected_raises(self, spark_config):
+    @patch("pyhive.hive.Connection")
+    def test_connects_lazily(self, mock_conn_cls, spark_config, mock_hive_connection):
+        mock_conn_cls.return_value = mock_hive_connection
         client = SparkSQLClient(spark_config)
-        with pytest.raises(RuntimeError, match="Not connected"):
-            client.connection
+        mock_conn_cls.assert_not_called()
+        client.query("SELECT 1")
+        mock_conn_cls.assert_called_once()
 
-    @patch("spark_sql_mcp.spark_client.hive.Connection")
+    @patch("pyhive.hive.Connection")
     def test_connect(self, mock_conn_cls, spark_config):
         client = SparkSQLClient(spark_config)
         client.connect()
@@ -52,6 +77,31 @@ class TestSparkSQLClient:
         assert results == [{"id": 1, "name": "alice"}, {"id": 2, "name": "bob"}]
         mock_hive_cursor.close.assert_called_once()
 
+    def test_execute_query_limit_stops_fetching(
+        self, connected_client, mock_hive_cursor, serve_rows
+    ):
+        serve_rows([(i, f"user{i}") for i in range(10)])
+        results = connected_client.execute_query("SELECT * FROM users", limit=3)
+        assert [r["id"] for r in results] == [0, 1, 2]
+        mock_hive_cursor.fetchmany.assert_called_once_with(3)
+        mock_hive_cursor.cancel.assert_called_once()
+
+    def test_execute_query_fetches_in_batches(self, mock_hive_connection, serve_rows):
+        client = SparkSQLClient(SparkConfig(host="localhost", fetch_size=4))
+        client._pool = ConnectionPool(lambda: mock_hive_connection)
+        serve_rows([(i, "x") for i in range(10)])
+        assert len(client.execute_query("SELECT * FROM users")) == 10
+        cursor = mock_hive_connection.cursor.return_value
+        assert [c.args for c in cursor.fetchmany.call_args_list] == [(4,), (4,), (4,), (4,)]
+        cursor.cancel.assert_not_called()
+
+    def test_iter_query_early_exit_releases_connection(self, connected_client, mock_hive_cursor):
+        rows = connected_client.iter_query("SELECT * FROM users")
+        assert next(rows) == {"id": 1, "name": "alice"}
+        rows.close()
+        mock_hive_cursor.close.assert_called_once()
+        assert connected_client.pool_stats().in_use == 0
+
     def test_execute_query_no_results(self, connected_client, mock_hive_cursor):
         mock_hive_cursor.description = None
         results = connected_client.execute_query("CREATE TABLE t (id INT)")
@@ -63,19 +113,19 @@ class TestSparkSQLClient:
             connected_client.execute_query("BAD SQL")
         mock_hive_cursor.close.assert_called_once()
 
-    def test_list_databases(self, connected_client, mock_hive_cursor):
+    def test_list_databases(self, connected_client, mock_hive_cursor, serve_rows):
         mock_hive_cursor.description = [("databaseName",)]
-        mock_hive_cursor.fetchall.return_value = [("default",), ("analytics",)]
+        serve_rows([("default",), ("analytics",)])
         assert connected_client.list_databases() == ["default", "analytics"]
 
-    def test_list_tables(self, connected_client, mock_hive_cursor):
+    def test_list_tables(self, connected_client, mock_hive_cursor, serve_rows):
         mock_hive_cursor.description = [("tableName",)]
-        mock_hive_cursor.fetchall.return_value = [("users",), ("orders",)]
+        serve_rows([("users",), ("orders",)])
         assert connected_client.list_tables() == ["users", "orders"]
 
-    def test_describe_table(self, connected_client, mock_hive_cursor):
+    def test_describe_table(self, connected_client, mock_hive_cursor, serve_rows):
         mock_hive_cursor.description = [("col_name",), ("data_type",), ("comment",)]
-        mock_hive_cursor.fetchall.return_value = [("id", "int", ""), ("name", "string", "")]
+        serve_rows([("id", "int", ""), ("name", "string", "")])
         result = connected_client.describe_table("users")
         assert result == [
             {"col_name": "id", "data_type": "int", "comment": ""},
@@ -85,19 +135,804 @@ class TestSparkSQLClient:
     def test_close(self, connected_client, mock_hive_connection):
         connected_client.close()
         mock_hive_connection.close.assert_called_once()
-        assert connected_client._connection is None
+        assert connected_client._pool is None
 
     def test_close_when_not_connected(self, spark_config):
         client = SparkSQLClient(spark_config)
         client.close()  # should not raise
 
-    @patch("spark_sql_mcp.spark_client.hive.Connection")
-    def test_connect_error_sanitized(self, mock_conn_cls, spark_config):
+    @patch("pyhive.hive.Connection")
+    def test_connect_error_sanitized(self, mock_conn_cls):
         mock_conn_cls.side_effect = Exception("secret connection details here")
-        client = SparkSQLClient(spark_config)
+        client = SparkSQLClient(SparkConfig(host="localhost", reconnect_attempts=1))
         with pytest.raises(ConnectionError, match="Failed to connect") as exc_info:
             client.connect()
         # Original exception details should not leak
         assert "secret connection details" not in str(exc_info.value)
         # Should not chain the original exception
         assert exc_info.value.__cause__ is None
+
+    @patch("pyhive.hive.Connection")
+    def test_connect_opens_min_pool_size(self, mock_conn_cls):
+        client = SparkSQLClient(SparkConfig(host="localhost", pool_min_size=2))
+        client.connect()
+        assert mock_conn_cls.call_count == 2
+        assert client.pool_stats().idle == 2
+
+    def test_pool_stats_not_connected(self, spark_config):
+        assert SparkSQLClient(spark_config).pool_stats() is None
+
+    def test_execute_query_returns_connection(self, connected_client):
+        connected_client.execute_query("SELECT 1")
+        stats = connected_client.pool_stats()
+        assert stats.in_use == 0
+        assert stats.checkouts == 1
+
+
+class TestWaitForCompletion:
+    def test_polls_until_finished(self, mock_hive_cursor):
+        running = MagicMock(operationState=TOperationState.RUNNING_STATE)
+        finished = MagicMock(operationState=TOperationState.FINISHED_STATE)
+        mock_hive_cursor.poll.side_effect = [running, running, finished]
+        _wait_for_completion(mock_hive_cursor, CancelToken())
+        assert mock_hive_cursor.poll.call_count == 3
+
+    def test_error_state_raises(self, mock_hive_cursor):
+        mock_hive_cursor.poll.return_value = MagicMock(
+            operationState=TOperationState.ERROR_STATE, errorMessage="Table not found"
+        )
+        with pytest.raises(hive.OperationalError, match="Table not found"):
+            _wait_for_completion(mock_hive_cursor, CancelToken())
+
+    def test_cancelled_token_cancels_operation(self, mock_hive_cursor):
+        token = CancelToken()
+        token.cancel()
+        with pytest.raises(QueryCancelledError):
+            _wait_for_completion(mock_hive_cursor, token)
+        mock_hive_cursor.cancel.assert_called_once()
+
+    def test_execute_query_runs_async(self, connected_client, mock_hive_cursor):
+        connected_client.execute_query("SELECT 1")
+        mock_hive_cursor.execute.assert_called_once_with("SELECT 1", async_=True)
+
+
+class TestExplain:
+    PLAN = (
+        "== Optimized Logical Plan ==\n"
+        "Relation sales.events[id#1] parquet, Statistics(sizeInBytes=2.0 GiB, rowCount=1000)\n"
+    )
+
+    def test_explain_cached_per_normalized_sql(
+        self, connected_client, mock_hive_cursor, serve_rows
+    ):
+        mock_hive_cursor.description = [("plan",)]
+        serve_rows([(self.PLAN,)])
+        estimate = connected_client.explain("SELECT *  FROM sales.events")
+        assert estimate.scan_bytes == 2 << 30
+        assert estimate.scan_rows == 1000
+        assert connected_client.explain("SELECT * FROM sales.events") is estimate
+        mock_hive_cursor.execute.assert_called_once_with(
+            "EXPLAIN COST SELECT *  FROM sales.events", async_=True
+        )
+
+    def test_refresh_metadata_drops_plans(self, connected_client, mock_hive_cursor, serve_rows):
+        mock_hive_cursor.description = [("plan",)]
+        serve_rows([(self.PLAN,)])
+        connected_client.explain("SELECT * FROM sales.events")
+        connected_client.invalidate_metadata("sales")
+        serve_rows([(self.PLAN,)])
+        connected_client.explain("SELECT * FROM sales.events")
+        assert mock_hive_cursor.execute.call_count == 2
+
+
+class TestProfileTable:
+    @pytest.fixture
+    def describe_then_profile(self, mock_hive_cursor, serve_rows):
+        """Answer the DESCRIBE and then the profile query."""
+        responses = iter([
+            ([("col_name",), ("data_type",), ("comment",)],
+             [("id", "int", ""), ("name", "string", "")]),
+            ([("row_count",), ("c0_non_null",), ("c0_distinct",), ("c0_min",), ("c0_max",),
+              ("c0_p0",), ("c0_p1",), ("c0_p2",), ("c1_non_null",), ("c1_distinct",),
+              ("c1_min",), ("c1_max",)],
+             [(10, 10, 10, 1, 10, 3, 5, 8, 8, 7, "a", "z")]),
+        ])
+
+        def execute(sql, async_=False):
+            description, rows = next(responses)
+            mock_hive_cursor.description = description
+            serve_rows(rows)
+
+        mock_hive_cursor.execute.side_effect = execute
+
+    def test_single_aggregate_query(
+        self, connected_client, mock_hive_cursor, describe_then_profile
+    ):
+        profile = connected_client.profile_table("users", "sales")
+        assert profile.row_count == 10
+        assert profile.columns.column("nulls") == [0, 2]
+        assert profile.columns.column("p50") == [5, None]
+        assert mock_hive_cursor.execute.call_count == 2
+        assert mock_hive_cursor.execute.call_args_list[1].args[0].endswith("FROM sales.users")
+
+    def test_cached(self, connected_client, mock_hive_cursor, describe_then_profile):
+        first = connected_client.profile_table("users", "sales")
+        assert connected_client.profile_table("USERS", "sales") is first
+        assert mock_hive_cursor.execute.call_count == 2
+        assert connected_client.invalidate_metadata("sales", "users") == 2
+
+    def test_unknown_column(self, connected_client, mock_hive_cursor, serve_rows):
+        mock_hive_cursor.description = [("col_name",), ("data_type",)]
+        serve_rows([("id", "int")])
+        with pytest.raises(ValueError, match="Unknown column"):
+            connected_client.profile_table("users", columns=["id", "nope"])
+
+
+class TestDescribeTables:
+    INFORMATION = (
+        "Table: orders\nPartition Columns: [`dt`]\nSchema: root\n"
+        " |-- id: long (nullable = true)\n |-- dt: string (nullable = true)\n"
+    )
+    NESTED = (
+        "Table: events\nSchema: root\n |-- tags: array (nullable = true)\n"
+        " |    |-- element: string (containsNull = true)\n"
+    )
+
+    @pytest.fixture
+    def spark_config(self):
+        # One DESCRIBE at a time, so the shared mock cursor answers them in order.
+        return SparkConfig(host="localhost", pool_max_size=1)
+
+    @pytest.fixture
+    def catalog(self, mock_hive_cursor, serve_rows):
+        """Answer SHOW TABLES, SHOW TABLE EXTENDED and DESCRIBE by statement."""
+        extended = [
+            ("sales", "orders", False, self.INFORMATION),
+            ("sales", "events", False, self.NESTED),
+        ]
+        responses = {
+            "SHOW TABLES": ([("tableName",)], [("orders",), ("events",), ("users",)]),
+            "SHOW TABLE EXTENDED": (
+                [("database",), ("tableName",), ("isTemporary",), ("information",)], extended
+            ),
+            "DESCRIBE": ([("col_name",), ("data_type",), ("comment",)], [("id", "int", "pk")]),
+        }
+
+        def execute(sql, async_=False):
+            prefix = next(p for p in responses if sql.startswith(p))
+            mock_hive_cursor.description, rows = responses[prefix]
+            serve_rows(rows)
+
+        mock_hive_cursor.execute.side_effect = execute
+        return responses
+
+    @staticmethod
+    def _statements(cursor):
+        return [c.args[0] for c in cursor.execute.call_args_list]
+
+    def test_extended_then_describe_for_the_rest(self, connected_client, mock_hive_cursor, catalog):
+        schemas = connected_client.describe_tables("sales")
+        assert list(schemas) == ["events", "orders", "users"]
+        assert schemas["orders"][:2] == [
+            {"col_name": "id", "data_type": "bigint", "comment": None},
+            {"col_name": "dt", "data_type": "string", "comment": None},
+        ]
+        assert schemas["users"] == [{"col_name": "id", "data_type": "int", "comment": "pk"}]
+        assert self._statements(mock_hive_cursor) == [
+            "SHOW TABLES IN sales",
+            "SHOW TABLE EXTENDED IN sales LIKE '*'",
+            "DESCRIBE sales.events",
+            "DESCRIBE sales.users",
+        ]
+        # The per-table DESCRIBE results are cached for describe_table.
+        connected_client.describe_table("users", "sales")
+        assert mock_hive_cursor.execute.call_count == 4
+
+    def test_glob_filter(self, connected_client, mock_hive_cursor, catalog):
+        schemas = connected_client.describe_tables("sales", "ord*")
+        assert list(schemas) == ["orders"]
+        assert "SHOW TABLE EXTENDED IN sales LIKE 'ord*'" in self._statements(mock_hive_cursor)
+
+    def test_glob_not_understood_by_like(self, connected_client, mock_hive_cursor, catalog):
+        assert list(connected_client.describe_tables("sales", "user?")) == ["users"]
+        assert "SHOW TABLE EXTENDED IN sales LIKE '*'" in self._statements(mock_hive_cursor)
+
+    def test_cached_until_invalidated(self, connected_client, mock_hive_cursor, catalog):
+        connected_client.describe_tables("sales")
+        calls = mock_hive_cursor.execute.call_count
+        connected_client.describe_tables("SALES")
+        assert mock_hive_cursor.execute.call_count == calls
+        connected_client.invalidate_metadata("sales", "orders")
+        connected_client.describe_tables("sales")
+        assert mock_hive_cursor.execute.call_count > calls
+
+    def test_falls_back_when_extended_unsupported(
+        self, connected_client, mock_hive_cursor, serve_rows, catalog
+    ):
+        def execute(sql, async_=False):
+            if sql.startswith("SHOW TABLE EXTENDED"):
+                raise hive.OperationalError("ParseException")
+            prefix = next(p for p in catalog if sql.startswith(p))
+            mock_hive_cursor.description, rows = catalog[prefix]
+            serve_rows(rows)
+
+        mock_hive_cursor.execute.side_effect = execute
+        schemas = connected_client.describe_tables("sales")
+        assert all(rows[0]["data_type"] == "int" for rows in schemas.values())
+
+    def test_describes_concurrently(self):
+        import threading
+
+        client = SparkSQLClient(SparkConfig(host="localhost", pool_max_size=4))
+        barrier = threading.Barrier(3, timeout=5)
+        client.list_tables = lambda db: ["a", "b", "c"]
+        client._fetch_extended = lambda db, pattern: {}
+
+        def describe(table, database):
+            barrier.wait()
+            return [{"col_name": table, "data_type": "int"}]
+
+        client.describe_table = describe
+        schemas = client.describe_tables("sales")
+        assert [rows[0]["col_name"] for rows in schemas.values()] == ["a", "b", "c"]
+
+
+class TestCatalogSnapshot:
+    ORDERS = "Table: orders\nSchema: root\n |-- id: long (nullable = true)\n"
+    USERS = "Table: users\nSchema: root\n |-- id: long (nullable = true)\n"
+
+    @pytest.fixture
+    def cluster(self, mock_hive_cursor, serve_rows):
+        """A fake catalog answering each statement by prefix; tests edit it in place."""
+        state = {
+            "databases": ["sales"],
+            "tables": ["orders", "users"],
+            "extended": {"orders": self.ORDERS, "users": self.USERS},
+        }
+
+        def execute(sql, async_=False):
+            if sql.startswith("SHOW DATABASES"):
+                mock_hive_cursor.description = [("namespace",)]
+                serve_rows([(d,) for d in state["databases"]])
+            elif sql.startswith("SHOW TABLES"):
+                mock_hive_cursor.description = [("tableName",)]
+                serve_rows([(t,) for t in state["tables"]])
+            elif sql.startswith("SHOW TABLE EXTENDED"):
+                mock_hive_cursor.description = [
+                    ("database",), ("tableName",), ("isTemporary",), ("information",)
+                ]
+                serve_rows([("sales", t, False, i) for t, i in state["extended"].items()])
+            else:
+                mock_hive_cursor.description = [("col_name",), ("data_type",), ("comment",)]
+                serve_rows([("id", "bigint", sql.split()[-1])])
+
+        mock_hive_cursor.execute.side_effect = execute
+        return state
+
+    @pytest.fixture
+    def make_client(self, tmp_path, mock_hive_connection):
+        clients = []
+
+        def _make():
+            client = SparkSQLClient(SparkConfig(host="spark", catalog_dir=str(tmp_path)))
+            client._pool = ConnectionPool(lambda: mock_hive_connection)
+            clients.append(client)
+            return client
+
+        yield _make
+        for client in clients:
+            client.close()
+
+    @staticmethod
+    def _describes(cursor):
+        return [c.args[0] for c in cursor.execute.call_args_list if c.args[0].startswith("DESC")]
+
+    def test_warm_start_from_snapshot(self, make_client, mock_hive_cursor, cluster):
+        first = make_client()
+        first.list_databases()
+        first.list_tables("sales")
+        first.describe_table("orders", "sales")
+        first.close()
+        calls = mock_hive_cursor.execute.call_count
+
+        second = make_client()
+        assert second.load_catalog() == 3
+        assert second.list_databases() == ["sales"]
+        assert second.list_tables("sales") == ["orders", "users"]
+        assert second.describe_table("orders", "sales")[0]["comment"] == "sales.orders"
+        assert mock_hive_cursor.execute.call_count == calls
+
+    def test_revalidate_describes_only_changed_tables(
+        self, make_client, mock_hive_cursor, cluster
+    ):
+        client = make_client()
+        client.describe_table("orders", "sales")
+        client.describe_table("users", "sales")
+        # No fingerprints recorded yet, so the first pass describes both.
+        assert client.revalidate_catalog() == 2
+        assert client.revalidate_catalog() == 0
+
+        cluster["extended"]["users"] = self.USERS.replace("long", "string")
+        mock_hive_cursor.execute.reset_mock()
+        assert client.revalidate_catalog() == 1
+        assert self._describes(mock_hive_cursor) == ["DESCRIBE sales.users"]
+
+    def test_write_through_keeps_fingerprint(self, make_client, mock_hive_cursor, cluster):
+        client = make_client()
+        client.describe_table("orders", "sales")
+        assert client.revalidate_catalog() == 1
+        # An expired entry is fetched again and written through without a fingerprint.
+        client._metadata.invalidate()
+        client.describe_table("orders", "sales")
+        assert client.revalidate_catalog() == 0
+
+    def test_revalidate_renews_unchanged_entries(
+        self, make_client, mock_hive_cursor, cluster
+    ):
+        client = make_client()
+        client.describe_table("orders", "sales")
+        client.revalidate_catalog()
+        client._metadata.invalidate()
+        assert client.revalidate_catalog() == 0
+        mock_hive_cursor.execute.reset_mock()
+        assert client.describe_table("orders", "sales")[0]["comment"] == "sales.orders"
+        assert self._describes(mock_hive_cursor) == []
+
+    def test_revalidate_forgets_dropped_tables(self, make_client, mock_hive_cursor, cluster):
+        client = make_client()
+        client.describe_table("users", "sales")
+        client.revalidate_catalog()
+        cluster["tables"] = ["orders"]
+        del cluster["extended"]["users"]
+        client.revalidate_catalog()
+        assert make_client().load_catalog() == 2  # databases and tables listings only
+        mock_hive_cursor.execute.reset_mock()
+        client.describe_table("users", "sales")
+        assert self._describes(mock_hive_cursor) == ["DESCRIBE sales.users"]
+
+    def test_refresh_metadata_clears_snapshot(self, make_client, cluster):
+        client = make_client()
+        client.describe_table("orders", "sales")
+        client.invalidate_metadata("sales", "orders")
+        assert make_client().load_catalog() == 0
+
+    def test_unreadable_snapshot_ignored(self, make_client, tmp_path, caplog):
+        client = make_client()
+        client._catalog.load = MagicMock(side_effect=ValueError("bad json"))
+        assert client.load_catalog() == 0
+        assert "Could not read catalog snapshot" in caplog.text
+
+    def test_disabled_by_default(self, connected_client):
+        assert connected_client.load_catalog() == 0
+        assert connected_client.revalidate_catalog() == 0
+
+
+class TestSchemaSearchIndex:
+    @pytest.fixture
+    def spark_config(self):
+        return SparkConfig(host="localhost", pool_max_size=1)
+
+    @pytest.fixture
+    def cluster(self, mock_hive_cursor, serve_rows):
+        """Two databases, each answering SHOW TABLE EXTENDED; tests edit it in place."""
+        state = {"sales": ["orders", "refunds"], "crm": ["customers"]}
+
+        def execute(sql, async_=False):
+            db = sql.split()[-3] if "EXTENDED" in sql else sql.split()[-1]
+            if sql.startswith("SHOW DATABASES"):
+                mock_hive_cursor.description = [("namespace",)]
+                serve_rows([(d,) for d in state])
+            elif sql.startswith("SHOW TABLES"):
+                mock_hive_cursor.description = [("tableName",)]
+                serve_rows([(t,) for t in state[db]])
+            elif sql.startswith("SHOW TABLE EXTENDED"):
+                mock_hive_cursor.description = [
+                    ("database",), ("tableName",), ("isTemporary",), ("information",)
+                ]
+                serve_rows([
+                    (db, t, False, f"Schema: root\n |-- {t}_id: long (nullable = true)\n")
+                    for t in state[db]
+                ])
+            else:
+                mock_hive_cursor.description = [("col_name",), ("data_type",), ("comment",)]
+                serve_rows([("id", "bigint", "row key")])
+
+        mock_hive_cursor.execute.side_effect = execute
+        return state
+
+    def test_describe_table_indexes(self, connected_client, cluster):
+        connected_client.describe_table("orders", "sales")
+        [match] = connected_client.schema_index.search("row key")
+        assert (match.database, match.table, match.column) == ("sales", "orders", "id")
+        assert connected_client.stats()["schema_index"]["tables"] == 1
+
+    def test_describe_tables_indexes_database(self, connected_client, cluster):
+        connected_client.describe_tables("sales")
+        assert len(connected_client.schema_index) == 2
+        assert connected_client.schema_index.search("refunds_id")[0].table == "refunds"
+
+    def test_refresh_crawls_all_databases(self, connected_client, cluster):
+        assert connected_client.refresh_schema_index() == 3
+        cluster["sales"] = ["orders"]
+        del cluster["crm"]
+        assert connected_client.refresh_schema_index() == 1
+        assert connected_client.schema_index.search("customers") == []
+
+    def test_refresh_skips_failing_database(self, connected_client, cluster, caplog):
+        cluster["crm"] = None  # SHOW TABLES fails for crm
+        assert connected_client.refresh_schema_index() == 2
+        assert "Indexing schemas of database crm failed" in caplog.text
+
+    def test_invalidate_metadata_drops_from_index(self, connected_client, cluster):
+        connected_client.describe_tables("sales")
+        connected_client.invalidate_metadata("sales", "orders")
+        assert [m.table for m in connected_client.schema_index.search("id")] == ["refunds"]
+        connected_client.invalidate_metadata()
+        assert len(connected_client.schema_index) == 0
+        assert "schema_index" not in connected_client.stats()
+
+
+class TestFetchBackend:
+    @pytest.fixture
+    def row_sets(self, mock_hive_cursor):
+        """Serve one page of ids through ``FetchResults``, then an empty one."""
+        mock_hive_cursor.description = [("id", "BIGINT_TYPE")]
+
+        def response(values):
+            return TFetchResultsResp(
+                status=TStatus(statusCode=TStatusCode.SUCCESS_STATUS),
+                results=TRowSet(
+                    startRowOffset=0, rows=[],
+                    columns=[TColumn(i64Val=TI64Column(values=values, nulls=b"\x02"))],
+                ),
+            )
+
+        client = mock_hive_cursor._connection.client
+        client.FetchResults.side_effect = [response([1, 2, 3]), response([])]
+        return client
+
+    def _client(self, mock_hive_connection, backend):
+        client = SparkSQLClient(SparkConfig(host="localhost", fetch_backend=backend))
+        client._pool = ConnectionPool(lambda: mock_hive_connection)
+        return client
+
+    def test_columnar(self, mock_hive_connection, mock_hive_cursor, row_sets):
+        client = self._client(mock_hive_connection, "columnar")
+        assert client.query("SELECT id FROM t").rows == ((1,), (None,), (3,))
+        mock_hive_cursor.fetchmany.assert_not_called()
+        assert not client.arrow_results
+
+    def test_arrow_record_batches(self, mock_hive_connection, row_sets):
+        pytest.importorskip("pyarrow")
+        client = self._client(mock_hive_connection, "arrow")
+        assert client.arrow_results
+        [batch] = client.iter_record_batches("SELECT id FROM t")
+        assert batch.column(0).to_pylist() == [1, None, 3]
+
+    def test_arrow_falls_back_without_pyarrow(self, mock_hive_connection, row_sets, caplog):
+        with patch("spark_sql_mcp.columnar.arrow_available", return_value=False):
+            client = self._client(mock_hive_connection, "arrow")
+        assert not client.arrow_results
+        assert "needs pyarrow" in caplog.text
+        assert client.query("SELECT id FROM t").rows == ((1,), (None,), (3,))
+
+
+class TestSampleTable:
+    def test_sample_query(self, connected_client, mock_hive_cursor):
+        result = connected_client.sample_table("events", "sales", sample="2 PERCENT", limit=5)
+        mock_hive_cursor.execute.assert_called_once_with(
+            "SELECT * FROM sales.events TABLESAMPLE (2 PERCENT) LIMIT 5", async_=True
+        )
+        assert len(result) == 2
+
+    def test_invalid_table(self, connected_client):
+        with pytest.raises(ValueError, match="Invalid SQL identifier"):
+            connected_client.sample_table("events; DROP TABLE x")
+
+    def test_response_budget(self, connected_client, serve_rows):
+        serve_rows([(i, "x" * 100) for i in range(20)])
+        result = connected_client.sample_table("events", max_bytes=500, fmt="csv")
+        assert 1 <= len(result) < 20
+        assert result.truncation.rows_cut
+
+
+class TestMetadataCache:
+    def test_list_tables_cached(self, connected_client, mock_hive_cursor, serve_rows):
+        mock_hive_cursor.description = [("tableName",)]
+        serve_rows([("users",)])
+        assert connected_client.list_tables("sales") == ["users"]
+        assert connected_client.list_tables("SALES") == ["users"]
+        mock_hive_cursor.execute.assert_called_once()
+
+    def test_describe_table_returns_copies(self, connected_client, mock_hive_cursor, serve_rows):
+        mock_hive_cursor.description = [("col_name",), ("data_type",)]
+        serve_rows([("id", "int")])
+        connected_client.describe_table("users")[0]["data_type"] = "changed"
+        assert connected_client.describe_table("users") == [{"col_name": "id", "data_type": "int"}]
+
+    def test_invalidate_table(self, connected_client):
+        cache = connected_client._metadata
+        cache.put(("databases",), ("default",))
+        cache.put(("tables", "default"), ("users", "orders"))
+        cache.put(("columns", "default", "users"), ())
+        cache.put(("columns", "default", "orders"), ())
+        assert connected_client.invalidate_metadata(table="users") == 2
+        assert connected_client.stats()["metadata_cache"]["entries"] == 2
+
+    def test_invalidate_database(self, connected_client):
+        cache = connected_client._metadata
+        cache.put(("databases",), ("default", "sales"))
+        cache.put(("tables", "sales"), ("orders",))
+        cache.put(("columns", "sales", "orders"), ())
+        cache.put(("tables", "default"), ("users",))
+        assert connected_client.invalidate_metadata("sales") == 3
+
+    def test_invalidate_all(self, connected_client):
+        connected_client._metadata.put(("databases",), ("default",))
+        assert connected_client.invalidate_metadata() == 1
+
+    def test_cache_disabled(self, mock_hive_connection, mock_hive_cursor, serve_rows):
+        client = SparkSQLClient(SparkConfig(host="localhost", metadata_cache_ttl=0))
+        client._pool = ConnectionPool(lambda: mock_hive_connection)
+        mock_hive_cursor.description = [("databaseName",)]
+        serve_rows([("default",)])
+        client.list_databases()
+        client.list_databases()
+        assert mock_hive_cursor.execute.call_count == 2
+
+
+class TestResultCache:
+    @pytest.fixture
+    def caching_client(self, mock_hive_connection):
+        client = SparkSQLClient(SparkConfig(host="localhost", result_cache_ttl=60))
+        client._pool = ConnectionPool(lambda: mock_hive_connection)
+        return client
+
+    def test_disabled_by_default(self, connected_client, mock_hive_cursor):
+        connected_client.execute_query("SELECT 1", cached=True)
+        connected_client.execute_query("SELECT 1", cached=True)
+        assert mock_hive_cursor.execute.call_count == 2
+        assert "result_cache" not in connected_client.stats()
+
+    def test_concurrent_identical_queries_share_one_execution(
+        self, connected_client, mock_hive_cursor
+    ):
+        release = threading.Event()
+        mock_hive_cursor.execute.side_effect = lambda sql, async_=False: release.wait(2)
+        results = []
+        threads = [
+            threading.Thread(
+                target=lambda: results.append(
+                    connected_client.query("SELECT * FROM users", 10, cached=True)
+                )
+            )
+            for _ in range(3)
+        ]
+        for t in threads:
+            t.start()
+        while connected_client._results.stats().coalesced < 2:
+            time.sleep(0.001)
+        release.set()
+        for t in threads:
+            t.join(2)
+        mock_hive_cursor.execute.assert_called_once()
+        assert [len(r) for r in results] == [2, 2, 2]
+        assert connected_client.stats()["result_cache"]["coalesced"] == 2
+
+    def test_hit_on_normalized_sql(self, caching_client, mock_hive_cursor):
+        first = caching_client.execute_query("SELECT *  FROM users", limit=10, cached=True)
+        second = caching_client.execute_query(
+            "SELECT * -- all\nFROM users;", limit=10, cached=True
+        )
+        assert first == second == [{"id": 1, "name": "alice"}, {"id": 2, "name": "bob"}]
+        mock_hive_cursor.execute.assert_called_once()
+        stats = caching_client.stats()["result_cache"]
+        assert (stats["hits"], stats["misses"]) == (1, 1)
+        assert stats["bytes"] > 0
+
+    def test_limit_is_part_of_key(self, caching_client, mock_hive_cursor):
+        caching_client.execute_query("SELECT * FROM users", limit=10, cached=True)
+        caching_client.execute_query("SELECT * FROM users", limit=20, cached=True)
+        assert mock_hive_cursor.execute.call_count == 2
+
+    def test_uncached_call_skips_cache(self, caching_client, mock_hive_cursor):
+        caching_client.execute_query("SELECT * FROM users", cached=True)
+        caching_client.execute_query("SELECT * FROM users")
+        assert mock_hive_cursor.execute.call_count == 2
+
+    def test_byte_budget(self, mock_hive_connection, mock_hive_cursor):
+        client = SparkSQLClient(
+            SparkConfig(host="localhost", result_cache_ttl=60, result_cache_max_bytes=10)
+        )
+        client._pool = ConnectionPool(lambda: mock_hive_connection)
+        client.execute_query("SELECT * FROM users", cached=True)
+        assert client.stats()["result_cache"]["entries"] == 0
+
+
+class TestQuery:
+    def test_returns_query_result(self, connected_client):
+        result = connected_client.query("SELECT * FROM users")
+        assert result.columns == ("id", "name")
+        assert result.rows == ((1, "alice"), (2, "bob"))
+
+    def test_no_result_set(self, connected_client, mock_hive_cursor):
+        mock_hive_cursor.description = None
+        result = connected_client.query("SHOW TABLES")
+        assert result.columns == ()
+        assert not result
+
+
+class TestResponseBudget:
+    def test_stops_fetching_when_budget_used(
+        self, mock_hive_connection, mock_hive_cursor, serve_rows
+    ):
+        client = SparkSQLClient(SparkConfig(host="localhost", fetch_size=10))
+        client._pool = ConnectionPool(lambda: mock_hive_connection)
+        serve_rows([(i, "x" * 100) for i in range(1000)])
+        result = client.query("SELECT * FROM t", max_bytes=1000)
+        assert 1 <= len(result) < 10
+        assert result.truncation.rows_cut
+        assert mock_hive_cursor.fetchmany.call_count == 1
+        mock_hive_cursor.close.assert_called_once()
+
+    def test_caps_cells(self, mock_hive_connection, serve_rows):
+        client = SparkSQLClient(SparkConfig(host="localhost", max_cell_chars=8))
+        client._pool = ConnectionPool(lambda: mock_hive_connection)
+        serve_rows([(1, "a" * 100)])
+        result = client.query("SELECT * FROM t", max_bytes=10_000)
+        assert result.rows == ((1, "aaaaa..."),)
+        assert result.truncation.cells_cut == 1
+        assert not result.truncation.rows_cut
+
+    def test_budget_follows_format(
+        self, mock_hive_connection, mock_hive_cursor, serve_rows
+    ):
+        client = SparkSQLClient(SparkConfig(host="localhost"))
+        client._pool = ConnectionPool(lambda: mock_hive_connection)
+        mock_hive_cursor.description = [("identifier",), ("description",)]
+        serve_rows([(i, "x" * 10) for i in range(100)])
+        markdown = client.query("SELECT * FROM t", max_bytes=1000)
+        serve_rows([(i, "x" * 10) for i in range(100)])
+        jsonl = client.query("SELECT * FROM t", max_bytes=1000, fmt="jsonl")
+        # Each JSON line repeats the column names.
+        assert len(jsonl) < len(markdown)
+
+    def test_within_budget(self, connected_client):
+        result = connected_client.query("SELECT * FROM t", max_bytes=10_000)
+        assert len(result) == 2
+        assert result.truncation is None
+
+
+class TestReconnect:
+    @pytest.fixture
+    def config(self):
+        return SparkConfig(host="localhost", reconnect_backoff=0, liveness_interval=0)
+
+    @patch("pyhive.hive.Connection")
+    def test_connect_retries_with_backoff(self, mock_conn_cls, config):
+        mock_conn_cls.side_effect = [OSError("refused"), OSError("refused"), MagicMock()]
+        client = SparkSQLClient(config)
+        client.connect()
+        assert mock_conn_cls.call_count == 3
+        stats = client.stats()["connections"]
+        assert stats["connects"] == 1
+        assert stats["connect_failures"] == 2
+
+    @patch("pyhive.hive.Connection")
+    def test_connect_gives_up_after_attempts(self, mock_conn_cls, config):
+        mock_conn_cls.side_effect = OSError("refused")
+        client = SparkSQLClient(config)
+        with pytest.raises(ConnectionError):
+            client.connect()
+        assert mock_conn_cls.call_count == config.reconnect_attempts
+
+    @patch("pyhive.hive.Connection")
+    def test_unreachable_until_a_connect_succeeds(self, mock_conn_cls, config):
+        mock_conn_cls.side_effect = OSError("refused")
+        client = SparkSQLClient(config)
+        assert client.reachable
+        with pytest.raises(ConnectionError):
+            client.connect()
+        assert not client.reachable
+        mock_conn_cls.side_effect = None
+        client.connect()
+        assert client.reachable
+
+    def test_read_only_query_retried_on_transport_error(
+        self, config, mock_hive_connection, mock_hive_cursor
+    ):
+        client = SparkSQLClient(config)
+        client._pool = ConnectionPool(
+            lambda: mock_hive_connection, is_disconnect=client._on_disconnect
+        )
+        mock_hive_cursor.execute.side_effect = [TTransportException(), None]
+        result = client.query("SELECT * FROM users")
+        assert len(result) == 2
+        stats = client.stats()["connections"]
+        assert stats["disconnects"] == 1
+        assert stats["retried_queries"] == 1
+
+    def test_pool_timeout_not_retried(self, config, mock_hive_connection):
+        client = SparkSQLClient(config)
+        client._pool = ConnectionPool(
+            lambda: mock_hive_connection, max_size=1, timeout=0.05,
+            is_disconnect=client._on_disconnect,
+        )
+        held = client._pool.acquire()
+        try:
+            with pytest.raises(PoolTimeoutError):
+                client.query("SELECT * FROM users")
+        finally:
+            client._pool.release(held)
+        stats = client.stats()["connections"]
+        assert stats["retried_queries"] == 0
+        assert stats["disconnects"] == 0
+
+    def test_write_statement_not_retried(self, config, mock_hive_connection, mock_hive_cursor):
+        client = SparkSQLClient(config)
+        client._pool = ConnectionPool(lambda: mock_hive_connection)
+        mock_hive_cursor.execute.side_effect = [EOFError(), None]
+        with pytest.raises(EOFError):
+            client.query("INSERT INTO t VALUES (1)")
+        assert mock_hive_cursor.execute.call_count == 1
+
+    def test_sql_error_not_retried(self, connected_client, mock_hive_cursor):
+        mock_hive_cursor.execute.side_effect = hive.OperationalError("Table not found")
+        with pytest.raises(hive.OperationalError):
+            connected_client.query("SELECT * FROM missing")
+        assert mock_hive_cursor.execute.call_count == 1
+
+    def test_health_check_probes_idle_connections(self, config):
+        client = SparkSQLClient(config)
+        conn = MagicMock()
+        conn.client.GetInfo.return_value.status.statusCode = TStatusCode.SUCCESS_STATUS
+        assert client._health_check(conn, idle=60)
+        conn.client.GetInfo.return_value.status.statusCode = TStatusCode.ERROR_STATUS
+        assert not client._health_check(conn, idle=60)
+
+    def test_health_check_skips_probe_for_recent_connections(self):
+        client = SparkSQLClient(SparkConfig(host="localhost", liveness_interval=30))
+        conn = MagicMock()
+        assert client._health_check(conn, idle=1)
+        conn.client.GetInfo.assert_not_called()
+
+    def test_health_check_closed_transport(self, config):
+        conn = MagicMock()
+        conn._transport.isOpen.return_value = False
+        assert not SparkSQLClient(config)._health_check(conn, idle=0)
+
+
+class TestIsDisconnect:
+    def test_transport_errors(self):
+        assert _is_disconnect(TTransportException())
+        assert _is_disconnect(EOFError())
+        assert _is_disconnect(ConnectionResetError())
+
+    def test_expired_session(self):
+        assert _is_disconnect(hive.OperationalError("Invalid SessionHandle: abc"))
+
+    def test_sql_error(self):
+        assert not _is_disconnect(hive.OperationalError("Table or view not found"))
+        assert not _is_disconnect(ValueError("bad"))
+
+    def test_timeouts(self):
+        assert not _is_disconnect(PoolTimeoutError())
+        assert not _is_disconnect(TimeoutError())
+
+
+class TestInstrumentation:
+    def test_query_span_attributes(self, connected_client):
+        sink = MagicMock()
+        connected_client.instrumentation = Instrumentation(sink)
+        connected_client.query("SELECT  *  FROM users")
+        span = sink.on_end.call_args.args[0]
+        assert span.name == "spark.query"
+        assert span.attributes["sql"] == "SELECT * FROM users"
+        assert span.attributes["rows"] == 2
+        assert span.attributes["bytes"] > 0
+        assert "execute_ms" in span.attributes
+        assert "fetch_ms" in span.attributes
+
+    def test_stats_include_timings(self, connected_client):
+        connected_client.query("SELECT 1")
+        assert connected_client.stats()["timings"]["spark.query.count"] == 1
@@ -0,0 +1,265 @@
+import pytest
+
+from spark_sql_mcp.sql import (
+    apply_limit,
+    apply_sample,
+    approximate_aggregates,
+    is_read_only,
+    normalize,
+    parse_sample,
+    significant_tokens,
+    table_references,
+    tokenize,
+)
+
+
+class TestTokenize:
+    def test_kinds(self):
+        kinds = [t.kind for t in tokenize("SELECT 'a;b', `x` -- c\nFROM t;")]
+        assert kinds == [
+            "word", "ws", "string", "punct", "ws", "quoted", "ws", "comment", "ws",
+            "word", "ws", "word", "semicolon",
+        ]
+
+    def test_block_comment(self):
+        tokens = tokenize("SELECT /* LIMIT 5 */ 1")
+        assert tokens[2].kind == "comment"
+
+    def test_unterminated_string(self):
+        tokens = tokenize("SELECT 'abc")
+        assert tokens[-1].kind == "string"
+
+    def test_multiple_statements_rejected(self):
+        with pytest.raises(ValueError, match="single SQL statement"):
+            significant_tokens("SELECT 1; DROP TABLE users")
+
+    def test_trailing_semicolons_dropped(self):
+        assert [t.text for t in significant_tokens("SELECT 1;;")] == ["SELECT", "1"]
+
+
+class TestApplyLimit:
+    def test_appends_limit(self):
+        assert apply_limit("SELECT * FROM t", 100) == "SELECT * FROM t LIMIT 100"
+
+    def test_tightens_larger_limit(self):
+        assert apply_limit("SELECT * FROM t LIMIT 1000000", 100) == "SELECT * FROM t LIMIT 100"
+
+    def test_keeps_smaller_limit(self):
+        assert apply_limit("SELECT * FROM t limit 5", 100) == "SELECT * FROM t limit 5"
+
+    def test_limit_all(self):
+        assert apply_limit("SELECT * FROM t LIMIT ALL", 10) == "SELECT * FROM t LIMIT 10"
+
+    def test_subquery_limit_ignored(self):
+        sql = "SELECT * FROM (SELECT * FROM t LIMIT 5) s"
+        assert apply_limit(sql, 100) == f"{sql} LIMIT 100"
+
+    def test_cte_limit_ignored(self):
+        sql = "WITH c AS (SELECT * FROM t LIMIT 5) SELECT * FROM c"
+        assert apply_limit(sql, 100) == f"{sql} LIMIT 100"
+
+    def test_string_literal_ignored(self):
+        sql = "SELECT * FROM t WHERE note = 'no limit'"
+        assert apply_limit(sql, 100) == f"{sql} LIMIT 100"
+
+    def test_quoted_column_named_limit(self):
+        sql = "SELECT `limit` FROM t"
+        assert apply_limit(sql, 100) == f"{sql} LIMIT 100"
+
+    def test_outer_limit_with_inner_limit(self):
+        sql = "SELECT * FROM (SELECT * FROM t LIMIT 5) s LIMIT 500"
+        assert apply_limit(sql, 100) == "SELECT * FROM (SELECT * FROM t LIMIT 5) s LIMIT 100"
+
+    def test_trailing_semicolon(self):
+        assert apply_limit("SELECT * FROM t;", 10) == "SELECT * FROM t LIMIT 10"
+
+    def test_trailing_line_comment(self):
+        assert apply_limit("SELECT * FROM t -- all rows", 10) == "SELECT * FROM t LIMIT 10"
+
+    def test_limit_in_comment_ignored(self):
+        sql = "SELECT * FROM /* LIMIT 5 */ t"
+        assert apply_limit(sql, 10) == f"{sql} LIMIT 10"
+
+    def test_inserts_before_offset(self):
+        assert (
+            apply_limit("SELECT * FROM t ORDER BY id OFFSET 20", 10)
+            == "SELECT * FROM t ORDER BY id LIMIT 10 OFFSET 20"
+        )
+
+    def test_tightens_limit_with_offset(self):
+        assert (
+            apply_limit("SELECT * FROM t LIMIT 50 OFFSET 20", 10)
+            == "SELECT * FROM t LIMIT 10 OFFSET 20"
+        )
+
+    def test_expression_limit_left_alone(self):
+        assert apply_limit("SELECT * FROM t LIMIT 2 * 5", 3) == "SELECT * FROM t LIMIT 2 * 5"
+
+    def test_unquoted_column_named_limit(self):
+        for sql in (
+            "SELECT limit FROM t",
+            "SELECT id FROM t WHERE limit > 3",
+            "SELECT id FROM t ORDER BY limit",
+        ):
+            assert apply_limit(sql, 10) == f"{sql} LIMIT 10"
+
+    def test_column_named_limit_in_arithmetic(self):
+        for sql in (
+            "SELECT limit - 1 AS x FROM t",
+            "SELECT * FROM t ORDER BY limit + 0",
+            "SELECT id, limit * 2 FROM t",
+            "SELECT id FROM t WHERE limit IN (1, 2)",
+        ):
+            assert apply_limit(sql, 10) == f"{sql} LIMIT 10"
+
+    def test_column_named_limit_with_limit_clause(self):
+        assert (
+            apply_limit("SELECT limit FROM t ORDER BY limit LIMIT 50", 10)
+            == "SELECT limit FROM t ORDER BY limit LIMIT 10"
+        )
+
+    def test_function_limit_left_alone(self):
+        sql = "SELECT * FROM t LIMIT CAST('5' AS INT)"
+        assert apply_limit(sql, 3) == sql
+
+    def test_show_not_limited(self):
+        assert apply_limit("SHOW TABLES;", 10) == "SHOW TABLES"
+
+    def test_explain_not_limited(self):
+        assert apply_limit("EXPLAIN SELECT * FROM t", 10) == "EXPLAIN SELECT * FROM t"
+
+    def test_multiple_statements_rejected(self):
+        with pytest.raises(ValueError, match="single SQL statement"):
+            apply_limit("SELECT 1; SELECT 2", 10)
+
+    def test_invalid_limit(self):
+        with pytest.raises(ValueError, match="positive integer"):
+            apply_limit("SELECT 1", 0)
+
+
+class TestNormalize:
+    def test_collapses_whitespace_and_comments(self):
+        assert normalize("  SELECT *\n\tFROM t -- note\n;") == "SELECT * FROM t"
+
+    def test_preserves_string_contents(self):
+        assert normalize("SELECT 'a   b'") == "SELECT 'a   b'"
+
+    def test_preserves_identifier_case(self):
+        assert normalize("select Id from T") == "select Id from T"
+
+
+class TestIsReadOnly:
+    def test_select(self):
+        assert is_read_only("  select 1")
+
+    def test_describe(self):
+        assert is_read_only("DESC users")
+
+    def test_insert(self):
+        assert not is_read_only("INSERT INTO t VALUES (1)")
+
+    def test_multiple_statements(self):
+        assert not is_read_only("SELECT 1; DROP TABLE t")
+
+    def test_empty(self):
+        assert not is_read_only("-- nothing")
+
+
+class TestTableReferences:
+    @staticmethod
+    def _names(sql):
+        return [(ref.database, ref.table) for ref in table_references(sql)]
+
+    def test_qualified_and_joined(self):
+        sql = "SELECT * FROM sales.orders o JOIN `dim`.`customers` AS c ON o.id = c.id"
+        assert self._names(sql) == [("sales", "orders"), ("dim", "customers")]
+
+    def test_comma_separated_from_list(self):
+        assert self._names("SELECT * FROM a.x, y AS t, b.z WHERE 1 = 1") == [
+            ("a", "x"), (None, "y"), ("b", "z"),
+        ]
+
+    def test_subqueries_included(self):
+        sql = "SELECT * FROM (SELECT id FROM a.x) t WHERE id IN (SELECT id FROM b.y)"
+        assert self._names(sql) == [("a", "x"), ("b", "y")]
+
+    def test_cte_names_skipped(self):
+        sql = "WITH recent AS (SELECT * FROM a.x) SELECT * FROM recent JOIN b.y ON 1 = 1"
+        assert self._names(sql) == [("a", "x"), ("b", "y")]
+
+    def test_function_from_is_not_a_table(self):
+        assert self._names("SELECT extract(year FROM ts) FROM a.x") == [("a", "x")]
+
+    def test_table_valued_function_skipped(self):
+        assert self._names("SELECT * FROM range(10)") == []
+
+    def test_literals_and_comments_ignored(self):
+        assert self._names("SELECT 'from a.b' FROM t -- from c.d") == [(None, "t")]
+
+    def test_positions(self):
+        sql = "SELECT * FROM sales.orders WHERE 1 = 1"
+        ref = table_references(sql)[0]
+        assert sql[ref.start:ref.end] == "sales.orders"
+
+
+class TestParseSample:
+    @pytest.mark.parametrize("spec, expected", [
+        ("1%", "1 PERCENT"),
+        (" 0.5 percent", "0.5 PERCENT"),
+        ("1000 rows", "1000 ROWS"),
+        ("1 ROW", "1 ROWS"),
+    ])
+    def test_valid(self, spec, expected):
+        assert parse_sample(spec) == expected
+
+    @pytest.mark.parametrize("spec", ["", "10", "abc%", "0%", "101%", "1.5 rows", "0 rows"])
+    def test_invalid(self, spec):
+        with pytest.raises(ValueError):
+            parse_sample(spec)
+
+
+class TestApplySample:
+    def test_every_table_sampled_before_alias(self):
+        sql = "SELECT * FROM a.x o JOIN b.y AS c ON o.id = c.id"
+        assert apply_sample(sql, "1 PERCENT") == (
+            "SELECT * FROM a.x TABLESAMPLE (1 PERCENT) o "
+            "JOIN b.y TABLESAMPLE (1 PERCENT) AS c ON o.id = c.id"
+        )
+
+    def test_existing_tablesample_kept(self):
+        sql = "SELECT * FROM x TABLESAMPLE (10 ROWS)"
+        assert apply_sample(sql, "1 PERCENT") == sql
+
+    def test_cte_sampled_at_source(self):
+        sql = "WITH t AS (SELECT * FROM a.x) SELECT * FROM t"
+        assert apply_sample(sql, "5 PERCENT") == (
+            "WITH t AS (SELECT * FROM a.x TABLESAMPLE (5 PERCENT)) SELECT * FROM t"
+        )
+
+    def test_non_query_rejected(self):
+        with pytest.raises(ValueError, match="SELECT and WITH"):
+            apply_sample("SHOW TABLES FROM sales", "1 PERCENT")
+
+
+class TestApproximateAggregates:
+    def test_count_distinct(self):
+        assert approximate_aggregates("SELECT count( DISTINCT user_id ) FROM t") == (
+            "SELECT approx_count_distinct(user_id ) FROM t", ["COUNT(DISTINCT)"]
+        )
+
+    def test_multi_column_count_distinct_left_alone(self):
+        sql = "SELECT COUNT(DISTINCT a, b) FROM t"
+        assert approximate_aggregates(sql) == (sql, [])
+
+    def test_percentile_and_median(self):
+        sql, replaced = approximate_aggregates(
+            "SELECT percentile(latency, 0.99), median(f(x, y)) FROM t"
+        )
+        assert sql == (
+            "SELECT percentile_approx(latency, 0.99), percentile_approx(f(x, y), 0.5) FROM t"
+        )
+        assert replaced == ["percentile", "median"]
+
+    def test_literals_untouched(self):
+        sql = "SELECT 'median(x)' AS label FROM t"
+        assert approximate_aggregates(sql) == (sql, [])
@@ -1,9 +1,26 @@
+import asyncio
+import threading
+import time
+from dataclasses import asdict
 from unittest.mock import MagicMock
 
 import pytest
 from mcp.server.fastmcp import FastMCP
 
+from spark_sql_mcp.admission import AdmissionController
+from spark_sql_mcp.budget import Truncation
+from spark_sql_mcp.config import SparkConfig
+from spark_sql_mcp.executor import BlockingExecutor
+from spark_sql_mcp.guard import PlanEstimate
+from spark_sql_mcp.jobs import JobRegistry
+from spark_sql_mcp.metrics import Instrumentation
+from spark_sql_mcp.pool import ConnectionPool, PoolStats, PoolTimeoutError
+from spark_sql_mcp.profile import TableProfile
+from spark_sql_mcp.results import QueryResult
+from spark_sql_mcp.router import ClusterRouter
+from spark_sql_mcp.search import SchemaIndex
 from spark_sql_mcp.tools import (
+    _safe_async_tool_call,
     _safe_tool_call,
     _validate_readonly,
     format_as_table,
@@ -11,6 +28,11 @@ from spark_sql_mcp.tools import (
 )
 
 
+def _call_tool(server: FastMCP, name: str, arguments: dict | None = None) -> str:
+    content, _ = asyncio.run(server.call_tool(name, arguments or {}))
+    return content[0].text
+
+
 class TestFormatAsTable:
     def test_basic(self):
         rows = [{"id": 1, "name": "alice"}, {"id": 2, "name": "bob"}]
@@ -28,6 +50,10 @@ class TestFormatAsTable:
         assert "| count |" in result
         assert "| 42 |" in result
 
+    def test_query_result(self):
+        result = format_as_table(QueryResult(("id", "name"), ((1, "alice"),)))
+        assert result.splitlines() == ["| id | name |", "| --- | --- |", "| 1 | alice |"]
+
     def test_none_values(self):
         rows = [{"a": None, "b": "ok"}]
         result = format_as_table(rows)
@@ -117,24 +143,517 @@ class TestSafeToolCall:
         assert "secret_table" not in result
 
 
+class TestSafeAsyncToolCall:
+    def test_returns_result_on_success(self):
+        async def _ok():
+            return "ok"
+        assert asyncio.run(_safe_async_tool_call(_ok)) == "ok"
+
+    def test_generic_error_is_sanitized(self):
+        async def _raise():
+            raise RuntimeError("internal-host.corp:10000 connection refused")
+        result = asyncio.run(_safe_async_tool_call(_raise))
+        assert "internal-host" not in result
+        assert "query execution failed" in result
+
+
 class TestToolRegistration:
     @pytest.fixture
     def mock_client(self):
         client = MagicMock()
+        client.config = SparkConfig(host="localhost")
+        client.executor = client.metadata_executor = BlockingExecutor(2)
+        client.instrumentation = Instrumentation()
         client.list_databases.return_value = ["default", "analytics"]
         client.list_tables.return_value = ["users", "orders"]
         client.describe_table.return_value = [
             {"col_name": "id", "data_type": "int", "comment": ""},
         ]
-        client.execute_query.return_value = [{"id": 1, "name": "test"}]
+        client.query.return_value = QueryResult(("id", "name"), ((1, "test"),))
         return client
 
     @pytest.fixture
     def server(self, mock_client):
         mcp = FastMCP("test")
-        register_tools(mcp, lambda: mock_client)
+        register_tools(mcp, lambda: ClusterRouter({"default": mock_client}))
         return mcp
 
     def test_tools_registered(self, server):
         # Access the internal tool manager to verify registration
         assert server._tool_manager is not None
+
+    def test_list_databases(self, server):
+        assert _call_tool(server, "list_databases") == "default\nanalytics"
+
+    def test_server_stats(self, server, mock_client):
+        mock_client.stats.return_value = {
+            "connection_pool": asdict(PoolStats(
+                size=2, idle=1, in_use=1, waiters=0, max_size=4,
+                checkouts=10, timeouts=0, avg_checkout_ms=0.5, max_checkout_ms=2.0,
+            )),
+            "metadata_cache": {"hits": 3},
+        }
+        result = _call_tool(server, "server_stats")
+        assert "## admission" in result
+        assert "## connection_pool" in result
+        assert "| in_use | 1 |" in result
+        assert "| waiters | 0 |" in result
+        assert "## metadata_cache" in result
+        assert "| hits | 3 |" in result
+
+    def test_refresh_metadata(self, server, mock_client):
+        mock_client.invalidate_metadata.return_value = 2
+        result = _call_tool(server, "refresh_metadata", {"database": "sales"})
+        mock_client.invalidate_metadata.assert_called_once_with("sales", None)
+        assert result == "Cleared 2 cached metadata entries."
+
+    def test_tool_bodies_run_off_event_loop(self, server, mock_client):
+        import threading
+        threads = []
+        mock_client.list_tables.side_effect = lambda db: threads.append(
+            threading.current_thread().name
+        ) or ["users"]
+        assert _call_tool(server, "list_tables") == "users"
+        assert threads[0].startswith("spark-sql")
+
+    def test_execute_query(self, server, mock_client):
+        result = _call_tool(server, "execute_query", {"sql": "SELECT * FROM t"})
+        mock_client.query.assert_called_once_with(
+            "SELECT * FROM t LIMIT 100",
+            limit=100, cached=True, max_bytes=256 * 1024, fmt="markdown",
+        )
+        assert "| 1 | test |" in result
+
+    def test_client_not_initialized(self):
+        def _get_router():
+            raise RuntimeError("Spark client not initialized")
+        mcp = FastMCP("test")
+        register_tools(mcp, _get_router)
+        assert "query execution failed" in _call_tool(mcp, "list_databases")
+
+    def test_execute_query_bypass_cache(self, server, mock_client):
+        _call_tool(server, "execute_query", {"sql": "SELECT 1", "bypass_cache": True})
+        assert mock_client.query.call_args.kwargs["cached"] is False
+
+    def test_server_busy(self, mock_client):
+        import threading
+        release = threading.Event()
+        mock_client.query.side_effect = lambda *a, **k: release.wait() and QueryResult((), ())
+        mcp = FastMCP("test")
+        admission = AdmissionController(1, max_queue=0)
+        register_tools(mcp, lambda: ClusterRouter({"default": mock_client}), lambda: admission)
+
+        async def main():
+            running = asyncio.create_task(mcp.call_tool("execute_query", {"sql": "SELECT 1"}))
+            while admission.stats().running == 0:
+                await asyncio.sleep(0.001)
+            busy, _ = await mcp.call_tool("execute_query", {"sql": "SELECT 2"})
+            listing, _ = await mcp.call_tool("list_databases", {})
+            release.set()
+            await running
+            return busy[0].text, listing[0].text
+
+        busy, listing = asyncio.run(main())
+        assert busy.startswith("Error: Server busy")
+        assert listing == "default\nanalytics"
+
+    def test_metadata_runs_beside_busy_query_executor(self, mock_client):
+        import threading
+        release = threading.Event()
+        mock_client.query.side_effect = lambda *a, **k: release.wait() and QueryResult((), ())
+        mock_client.executor = BlockingExecutor(1)
+        mock_client.metadata_executor = BlockingExecutor(1)
+        # A pool whose only unreserved connection is taken by the running query.
+        pool = ConnectionPool(MagicMock, min_size=0, max_size=2, timeout=0.05, reserved=1)
+        pool.acquire()
+        mock_client.list_databases.side_effect = lambda: [pool.acquire() and "default"]
+        mcp = FastMCP("test")
+        register_tools(mcp, lambda: ClusterRouter({"default": mock_client}))
+
+        async def main():
+            running = asyncio.create_task(mcp.call_tool("execute_query", {"sql": "SELECT 1"}))
+            await asyncio.sleep(0.01)
+            listing, _ = await mcp.call_tool("list_databases", {})
+            assert not running.done()
+            release.set()
+            await running
+            return listing[0].text
+
+        assert asyncio.run(main()) == "default"
+
+    def test_cost_guard_rejects(self, server, mock_client):
+        mock_client.config = SparkConfig(
+            host="localhost", cost_guard="reject", cost_max_scan_bytes=1024
+        )
+        mock_client.explain.return_value = PlanEstimate(1 << 30, None, (), False)
+        result = _call_tool(server, "execute_query", {"sql": "SELECT * FROM big"})
+        assert result.startswith("Error: Query cost check: it would scan about 1.0 GiB")
+        mock_client.explain.assert_called_once_with("SELECT * FROM big LIMIT 100")
+        mock_client.query.assert_not_called()
+
+    def test_cost_guard_warns(self, server, mock_client):
+        mock_client.config = SparkConfig(
+            host="localhost", cost_guard="warn", cost_max_scan_bytes=1024
+        )
+        mock_client.explain.return_value = PlanEstimate(1 << 30, None, (), False)
+        result = _call_tool(server, "execute_query", {"sql": "SELECT * FROM big"})
+        assert result.startswith("Warning: Query cost check")
+        assert "| 1 | test |" in result
+
+    def test_cost_guard_skips_non_queries(self, server, mock_client):
+        mock_client.config = SparkConfig(host="localhost", cost_guard="reject")
+        _call_tool(server, "execute_query", {"sql": "SHOW TABLES"})
+        mock_client.explain.assert_not_called()
+
+    def test_execute_query_sampled(self, server, mock_client):
+        result = _call_tool(server, "execute_query", {
+            "sql": "SELECT count(DISTINCT id) FROM t", "sample": "5%", "approximate": True,
+        })
+        mock_client.query.assert_called_once_with(
+            "SELECT approx_count_distinct(id) FROM t TABLESAMPLE (5 PERCENT) LIMIT 100",
+            limit=100, cached=True, max_bytes=256 * 1024, fmt="markdown",
+        )
+        assert result.startswith(
+            "Approximate results (each table sampled with TABLESAMPLE (5 PERCENT); "
+            "approximate COUNT(DISTINCT))."
+        )
+
+    def test_execute_query_invalid_sample(self, server, mock_client):
+        result = _call_tool(server, "execute_query", {"sql": "SELECT 1", "sample": "lots"})
+        assert result.startswith("Error: Invalid sample")
+        mock_client.query.assert_not_called()
+
+    def test_profile_table(self, server, mock_client):
+        mock_client.profile_table.return_value = TableProfile(
+            42, QueryResult(("column", "nulls"), (("id", 0),))
+        )
+        result = _call_tool(server, "profile_table", {"table": "users", "sample": "10%"})
+        mock_client.profile_table.assert_called_once_with(
+            "users", None, columns=None, sample="10 PERCENT"
+        )
+        assert result.startswith("42 rows in sample (TABLESAMPLE (10 PERCENT)).")
+        assert "| id | 0 |" in result
+
+    def test_sample_table(self, server, mock_client):
+        mock_client.sample_table.return_value = QueryResult(("id",), ((7,),))
+        result = _call_tool(server, "sample_table", {"table": "events", "sample": "100 rows"})
+        mock_client.sample_table.assert_called_once_with(
+            "events", None, sample="100 ROWS", limit=20, max_bytes=256 * 1024, fmt="markdown"
+        )
+        assert result.startswith("Sample (TABLESAMPLE (100 ROWS)).")
+        assert "| 7 |" in result
+
+    def test_sample_table_token_budget(self, server, mock_client):
+        mock_client.sample_table.return_value = QueryResult(
+            ("id",), ((7,),), Truncation(400, True, 0, 64)
+        )
+        result = _call_tool(
+            server, "sample_table", {"table": "events", "max_tokens": 100, "format": "csv"}
+        )
+        kwargs = mock_client.sample_table.call_args.kwargs
+        assert (kwargs["max_bytes"], kwargs["fmt"]) == (400, "csv")
+        assert result.startswith(
+            "Sample (TABLESAMPLE (1 PERCENT)).\n\n"
+            "Output truncated to fit the 400-byte response budget"
+        )
+
+    def test_describe_database(self, server, mock_client):
+        mock_client.describe_tables.return_value = {
+            "orders_2023": [{"col_name": "id", "data_type": "bigint"}],
+            "orders_2024": [{"col_name": "id", "data_type": "bigint"}],
+        }
+        result = _call_tool(server, "describe_database", {"database": "sales", "pattern": "o*"})
+        mock_client.describe_tables.assert_called_once_with("sales", "o*")
+        assert result == (
+            "2 tables in sales, 1 distinct schema.\n\norders_2023, orders_2024\n  id bigint"
+        )
+
+    def test_execute_batch_runs_statements_concurrently(self, server, mock_client):
+        both_running = threading.Barrier(2, timeout=5)
+
+        def query(sql, **kwargs):
+            both_running.wait()
+            return QueryResult(("n",), ((len(sql),),))
+
+        mock_client.query.side_effect = query
+        result = _call_tool(server, "execute_batch", {
+            "statements": ["SELECT count(*) FROM a", "SELECT count(*) FROM bb"],
+        })
+        assert result.startswith("Ran 2 statements: 2 succeeded, 0 failed.")
+        assert "## Statement 2\n\n```sql\nSELECT count(*) FROM bb\n```" in result
+        # Each statement gets its LIMIT and half of the response budget.
+        assert mock_client.query.call_args.kwargs["max_bytes"] == 128 * 1024
+        assert {c.args[0] for c in mock_client.query.call_args_list} == {
+            "SELECT count(*) FROM a LIMIT 100", "SELECT count(*) FROM bb LIMIT 100"
+        }
+
+    def test_execute_batch_reports_errors_per_statement(self, server, mock_client):
+        result = _call_tool(server, "execute_batch", {
+            "statements": ["DROP TABLE users", "SELECT 1"],
+        })
+        assert result.startswith("Ran 2 statements: 1 succeeded, 1 failed.")
+        assert "Error: Only read-only queries are allowed" in result
+        assert "| 1 | test |" in result
+        mock_client.query.assert_called_once()
+
+    def test_execute_batch_parallelism_cap(self, server, mock_client):
+        mock_client.config = SparkConfig(host="localhost", batch_parallelism=1)
+        running, peak = [0], [0]
+        lock = threading.Lock()
+
+        def query(sql, **kwargs):
+            with lock:
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+            time.sleep(0.01)
+            with lock:
+                running[0] -= 1
+            return QueryResult(("n",), ((1,),))
+
+        mock_client.query.side_effect = query
+        _call_tool(server, "execute_batch", {"statements": ["SELECT 1"] * 4})
+        assert mock_client.query.call_count == 4
+        assert peak[0] == 1
+
+    def test_execute_batch_without_budget(self, server, mock_client):
+        mock_client.config = SparkConfig(host="localhost", max_response_bytes=0)
+        _call_tool(server, "execute_batch", {"statements": ["SELECT 1", "SELECT 2"]})
+        assert [c.kwargs["max_bytes"] for c in mock_client.query.call_args_list] == [0, 0]
+
+    def test_execute_batch_empty(self, server):
+        result = _call_tool(server, "execute_batch", {"statements": []})
+        assert result == "Error: statements must not be empty"
+
+    def test_search_schema(self, server, mock_client):
+        index = SchemaIndex()
+        index.add_table("sales", "orders", [{"col_name": "customer_id", "data_type": "bigint"}])
+        mock_client.schema_index = index
+        result = _call_tool(server, "search_schema", {"query": "customer"})
+        assert "| sales | orders | customer_id | bigint |" in result
+        assert _call_tool(server, "search_schema", {"query": "email"}) == (
+            "No matches (indexed tables: 1). Use describe_database to index more."
+        )
+
+    def test_search_schema_invalid_limit(self, server, mock_client):
+        result = _call_tool(server, "search_schema", {"query": "id", "limit": 0})
+        assert result == "Error: limit must be a positive integer"
+
+    def test_execute_query_format(self, server, mock_client):
+        result = _call_tool(server, "execute_query", {"sql": "SELECT 1", "format": "CSV"})
+        assert result == "id,name\n1,test\n"
+
+    def test_execute_query_unknown_format(self, server, mock_client):
+        result = _call_tool(server, "execute_query", {"sql": "SELECT 1", "format": "xml"})
+        assert result.startswith("Error: Unknown format")
+        mock_client.query.assert_not_called()
+
+    def test_configured_output_format(self, server, mock_client):
+        mock_client.config = SparkConfig(host="localhost", output_format="jsonl")
+        result = _call_tool(server, "describe_table", {"table": "users"})
+        assert result == '{"col_name":"id","data_type":"int","comment":""}'
+
+    def test_execute_query_token_budget(self, server, mock_client):
+        mock_client.query.return_value = QueryResult(
+            ("id", "name"), ((1, "test"),), Truncation(400, True, 1, 64)
+        )
+        result = _call_tool(server, "execute_query", {"sql": "SELECT 1", "max_tokens": 100})
+        assert mock_client.query.call_args.kwargs["max_bytes"] == 400
+        _call_tool(server, "execute_query", {"sql": "SELECT 1", "format": "jsonl"})
+        assert mock_client.query.call_args.kwargs["fmt"] == "jsonl"
+        assert result.startswith(
+            "Output truncated to fit the 400-byte response budget "
+            "(showing the first 1 rows; 1 values cut to 64 characters)."
+        )
+        assert "| 1 | test |" in result
+
+    def test_pool_timeout_reported_as_busy(self, server, mock_client):
+        mock_client.query.side_effect = PoolTimeoutError("Timed out after 30s")
+        result = _call_tool(server, "execute_query", {"sql": "SELECT 1"})
+        assert result.startswith("Error: Server busy: no Spark connection became free")
+
+    def test_execute_query_invalid_token_budget(self, server, mock_client):
+        result = _call_tool(server, "execute_query", {"sql": "SELECT 1", "max_tokens": 0})
+        assert result == "Error: max_tokens must be a positive integer"
+
+    def test_tool_calls_are_timed(self, server, mock_client):
+        _call_tool(server, "execute_query", {"sql": "SELECT 1"})
+        summary = mock_client.instrumentation.summary()
+        assert summary["tool.execute_query"]["count"] == 1
+        assert summary["format"]["count"] == 1
+
+
+class TestJobTools:
+    @pytest.fixture
+    def registry(self):
+        registry = JobRegistry(1)
+        yield registry
+        registry.shutdown()
+
+    @pytest.fixture
+    def server(self, registry):
+        client = MagicMock()
+        client.config = SparkConfig(host="localhost")
+        client.executor = client.metadata_executor = BlockingExecutor(2)
+        client.instrumentation = Instrumentation()
+        client.arrow_results = False
+        client.iter_batches.side_effect = lambda sql, limit=None: iter([
+            QueryResult(("id",), ((1,), (2,), (3,))),
+        ])
+        mcp = FastMCP("test")
+        register_tools(
+            mcp, lambda: ClusterRouter({"etl": client}), get_jobs=lambda: registry
+        )
+        return mcp
+
+    @staticmethod
+    def _wait(registry, job_id):
+        while registry.get(job_id).active:
+            time.sleep(0.005)
+
+    def test_submit_status_fetch(self, server, registry):
+        submitted = _call_tool(server, "submit_query", {"sql": "SELECT id FROM t", "limit": 500})
+        job_id = submitted.split()[1]
+        assert submitted.startswith(f"Submitted {job_id} on cluster etl.")
+        assert registry.get(job_id).sql == "SELECT id FROM t LIMIT 500"
+        self._wait(registry, job_id)
+
+        status = _call_tool(server, "query_status", {"job_id": job_id})
+        assert "| state | finished |" in status
+        assert "| rows_fetched | 3 |" in status
+        assert "| results | available |" in status
+        assert job_id in _call_tool(server, "query_status")
+
+        page = _call_tool(server, "fetch_results", {"job_id": job_id, "offset": 1, "limit": 5})
+        assert page.startswith(f"Rows 2-3 of 3 from {job_id}.")
+        assert "| 2 |" in page and "| 1 |" not in page
+
+        csv = _call_tool(server, "fetch_results", {"job_id": job_id, "format": "csv"})
+        assert csv.endswith("id\n1\n2\n3\n")
+
+    def test_fetch_results_budget(self, server, registry):
+        job_id = _call_tool(server, "submit_query", {"sql": "SELECT id FROM t"}).split()[1]
+        self._wait(registry, job_id)
+        registry.get(job_id).client.config = SparkConfig(host="localhost", max_response_bytes=7)
+        page = _call_tool(server, "fetch_results", {"job_id": job_id, "format": "csv"})
+        assert page.startswith(
+            f"Rows 1-2 of 3 from {job_id}.\n\n"
+            "Output truncated to fit the 7-byte response budget (showing the first 2 rows). "
+            "Continue from offset 2."
+        )
+        assert page.endswith("id\n1\n2\n")
+        rest = _call_tool(server, "fetch_results", {"job_id": job_id, "offset": 2})
+        assert rest.startswith(f"Rows 3-3 of 3 from {job_id}.\n\n|")
+
+    def test_submit_rejects_writes(self, server, registry):
+        result = _call_tool(server, "submit_query", {"sql": "DROP TABLE t"})
+        assert result.startswith("Error: Only read-only queries")
+        assert registry.jobs() == []
+
+    def test_cancel_finished(self, server, registry):
+        job_id = _call_tool(server, "submit_query", {"sql": "SELECT 1"}).split()[1]
+        self._wait(registry, job_id)
+        assert _call_tool(server, "cancel_query", {"job_id": job_id}) == (
+            f"{job_id} already finished; nothing to cancel."
+        )
+
+    def test_unknown_job(self, server):
+        assert _call_tool(server, "fetch_results", {"job_id": "job-x"}) == (
+            "Error: Unknown job: 'job-x'"
+        )
+        assert _call_tool(server, "query_status") == "No jobs."
+
+
+class TestRouting:
+    @staticmethod
+    def _client(name):
+        client = MagicMock()
+        client.executor = client.metadata_executor = BlockingExecutor(2)
+        client.instrumentation = Instrumentation()
+        client.list_databases.return_value = [name]
+        client.query.return_value = QueryResult(("cluster",), ((name,),))
+        client.stats.return_value = {"metadata_cache": {"hits": 0}}
+        client.reachable = True
+        client.pool_stats.return_value = None
+        client.config = SparkConfig(host=name)
+        return client
+
+    @pytest.fixture
+    def clients(self):
+        return {"fast": self._client("fast"), "batch": self._client("batch")}
+
+    def _server(self, router):
+        mcp = FastMCP("test")
+        register_tools(mcp, lambda: router)
+        return mcp
+
+    def test_query_routed_by_database(self, clients):
+        server = self._server(ClusterRouter(clients, routes=[("warehouse", "batch")]))
+        result = _call_tool(server, "execute_query", {"sql": "SELECT * FROM warehouse.events"})
+        assert "| batch |" in result
+        assert "| fast |" in _call_tool(server, "execute_query", {"sql": "SELECT 1"})
+
+    def test_execute_batch_caps_each_routed_cluster(self, clients):
+        clients["fast"].config = SparkConfig(host="fast", batch_parallelism=1)
+        peak, running = {"fast": 0, "batch": 0}, {"fast": 0, "batch": 0}
+        lock = threading.Lock()
+        both_batch_running = threading.Barrier(2, timeout=5)
+
+        def _query(name):
+            def query(sql, **kwargs):
+                with lock:
+                    running[name] += 1
+                    peak[name] = max(peak[name], running[name])
+                if name == "batch":
+                    both_batch_running.wait()
+                time.sleep(0.01)
+                with lock:
+                    running[name] -= 1
+                return QueryResult(("cluster",), ((name,),))
+            return query
+
+        for name, client in clients.items():
+            client.query.side_effect = _query(name)
+        server = self._server(ClusterRouter(clients, routes=[("warehouse", "batch")]))
+        result = _call_tool(server, "execute_batch", {"statements": [
+            "SELECT 1", "SELECT 2",
+            "SELECT * FROM warehouse.a", "SELECT * FROM warehouse.b",
+        ]})
+        assert result.startswith("Ran 4 statements: 4 succeeded, 0 failed.")
+        assert peak == {"fast": 1, "batch": 2}
+
+    def test_explicit_cluster(self, clients):
+        server = self._server(ClusterRouter(clients))
+        assert _call_tool(server, "list_databases", {"cluster": "batch"}) == "batch"
+
+    def test_unknown_cluster(self, clients):
+        server = self._server(ClusterRouter(clients))
+        result = _call_tool(server, "list_databases", {"cluster": "adhoc"})
+        assert result.startswith("Error: Unknown cluster: 'adhoc'")
+
+    def test_failover_on_connection_error(self, clients):
+        clients["fast"].list_databases.side_effect = ConnectionError("refused")
+        server = self._server(ClusterRouter(clients, failover=True))
+        assert _call_tool(server, "list_databases") == "batch"
+
+    def test_no_failover_without_opt_in(self, clients):
+        clients["fast"].list_databases.side_effect = ConnectionError("refused")
+        server = self._server(ClusterRouter(clients))
+        assert "query execution failed" in _call_tool(server, "list_databases")
+
+    def test_query_errors_do_not_fail_over(self, clients):
+        clients["fast"].list_databases.side_effect = RuntimeError("syntax")
+        server = self._server(ClusterRouter(clients, failover=True))
+        assert "query execution failed" in _call_tool(server, "list_databases")
+        clients["batch"].list_databases.assert_not_called()
+
+    def test_refresh_metadata_clears_every_cluster(self, clients):
+        for client in clients.values():
+            client.invalidate_metadata.return_value = 2
+        server = self._server(ClusterRouter(clients))
+        assert _call_tool(server, "refresh_metadata") == "Cleared 4 cached metadata entries."
+
+    def test_server_stats_per_cluster(self, clients):
+        result = _call_tool(self._server(ClusterRouter(clients)), "server_stats")
+        assert "## cluster fast" in result
+        assert "| queue_depth | 0 |" in result
+        assert "## batch: metadata_cache" in result